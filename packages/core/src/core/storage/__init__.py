@@ -1,19 +1,33 @@
-from core.storage.base import ObjectStore
+from core.storage.base import ListingStats, ObjectStore, TransferStats, UploadItem
+from core.storage.cache import CacheStats, LocalObjectCache
 from core.storage.paths import (
     dataset_prefix,
     feature_set_prefix,
     report_prefix,
+    run_log_chunk_key,
+    run_log_end_key,
+    run_log_prefix,
     run_prefix,
+    sweep_prefix,
 )
 from core.storage.s3 import S3CompatibleStore, S3Settings
 
 __all__ = [
+    "CacheStats",
+    "ListingStats",
+    "LocalObjectCache",
     "ObjectStore",
     "S3CompatibleStore",
     "S3Settings",
+    "TransferStats",
+    "UploadItem",
     "dataset_prefix",
     "feature_set_prefix",
     "report_prefix",
+    "run_log_chunk_key",
+    "run_log_end_key",
+    "run_log_prefix",
     "run_prefix",
+    "sweep_prefix",
 ]
 
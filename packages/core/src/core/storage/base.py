@@ -1,13 +1,92 @@
-from typing import Protocol
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+
+@dataclass(frozen=True)
+class UploadItem:
+    key: str
+    source: bytes | Path
+    content_type: str | None = None
+
+
+@dataclass(frozen=True)
+class TransferStats:
+    objects: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_s(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def __add__(self, other: "TransferStats") -> "TransferStats":
+        return TransferStats(
+            objects=self.objects + other.objects,
+            bytes=self.bytes + other.bytes,
+            seconds=self.seconds + other.seconds,
+        )
+
+
+@dataclass
+class ListingStats:
+    keys: int = 0
+    prefixes: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "ListingStats") -> None:
+        self.keys += other.keys
+        self.prefixes += other.prefixes
+        self.pages += other.pages
+        self.seconds += other.seconds
 
 
 class ObjectStore(Protocol):
     def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
         ...
 
+    def put_file(
+        self, key: str, path: str | Path, content_type: str | None = None
+    ) -> TransferStats:
+        ...
+
+    def put_stream(
+        self, key: str, stream: BinaryIO, content_type: str | None = None
+    ) -> TransferStats:
+        ...
+
+    def put_many(self, items: Iterable[UploadItem]) -> TransferStats:
+        ...
+
     def get_bytes(self, key: str) -> bytes:
         ...
 
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        ...
+
+    def size(self, key: str) -> int:
+        ...
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> BinaryIO:
+        ...
+
+    def iter_keys(
+        self, prefix: str, delimiter: str | None = None, stats: ListingStats | None = None
+    ) -> Iterator[str]:
+        ...
+
+    def list_prefixes(
+        self, prefix: str, delimiter: str = "/", stats: ListingStats | None = None
+    ) -> list[str]:
+        ...
+
+    def list_many(
+        self, prefixes: Iterable[str], stats: ListingStats | None = None
+    ) -> dict[str, list[str]]:
+        ...
+
     def list(self, prefix: str) -> list[str]:
         ...
 
@@ -16,4 +95,3 @@ class ObjectStore(Protocol):
 
     def signed_url(self, key: str, expires_in: int = 3600) -> str:
         ...
-
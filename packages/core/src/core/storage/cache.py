@@ -0,0 +1,198 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import BinaryIO
+
+from core.storage.base import ObjectStore
+
+_COPY_CHUNK = 8 * 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_fetched: int = 0
+    bytes_evicted: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"}
+
+
+class LocalObjectCache:
+    """Size-bounded on-disk cache for immutable objects, shared by processes on a host.
+
+    Entries are addressed by ``(fingerprint, key)`` so a new dataset version never
+    reuses a stale file. Downloads go to a temp file and are renamed into place. A
+    per-entry ``flock`` ensures concurrent processes fetch each entry once, and a
+    striped one orders renames, hits and eviction. When the cache exceeds
+    ``max_bytes`` the least recently used entries (by mtime, refreshed on every hit)
+    are removed.
+    """
+
+    def __init__(self, store: ObjectStore, root: str | Path, max_bytes: int) -> None:
+        self._store = store
+        self._root = Path(root)
+        self._max_bytes = max_bytes
+        self._entries = self._root / "objects"
+        self._locks = self._root / "locks"
+        self._entries.mkdir(parents=True, exist_ok=True)
+        self._locks.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def path_for(self, key: str, fingerprint: str) -> Path:
+        digest = hashlib.sha256(f"{fingerprint}\0{key}".encode()).hexdigest()
+        suffix = Path(key).suffix
+        return self._entries / digest[:2] / f"{digest}{suffix}"
+
+    @contextmanager
+    def _locked(self, name: str, blocking: bool = True) -> Iterator[bool]:
+        with open(self._locks / f"{name}.lock", "a+b") as handle:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(handle, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _downloading(self, path: Path) -> Iterator[None]:
+        """Serialize downloads of one entry without blocking the rest of its stripe."""
+        lock = self._locks / f"{path.stem}.lock"
+        while True:
+            with open(lock, "a+b") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    current = os.stat(lock).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current != os.fstat(handle.fileno()).st_ino:
+                    # The holder unlinked this file after we opened it; a newer caller may
+                    # already hold the lock at ``lock``, so queue up on that one instead.
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                    continue
+                try:
+                    yield
+                finally:
+                    # Waiters check for the entry once they hold the lock, so its file can go.
+                    lock.unlink(missing_ok=True)
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                return
+
+    def _hit(self, path: Path) -> bool:
+        """Refresh ``path``'s LRU time if it is cached; the stripe lock keeps eviction off it."""
+        with self._locked(path.name[:2]):
+            if not path.exists():
+                return False
+            # Explicit ns timestamps: kernel file times are too coarse to order hits.
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+        self.stats.add(hits=1)
+        return True
+
+    def fetch(self, key: str, fingerprint: str) -> Path:
+        """Return a local path holding ``key``, downloading it on a miss.
+
+        The stripe lock is only held to check for the entry and to rename it into
+        place; the download itself holds a per-entry lock, so a large miss never
+        delays hits or misses on other entries.
+        """
+        path = self.path_for(key, fingerprint)
+        if self._hit(path):
+            return path
+        with self._downloading(path):
+            if self._hit(path):
+                return path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with self._store.open_read(key) as source, open(tmp, "wb") as target:
+                    shutil.copyfileobj(source, target, _COPY_CHUNK)
+                with self._locked(path.name[:2]):
+                    os.replace(tmp, path)
+                    now = time.time_ns()
+                    os.utime(path, ns=(now, now))
+            finally:
+                tmp.unlink(missing_ok=True)
+            self.stats.add(misses=1, bytes_fetched=path.stat().st_size)
+        self.evict(keep=path)
+        return path
+
+    def add(self, key: str, fingerprint: str, source: str | Path) -> Path:
+        """Seed the cache with a local copy of ``key`` (e.g. an object this host just uploaded)."""
+        path = self.path_for(key, fingerprint)
+        with self._locked(path.name[:2]):
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                try:
+                    shutil.copyfile(source, tmp)
+                    os.replace(tmp, path)
+                finally:
+                    tmp.unlink(missing_ok=True)
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+        self.evict(keep=path)
+        return path
+
+    def open(self, key: str, fingerprint: str) -> BinaryIO:
+        return open(self.fetch(key, fingerprint), "rb")
+
+    def get_bytes(self, key: str, fingerprint: str) -> bytes:
+        return self.fetch(key, fingerprint).read_bytes()
+
+    def size_bytes(self) -> int:
+        return sum(
+            path.stat().st_size
+            for path in self._entries.glob("*/*")
+            if path.is_file() and not path.name.startswith(".")
+        )
+
+    def evict(self, keep: Path | None = None) -> None:
+        with self._locked("evict", blocking=False) as acquired:
+            if not acquired:
+                return
+            entries = []
+            for path in self._entries.glob("*/*"):
+                if path.name.startswith("."):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self._max_bytes:
+                    break
+                if path == keep:
+                    continue
+                with self._locked(path.name[:2], blocking=False) as entry_locked:
+                    if not entry_locked:
+                        continue
+                    path.unlink(missing_ok=True)
+                total -= size
+                self.stats.add(evictions=1, bytes_evicted=size)
@@ -13,3 +13,20 @@ def run_prefix(run_id: str) -> str:
 def report_prefix(run_id: str) -> str:
     return f"reports/{run_id}/"
 
+
+def sweep_prefix(sweep_id: str) -> str:
+    return f"sweeps/{sweep_id}/"
+
+
+def run_log_prefix(run_id: str) -> str:
+    return f"{run_prefix(run_id)}logs/"
+
+
+def run_log_chunk_key(run_id: str, seq: int) -> str:
+    """Key of the ``seq``-th log chunk of a run; chunks sort by key in write order."""
+    return f"{run_log_prefix(run_id)}runner-{seq:06d}.log"
+
+
+def run_log_end_key(run_id: str) -> str:
+    """Written once the last log chunk of a run is complete."""
+    return f"{run_log_prefix(run_id)}runner.end"
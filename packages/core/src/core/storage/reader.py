@@ -0,0 +1,60 @@
+import io
+from collections.abc import Callable
+
+RangeFetcher = Callable[[int, int], bytes]
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable raw reader that fetches ``[start, end)`` byte ranges on demand.
+
+    Wrap it in ``io.BufferedReader`` (see ``open_ranged``) to get read-ahead: small
+    reads are served from a buffer filled with one ranged request.
+    """
+
+    def __init__(self, fetch: RangeFetcher, size: int) -> None:
+        self._fetch = fetch
+        self._size = size
+        self._position = 0
+        self.requests = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self._size:
+            return 0
+        end = min(self._position + len(buffer), self._size)
+        data = self._fetch(self._position, end)
+        self.requests += 1
+        count = len(data)
+        buffer[:count] = data
+        self._position += count
+        return count
+
+
+def open_ranged(fetch: RangeFetcher, size: int, read_ahead: int) -> io.BufferedReader:
+    return io.BufferedReader(RangeReader(fetch, size), buffer_size=read_ahead)
@@ -1,10 +1,21 @@
+import io
 import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from core.storage.base import ObjectStore
+from core.storage.base import ListingStats, ObjectStore, TransferStats, UploadItem
+from core.storage.reader import open_ranged
+
+_MiB = 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -14,6 +25,10 @@ class S3Settings:
     secret_key: str
     bucket: str
     region: str = "us-east-1"
+    multipart_threshold: int = 16 * _MiB
+    multipart_chunksize: int = 16 * _MiB
+    max_concurrency: int = 8
+    read_ahead_bytes: int = 8 * _MiB
 
     @classmethod
     def from_env(cls) -> "S3Settings":
@@ -23,6 +38,10 @@ class S3Settings:
             secret_key=os.environ["S3_SECRET_KEY"],
             bucket=os.environ["S3_BUCKET"],
             region=os.getenv("S3_REGION", "us-east-1"),
+            multipart_threshold=int(os.getenv("S3_MULTIPART_THRESHOLD", 16 * _MiB)),
+            multipart_chunksize=int(os.getenv("S3_MULTIPART_CHUNKSIZE", 16 * _MiB)),
+            max_concurrency=int(os.getenv("S3_MAX_CONCURRENCY", 8)),
+            read_ahead_bytes=int(os.getenv("S3_READ_AHEAD_BYTES", 8 * _MiB)),
         )
 
 
@@ -35,6 +54,14 @@ class S3CompatibleStore(ObjectStore):
             aws_access_key_id=settings.access_key,
             aws_secret_access_key=settings.secret_key,
             region_name=settings.region,
+            # put_many runs max_concurrency uploads, each with up to max_concurrency parts in
+            # flight, so the pool needs max_concurrency² connections to keep parts off its queue.
+            config=Config(max_pool_connections=max(10, settings.max_concurrency**2)),
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=settings.multipart_threshold,
+            multipart_chunksize=settings.multipart_chunksize,
+            max_concurrency=settings.max_concurrency,
         )
 
     @property
@@ -42,18 +69,149 @@ class S3CompatibleStore(ObjectStore):
         return self._settings.bucket
 
     def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        if len(data) >= self._settings.multipart_threshold:
+            self.put_stream(key, io.BytesIO(data), content_type)
+            return
         args = {"Bucket": self.bucket, "Key": key, "Body": data}
         if content_type:
             args["ContentType"] = content_type
         self._client.put_object(**args)
 
+    def put_file(
+        self, key: str, path: str | Path, content_type: str | None = None
+    ) -> TransferStats:
+        started = time.perf_counter()
+        self._client.upload_file(
+            str(path),
+            self.bucket,
+            key,
+            ExtraArgs=_extra_args(content_type),
+            Config=self._transfer_config,
+        )
+        return TransferStats(
+            objects=1, bytes=Path(path).stat().st_size, seconds=time.perf_counter() - started
+        )
+
+    def put_stream(
+        self, key: str, stream: BinaryIO, content_type: str | None = None
+    ) -> TransferStats:
+        """Upload a file-like object, switching to multipart above the configured threshold."""
+        sent = 0
+
+        def _count(chunk: int) -> None:
+            nonlocal sent
+            sent += chunk
+
+        started = time.perf_counter()
+        self._client.upload_fileobj(
+            stream,
+            self.bucket,
+            key,
+            ExtraArgs=_extra_args(content_type),
+            Callback=_count,
+            Config=self._transfer_config,
+        )
+        return TransferStats(objects=1, bytes=sent, seconds=time.perf_counter() - started)
+
+    def put_many(self, items: Iterable[UploadItem]) -> TransferStats:
+        """Upload ``items`` concurrently on a pool bounded by ``max_concurrency``."""
+
+        def _put(item: UploadItem) -> int:
+            if isinstance(item.source, (bytes, bytearray)):
+                self.put_bytes(item.key, bytes(item.source), item.content_type)
+                return len(item.source)
+            return self.put_file(item.key, item.source, item.content_type).bytes
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self._settings.max_concurrency) as pool:
+            sizes = list(pool.map(_put, items))
+        return TransferStats(
+            objects=len(sizes), bytes=sum(sizes), seconds=time.perf_counter() - started
+        )
+
     def get_bytes(self, key: str) -> bytes:
         response = self._client.get_object(Bucket=self.bucket, Key=key)
         return response["Body"].read()
 
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Return bytes ``[start, end)`` of ``key``."""
+        if end <= start:
+            return b""
+        response = self._client.get_object(
+            Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end - 1}"
+        )
+        return response["Body"].read()
+
+    def size(self, key: str) -> int:
+        return self._client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> BinaryIO:
+        """Open ``key`` as a seekable file object backed by ranged GETs."""
+        return open_ranged(
+            lambda start, end: self.get_range(key, start, end),
+            self.size(key),
+            read_ahead or self._settings.read_ahead_bytes,
+        )
+
+    def _iter_pages(
+        self, prefix: str, delimiter: str | None, stats: ListingStats | None
+    ) -> Iterator[dict]:
+        args = {"Bucket": self.bucket, "Prefix": prefix}
+        if delimiter:
+            args["Delimiter"] = delimiter
+        pages = iter(self._client.get_paginator("list_objects_v2").paginate(**args))
+        while True:
+            started = time.perf_counter()
+            page = next(pages, None)
+            if page is None:
+                return
+            if stats is not None:
+                stats.pages += 1
+                stats.seconds += time.perf_counter() - started
+                stats.keys += page.get("KeyCount", 0) - len(page.get("CommonPrefixes", []))
+                stats.prefixes += len(page.get("CommonPrefixes", []))
+            yield page
+
+    def iter_keys(
+        self, prefix: str, delimiter: str | None = None, stats: ListingStats | None = None
+    ) -> Iterator[str]:
+        """Lazily yield every key under ``prefix``, following continuation tokens.
+
+        With ``delimiter`` only keys directly under ``prefix`` are yielded; use
+        ``list_prefixes`` for the "directories".
+        """
+        for page in self._iter_pages(prefix, delimiter, stats):
+            for item in page.get("Contents", []):
+                yield item["Key"]
+
+    def list_prefixes(
+        self, prefix: str, delimiter: str = "/", stats: ListingStats | None = None
+    ) -> list[str]:
+        return [
+            item["Prefix"]
+            for page in self._iter_pages(prefix, delimiter, stats)
+            for item in page.get("CommonPrefixes", [])
+        ]
+
+    def list_many(
+        self, prefixes: Iterable[str], stats: ListingStats | None = None
+    ) -> dict[str, list[str]]:
+        """List several prefixes concurrently; returns keys per prefix."""
+
+        def _list(prefix: str) -> tuple[str, list[str], ListingStats]:
+            local = ListingStats()
+            return prefix, list(self.iter_keys(prefix, stats=local)), local
+
+        results: dict[str, list[str]] = {}
+        with ThreadPoolExecutor(max_workers=self._settings.max_concurrency) as pool:
+            for prefix, keys, local in pool.map(_list, prefixes):
+                results[prefix] = keys
+                if stats is not None:
+                    stats.merge(local)
+        return results
+
     def list(self, prefix: str) -> list[str]:
-        response = self._client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
-        return [item["Key"] for item in response.get("Contents", [])]
+        return list(self.iter_keys(prefix))
 
     def exists(self, key: str) -> bool:
         try:
@@ -71,3 +229,6 @@ class S3CompatibleStore(ObjectStore):
             ExpiresIn=expires_in,
         )
 
+
+def _extra_args(content_type: str | None) -> dict:
+    return {"ContentType": content_type} if content_type else {}
@@ -1,2 +1,12 @@
-"""Data ingestion and dataset abstractions (placeholder)."""
+"""Data ingestion and dataset abstractions."""
 
+from data.ingest import IngestResult, ingest_dataset
+from data.profile import ColumnProfile, TableProfile, profile_partitions
+
+__all__ = [
+    "ColumnProfile",
+    "IngestResult",
+    "TableProfile",
+    "ingest_dataset",
+    "profile_partitions",
+]
@@ -0,0 +1,360 @@
+import hashlib
+import io
+import json
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+from core.storage import ObjectStore, dataset_prefix
+from data.profile import TableProfile
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+MANIFEST_NAME = "_manifest.json"
+
+_DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+_DEFAULT_ROWS_PER_PARTITION = 1_000_000
+_DEFAULT_ROW_GROUP_SIZE = 128 * 1024
+_DEFAULT_SCHEMA_SAMPLE_ROWS = 100_000
+
+
+@dataclass
+class IngestResult:
+    dataset_id: str
+    version: str
+    data_fingerprint: str
+    schema_hash: str
+    row_count: int
+    partitions: list[str] = field(default_factory=list)
+    statistics_summary: dict = field(default_factory=dict)
+
+
+def parse_storage_uri(uri: str) -> tuple[str, str]:
+    """Split ``s3://bucket/key`` into ``(bucket, key)``."""
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Unsupported storage URI: {uri}")
+    bucket, _, key = uri[len("s3://") :].partition("/")
+    if not bucket or not key:
+        raise ValueError(f"Storage URI must include a bucket and key: {uri}")
+    return bucket, key
+
+
+def detect_format(key: str) -> str:
+    name = key.lower()
+    for suffix in (".gz", ".bz2"):
+        if name.endswith(suffix):
+            raise ValueError(f"Compressed sources are not supported: {key}")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(f"Cannot infer source format from key: {key}")
+
+
+def schema_hash(schema: pa.Schema) -> str:
+    canonical = json.dumps([[f.name, str(f.type)] for f in schema], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _HashingReader(io.RawIOBase):
+    """Pass-through reader that hashes every byte it returns."""
+
+    def __init__(self, stream: BinaryIO, digest) -> None:
+        self._stream = stream
+        self._digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        count = len(data)
+        buffer[:count] = data
+        self._digest.update(data)
+        return count
+
+
+def _record_ends(data: bytes, quoted: bool) -> np.ndarray:
+    """Offsets of the newlines in ``data`` that end a record.
+
+    With ``quoted`` a newline inside a double-quoted CSV field does not end the
+    record. ``data`` starts at a record boundary and an escaped quote is doubled, so a
+    newline is outside quotes exactly when an even number of quotes precede it.
+    """
+    values = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(values == ord("\n"))
+    if not quoted:
+        return newlines
+    quotes = np.flatnonzero(values == ord('"'))
+    return newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+
+
+def _iter_blocks(stream: BinaryIO, block_size: int, quoted: bool = False) -> Iterator[bytes]:
+    """Yield ``block_size`` reads of ``stream`` cut back to the last complete record."""
+    pending = b""
+    while True:
+        chunk = stream.read(block_size)
+        data = pending + chunk
+        if not chunk:
+            if data.strip():
+                yield data
+            return
+        ends = _record_ends(data, quoted)
+        if not ends.size:
+            pending = data
+            continue
+        cut = int(ends[-1])
+        pending, complete = data[cut + 1 :], data[: cut + 1]
+        if complete.strip():
+            yield complete
+
+
+def _iter_csv(stream: BinaryIO, block_size: int) -> Iterator[pa.Table]:
+    # Each block is parsed on its own, under the header, so its column types are
+    # inferred from its own rows rather than fixed by the first block. Blocks end
+    # on record boundaries, so quoted fields may span lines.
+    header = None
+    parse = pa_csv.ParseOptions(newlines_in_values=True)
+    for block in _iter_blocks(stream, block_size, quoted=True):
+        if header is None:
+            ends = _record_ends(block, quoted=True)
+            cut = int(ends[0]) + 1 if ends.size else len(block)
+            header, block = block[:cut], block[cut:]
+            if not block.strip():
+                continue
+        data = header + block
+        options = pa_csv.ReadOptions(block_size=len(data) + 1)
+        yield pa_csv.read_csv(io.BytesIO(data), read_options=options, parse_options=parse)
+
+
+def _iter_jsonl(stream: BinaryIO, block_size: int) -> Iterator[pa.Table]:
+    for block in _iter_blocks(stream, block_size):
+        yield pa_json.read_json(io.BytesIO(block))
+
+
+def _conform(table: pa.Table, schema: pa.Schema, sample_rows: int) -> pa.Table:
+    """Cast ``table`` to ``schema``, filling columns it lacks with nulls."""
+    extra = [name for name in table.column_names if schema.get_field_index(name) == -1]
+    if extra:
+        raise ValueError(
+            f"Columns {extra} first appear after the first {sample_rows} rows; "
+            "raise the schema sample to include them"
+        )
+    try:
+        columns = [
+            table.column(f.name).cast(f.type)
+            if f.name in table.column_names
+            else pa.nulls(table.num_rows, f.type)
+            for f in schema
+        ]
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise ValueError(
+            f"Block does not match the schema inferred from the first {sample_rows} rows: {exc}"
+        ) from exc
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class _SchemaUnifier:
+    """Unifies the schemas inferred per block and settles them before rows are written.
+
+    A column with no values in a block is inferred as ``null`` and a JSONL field can
+    first appear in a later block, so the first ``sample_rows`` rows are held back
+    while their schemas are unified (``null`` promotes to any later type). The schema
+    is then fixed and every block, held or later, is cast to it.
+    """
+
+    def __init__(self, sample_rows: int) -> None:
+        self.schema: pa.Schema | None = None
+        self._sample_rows = sample_rows
+        self._settled = False
+        self._held: list[pa.Table] = []
+        self._held_rows = 0
+
+    def add(self, table: pa.Table) -> list[pa.Table]:
+        if self._settled:
+            return [_conform(table, self.schema, self._sample_rows)]
+        if self.schema is None:
+            self.schema = table.schema
+        else:
+            self.schema = pa.unify_schemas(
+                [self.schema, table.schema], promote_options="permissive"
+            )
+        self._held.append(table)
+        self._held_rows += table.num_rows
+        if self._held_rows >= self._sample_rows:
+            return self.settle()
+        return []
+
+    def settle(self) -> list[pa.Table]:
+        """Fix the schema and release the held blocks cast to it."""
+        if self.schema is None:
+            return []
+        self._settled = True
+        held, self._held = self._held, []
+        return [_conform(table, self.schema, self._sample_rows) for table in held]
+
+
+_READERS = {"csv": _iter_csv, "jsonl": _iter_jsonl}
+
+
+class _PartitionWriter:
+    """Writes batches into size-bounded Parquet partitions and uploads them in the background."""
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        prefix: str,
+        workdir: Path,
+        rows_per_partition: int,
+        row_group_size: int,
+    ) -> None:
+        self._store = store
+        self._prefix = prefix
+        self._workdir = workdir
+        self._rows_per_partition = rows_per_partition
+        self._row_group_size = row_group_size
+        self._uploader = ThreadPoolExecutor(max_workers=1)
+        self._pending: list[Future] = []
+        self._writer: pq.ParquetWriter | None = None
+        self._path: Path | None = None
+        self._rows = 0
+        self.partitions: list[dict] = []
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        offset = 0
+        while offset < batch.num_rows:
+            if self._writer is None:
+                self._open(batch.schema)
+            take = min(batch.num_rows - offset, self._rows_per_partition - self._rows)
+            self._writer.write_batch(batch.slice(offset, take), row_group_size=self._row_group_size)
+            self._rows += take
+            offset += take
+            if self._rows >= self._rows_per_partition:
+                self._flush()
+
+    def _open(self, schema: pa.Schema) -> None:
+        index = len(self.partitions)
+        self._path = self._workdir / f"part-{index:05d}.parquet"
+        self._writer = pq.ParquetWriter(self._path, schema, compression="zstd")
+        self._rows = 0
+
+    def _flush(self) -> None:
+        self._writer.close()
+        path, rows = self._path, self._rows
+        key = f"{self._prefix}{path.name}"
+        self.partitions.append({"key": key, "rows": rows, "bytes": path.stat().st_size})
+        # Keep at most one upload in flight so local disk usage stays bounded.
+        for future in self._pending:
+            future.result()
+        self._pending = [self._uploader.submit(self._upload, key, path)]
+        self._writer = None
+
+    def _upload(self, key: str, path: Path) -> None:
+        self._store.put_file(key, path, "application/vnd.apache.parquet")
+        path.unlink(missing_ok=True)
+
+    def close(self) -> list[dict]:
+        if self._writer is not None and self._rows:
+            self._flush()
+        for future in self._pending:
+            future.result()
+        self._uploader.shutdown()
+        return self.partitions
+
+
+def ingest_dataset(
+    store: ObjectStore,
+    storage_uri: str,
+    dataset_id: str,
+    version: str,
+    *,
+    source_format: str | None = None,
+    block_size: int = _DEFAULT_BLOCK_SIZE,
+    rows_per_partition: int = _DEFAULT_ROWS_PER_PARTITION,
+    row_group_size: int = _DEFAULT_ROW_GROUP_SIZE,
+    schema_sample_rows: int = _DEFAULT_SCHEMA_SAMPLE_ROWS,
+) -> IngestResult:
+    """Stream CSV/JSONL at ``storage_uri`` into Parquet partitions under ``dataset_prefix``.
+
+    The source is read in ``block_size`` chunks; the fingerprint (sha256 of the raw
+    bytes), schema hash, row count and column statistics are computed in the same
+    pass, so memory stays bounded by one block plus one Parquet row group. A URI
+    ending in ``/`` ingests every supported object under that prefix in key order.
+    Column types are inferred per block and unified over the first
+    ``schema_sample_rows`` rows (see ``_SchemaUnifier``) before any row is written.
+    """
+    _, key = parse_storage_uri(storage_uri)
+    if key.endswith("/"):
+        keys = sorted(k for k in store.iter_keys(key) if not k.endswith("/"))
+    else:
+        keys = [key]
+    if not keys:
+        raise ValueError(f"No source objects under {storage_uri}")
+
+    prefix = dataset_prefix(dataset_id, version)
+    digest = hashlib.sha256()
+    unifier = _SchemaUnifier(schema_sample_rows)
+    profile: TableProfile | None = None
+
+    with tempfile.TemporaryDirectory(prefix="talaty-ingest-") as tmp:
+        writer = _PartitionWriter(store, prefix, Path(tmp), rows_per_partition, row_group_size)
+
+        def write(tables: list[pa.Table]) -> None:
+            nonlocal profile
+            for table in tables:
+                if profile is None:
+                    profile = TableProfile(unifier.schema)
+                for batch in table.to_batches():
+                    profile.update(batch)
+                    writer.write(batch)
+
+        try:
+            for source_key in keys:
+                fmt = source_format or detect_format(source_key)
+                if fmt not in SUPPORTED_FORMATS:
+                    raise ValueError(f"Unsupported source format: {fmt}")
+                with store.open_read(source_key) as raw:
+                    stream = io.BufferedReader(_HashingReader(raw, digest), block_size)
+                    for table in _READERS[fmt](stream, block_size):
+                        if table.num_rows:
+                            write(unifier.add(table))
+            write(unifier.settle())
+        finally:
+            partitions = writer.close()
+
+    schema = unifier.schema
+    if schema is None or profile is None:
+        raise ValueError(f"No rows found in {storage_uri}")
+
+    result = IngestResult(
+        dataset_id=dataset_id,
+        version=version,
+        data_fingerprint=f"sha256:{digest.hexdigest()}",
+        schema_hash=schema_hash(schema),
+        row_count=profile.row_count,
+        partitions=[item["key"] for item in partitions],
+        statistics_summary=profile.summary(),
+    )
+    manifest = {
+        "format": "parquet",
+        "source_uri": storage_uri,
+        "data_fingerprint": result.data_fingerprint,
+        "schema_hash": result.schema_hash,
+        "row_count": result.row_count,
+        "schema": [{"name": f.name, "type": str(f.type)} for f in schema],
+        "partitions": partitions,
+    }
+    store.put_bytes(
+        f"{prefix}{MANIFEST_NAME}",
+        json.dumps(manifest, indent=2).encode("utf-8"),
+        "application/json",
+    )
+    return result
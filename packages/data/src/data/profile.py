@@ -0,0 +1,311 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+_U64 = np.uint64
+
+
+def _jsonable(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return None
+    if isinstance(value, Decimal):
+        value = float(value)
+    # NaN and +-inf (e.g. the bounds of an all-NaN batch) are not valid JSON.
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    z = values.astype(_U64, copy=True)
+    z += _U64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> _U64(27))) * _U64(0x94D049BB133111EB)
+    return z ^ (z >> _U64(31))
+
+
+def hash_array(array: pa.Array) -> np.ndarray:
+    """64-bit hashes of the non-null values of ``array``."""
+    array = pc.drop_null(array)
+    if len(array) == 0:
+        return np.empty(0, dtype=_U64)
+    kind = array.type
+    if pa.types.is_floating(kind):
+        values = array.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        return _splitmix64((values + 0.0).view(_U64))
+    if pa.types.is_integer(kind) or pa.types.is_boolean(kind):
+        return _splitmix64(array.cast(pa.int64()).to_numpy(zero_copy_only=False).view(_U64))
+    if pa.types.is_temporal(kind):
+        integer = pa.int32() if pa.types.is_date32(kind) else pa.int64()
+        values = array.cast(integer).cast(pa.int64()).to_numpy(zero_copy_only=False)
+        return _splitmix64(values.view(_U64))
+    # Strings and other types: hash each distinct value of the batch once.
+    return _hash_strings(pc.unique(array.cast(pa.large_string())))
+
+
+def _hash_strings(array: pa.Array) -> np.ndarray:
+    """Hash a ``large_string`` array from its offsets and data buffers.
+
+    Every byte is mixed with its position in its value, the mixed bytes are summed per
+    value with ``np.add.reduceat`` and the sum is mixed again with the value's length.
+    """
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64, count=len(array) + 1, offset=array.offset * 8)
+    starts, lengths = offsets[:-1] - offsets[0], np.diff(offsets)
+    sums = np.zeros(len(array), dtype=_U64)
+    if offsets[-1] > offsets[0]:
+        values = np.frombuffer(data, dtype=np.uint8)[offsets[0] : offsets[-1]].astype(_U64)
+        positions = np.arange(values.size, dtype=np.int64) - np.repeat(starts, lengths)
+        mixed = _splitmix64((positions.astype(_U64) << _U64(8)) | values)
+        filled = lengths > 0
+        sums[filled] = np.add.reduceat(mixed, starts[filled])
+    return _splitmix64(sums ^ _splitmix64(lengths.astype(_U64)))
+
+
+@dataclass
+class Moments:
+    """Count, mean and centered second moment; merged with Chan's parallel formula."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(np.square(values - batch_mean).sum())
+        self.merge(Moments(int(values.size), batch_mean, batch_m2))
+
+    def merge(self, other: "Moments") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float | None:
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+
+@dataclass
+class QuantileSketch:
+    """KLL-style compactor hierarchy: items at level ``h`` carry weight ``2**h``.
+
+    When a level exceeds ``capacity`` it is sorted and every other item (random
+    offset) is promoted to the next level, so memory is O(capacity * log(n)).
+    """
+
+    capacity: int = 1024
+    levels: list[np.ndarray] = field(default_factory=list)
+    seed: int = 0
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        self._push(0, values.astype(np.float64, copy=False))
+
+    def _push(self, level: int, values: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0, dtype=np.float64))
+        items = np.concatenate([self.levels[level], values])
+        if items.size <= self.capacity:
+            self.levels[level] = items
+            return
+        items.sort()
+        # An odd item stays behind so the promoted pairs keep total weight exact.
+        keep = items[-1:] if items.size % 2 else items[:0]
+        paired = items[: items.size - keep.size]
+        offset = int(np.random.default_rng(self.seed + level + items.size).integers(0, 2))
+        self.levels[level] = keep
+        self._push(level + 1, paired[offset::2])
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for level, values in enumerate(other.levels):
+            if values.size:
+                self._push(level, values)
+
+    def quantiles(self, qs: tuple[float, ...] = QUANTILES) -> list[float] | None:
+        if not any(values.size for values in self.levels):
+            return None
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(level.size, 2.0**index) for index, level in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        return values[order][np.minimum(positions, values.size - 1)].tolist()
+
+
+@dataclass
+class HyperLogLog:
+    precision: int = 14
+    registers: np.ndarray | None = None
+
+    def __post_init__(self) -> None:
+        if self.registers is None:
+            self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if hashes.size == 0:
+            return
+        p = self.precision
+        index = (hashes >> _U64(64 - p)).astype(np.intp)
+        remainder = hashes & _U64((1 << (64 - p)) - 1)
+        # bit_length via frexp is exact: remainder < 2**50 fits in a float64 mantissa.
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (64 - p) - bit_length + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+def _is_numeric(kind: pa.DataType) -> bool:
+    return pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_decimal(kind)
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    numeric: bool = False
+    count: int = 0
+    null_count: int = 0
+    min: object = None
+    max: object = None
+    moments: Moments = field(default_factory=Moments)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    distinct: HyperLogLog = field(default_factory=HyperLogLog)
+
+    def update(self, array: pa.Array) -> None:
+        self.count += len(array)
+        self.null_count += array.null_count
+        if array.null_count == len(array):
+            return
+        if not pa.types.is_binary(array.type):
+            bounds = pc.min_max(array)
+            self._merge_bounds(bounds["min"].as_py(), bounds["max"].as_py())
+        self.distinct.update(hash_array(array))
+        if self.numeric:
+            values = pc.drop_null(array).cast(pa.float64()).to_numpy(zero_copy_only=False)
+            values = values[np.isfinite(values)]
+            self.moments.update(values)
+            self.sketch.update(values)
+
+    def _merge_bounds(self, low, high) -> None:
+        if low is not None and (self.min is None or low < self.min):
+            self.min = low
+        if high is not None and (self.max is None or high > self.max):
+            self.max = high
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.count += other.count
+        self.null_count += other.null_count
+        self._merge_bounds(other.min, other.max)
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.distinct.merge(other.distinct)
+
+    def to_dict(self) -> dict:
+        payload = {
+            "dtype": self.dtype,
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": self.null_count / self.count if self.count else None,
+            "min": _jsonable(self.min),
+            "max": _jsonable(self.max),
+            "approx_distinct": self.distinct.estimate(),
+        }
+        if self.numeric:
+            variance = self.moments.variance
+            quantiles = self.sketch.quantiles()
+            payload.update(
+                {
+                    "mean": self.moments.mean if self.moments.count else None,
+                    "variance": variance,
+                    "std": variance**0.5 if variance is not None else None,
+                    "quantiles": (
+                        {f"p{round(q * 100):02d}": v for q, v in zip(QUANTILES, quantiles)}
+                        if quantiles is not None
+                        else None
+                    ),
+                }
+            )
+        return payload
+
+
+class TableProfile:
+    """Per-column statistics accumulated batch by batch; partial profiles merge."""
+
+    def __init__(self, schema: pa.Schema) -> None:
+        self.row_count = 0
+        self.columns = {
+            field.name: ColumnProfile(field.name, str(field.type), numeric=_is_numeric(field.type))
+            for field in schema
+        }
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        self.row_count += batch.num_rows
+        for name, column in zip(batch.schema.names, batch.columns):
+            self.columns[name].update(column)
+
+    def merge(self, other: "TableProfile") -> None:
+        self.row_count += other.row_count
+        for name, column in other.columns.items():
+            self.columns[name].merge(column)
+
+    def summary(self) -> dict:
+        return {
+            "row_count": self.row_count,
+            "columns": {name: column.to_dict() for name, column in self.columns.items()},
+        }
+
+
+def profile_parquet(path: str | Path, batch_size: int = 64 * 1024) -> TableProfile:
+    parquet = pq.ParquetFile(path)
+    profile = TableProfile(parquet.schema_arrow)
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        profile.update(batch)
+    return profile
+
+
+def profile_partitions(paths: list[str | Path], max_workers: int | None = None) -> TableProfile:
+    """Profile Parquet partitions in a process pool and merge the partial profiles."""
+    if not paths:
+        raise ValueError("No partitions to profile")
+    if max_workers == 1 or len(paths) == 1:
+        partials = [profile_parquet(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(profile_parquet, paths))
+    merged = partials[0]
+    for partial in partials[1:]:
+        merged.merge(partial)
+    return merged
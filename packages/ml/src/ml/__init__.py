@@ -1,2 +1,66 @@
-"""Training and evaluation libraries (placeholder)."""
+"""Training and evaluation libraries."""
 
+from ml.binning import BinMapper, FeatureSpec, parse_monotone
+from ml.compiled import CompiledEnsemble
+from ml.cv import CVResult, FoldResult, cross_validate
+from ml.dataset import (
+    BinnedDataset,
+    binning_key,
+    build_binned_dataset,
+    load_binned,
+    read_columns,
+    save_binned,
+)
+from ml.evaluation import (
+    EvaluationPolicy,
+    bootstrap_intervals,
+    evaluate,
+    evaluate_policy,
+    psi,
+)
+from ml.explain import ExplanationPolicy, TreeExplainer, reason_codes
+from ml.gbm import GBMModel, GBMParams, GBMTrainer
+from ml.registry import get_trainer
+from ml.scoring import iter_score_partitions, score_partition
+from ml.splits import SplitPolicy, Splits, load_splits, make_splits, save_splits, split_key
+from ml.sweep import SweepResult, SweepSpec, expand_trials, run_sweep
+
+__all__ = [
+    "BinMapper",
+    "BinnedDataset",
+    "CVResult",
+    "CompiledEnsemble",
+    "EvaluationPolicy",
+    "ExplanationPolicy",
+    "FeatureSpec",
+    "FoldResult",
+    "GBMModel",
+    "GBMParams",
+    "GBMTrainer",
+    "SplitPolicy",
+    "Splits",
+    "SweepResult",
+    "SweepSpec",
+    "TreeExplainer",
+    "binning_key",
+    "bootstrap_intervals",
+    "build_binned_dataset",
+    "cross_validate",
+    "evaluate",
+    "evaluate_policy",
+    "expand_trials",
+    "get_trainer",
+    "iter_score_partitions",
+    "load_binned",
+    "load_splits",
+    "make_splits",
+    "parse_monotone",
+    "psi",
+    "read_columns",
+    "reason_codes",
+    "run_sweep",
+    "save_binned",
+    "save_splits",
+    "score_partition",
+    "split_key",
+]
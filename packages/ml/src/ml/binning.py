@@ -0,0 +1,294 @@
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MISSING_BIN = 0
+MAX_BINS = 255
+
+_INCREASING = {"increasing", "inc", "up", "positive", "+", "+1", "1"}
+_DECREASING = {"decreasing", "dec", "down", "negative", "-", "-1"}
+_UNCONSTRAINED = {"", "none", "0"}
+_KINDS = ("auto", "num", "cat")
+
+
+def parse_monotone(value: str | None) -> int:
+    """Map ``Feature.monotonic_expectation`` to a constraint: +1, -1 or 0 (none)."""
+    if value is None:
+        return 0
+    text = value.strip().lower()
+    if text in _INCREASING:
+        return 1
+    if text in _DECREASING:
+        return -1
+    if text in _UNCONSTRAINED:
+        return 0
+    raise ValueError(f"Unsupported monotonic_expectation: {value}")
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    name: str
+    kind: str = "auto"
+    monotone: int = 0
+
+    def __post_init__(self) -> None:
+        if self.kind not in _KINDS:
+            raise ValueError(f"Unsupported feature kind for {self.name}: {self.kind}")
+        if self.monotone not in (-1, 0, 1):
+            raise ValueError(f"Monotone constraint for {self.name} must be -1, 0 or 1")
+
+
+def _is_categorical(kind: pa.DataType) -> bool:
+    return (
+        pa.types.is_string(kind)
+        or pa.types.is_large_string(kind)
+        or pa.types.is_dictionary(kind)
+        or pa.types.is_binary(kind)
+    )
+
+
+def _as_array(column: pa.Array | pa.ChunkedArray) -> pa.Array:
+    return column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+
+
+def _to_float(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """Numeric view of a column; nulls become NaN, dates and timestamps their integer value."""
+    array = _as_array(column)
+    kind = array.type
+    if pa.types.is_date32(kind):
+        array = array.cast(pa.int32())
+    elif pa.types.is_temporal(kind):
+        array = array.cast(pa.int64())
+    elif pa.types.is_boolean(kind):
+        array = array.cast(pa.int8())
+    return np.asarray(
+        array.cast(pa.float64()).fill_null(np.nan).to_numpy(zero_copy_only=False),
+        dtype=np.float64,
+    )
+
+
+def _temporal_type(text: str | None) -> pa.DataType | None:
+    """Inverse of ``str()`` for the date and timestamp types :class:`BinMapper` records."""
+    if text is None:
+        return None
+    if text.startswith("date32"):
+        return pa.date32()
+    if text.startswith("date64"):
+        return pa.date64()
+    match = re.fullmatch(r"timestamp\[(\w+)(?:, tz=(.+))?\]", text)
+    if match is None:
+        raise ValueError(f"Unsupported temporal type: {text}")
+    return pa.timestamp(match.group(1), tz=match.group(2))
+
+
+def _temporal_value(value: str | date | datetime, kind: pa.DataType) -> float:
+    """What :func:`_to_float` gives ``value`` in a column of ``kind``; strings are ISO 8601."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if pa.types.is_date(kind) and isinstance(value, datetime):
+        value = value.date()
+    elif pa.types.is_timestamp(kind) and not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    return float(_to_float(pa.array([value], type=kind))[0])
+
+
+def _to_strings(column: pa.Array | pa.ChunkedArray) -> pa.Array:
+    array = _as_array(column)
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    return array if pa.types.is_string(array.type) else array.cast(pa.string())
+
+
+class BinMapper:
+    """Maps raw feature columns to compact ``uint8`` bin codes.
+
+    Code 0 is reserved for missing values. Numeric features get up to ``max_bins``
+    quantile bins (or one bin per distinct value when there are few); categorical
+    features keep their ``max_bins - 1`` most frequent categories, ordered by mean
+    target so that ordinal splits on the codes group similar categories. Unseen and
+    rare categories are treated as missing.
+    """
+
+    def __init__(self, features: list[FeatureSpec], max_bins: int = MAX_BINS) -> None:
+        if not 2 <= max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAX_BINS}")
+        self.features = list(features)
+        self.max_bins = max_bins
+        self.kinds: list[str] = [spec.kind for spec in self.features]
+        self.edges: list[np.ndarray | None] = [None] * len(self.features)
+        self.categories: list[list[str] | None] = [None] * len(self.features)
+        # Arrow date/timestamp type of numeric features fitted on temporal columns.
+        self.temporal: list[pa.DataType | None] = [None] * len(self.features)
+        self._lookups: dict[int, dict[str, int]] = {}
+
+    @property
+    def names(self) -> list[str]:
+        return [spec.name for spec in self.features]
+
+    @property
+    def monotone(self) -> np.ndarray:
+        pairs = zip(self.features, self.kinds)
+        return np.array([spec.monotone if kind == "num" else 0 for spec, kind in pairs], np.int8)
+
+    @property
+    def n_bins(self) -> np.ndarray:
+        """Bins per feature, including the missing bin."""
+        return np.array(
+            [
+                len(edges) + 2 if kind == "num" else len(categories) + 1
+                for kind, edges, categories in zip(self.kinds, self.edges, self.categories)
+            ],
+            dtype=np.int32,
+        )
+
+    def fit(self, table: pa.Table, target: np.ndarray | None = None) -> "BinMapper":
+        for index, spec in enumerate(self.features):
+            column = table.column(spec.name)
+            kind = spec.kind
+            if kind == "auto":
+                kind = "cat" if _is_categorical(column.type) else "num"
+            self.kinds[index] = kind
+            if kind == "num":
+                if pa.types.is_date(column.type) or pa.types.is_timestamp(column.type):
+                    self.temporal[index] = column.type
+                self.edges[index] = self._numeric_edges(_to_float(column))
+            else:
+                self.categories[index] = self._ordered_categories(_to_strings(column), target)
+        return self
+
+    def _numeric_edges(self, values: np.ndarray) -> np.ndarray:
+        values = values[~np.isnan(values)]
+        distinct = np.unique(values)
+        if distinct.size <= self.max_bins:
+            return (distinct[:-1] + distinct[1:]) / 2.0
+        quantiles = np.linspace(0.0, 1.0, self.max_bins + 1)[1:-1]
+        return np.unique(np.quantile(values, quantiles, method="inverted_cdf"))[: self.max_bins - 1]
+
+    def _ordered_categories(self, values: pa.Array, target: np.ndarray | None) -> list[str]:
+        encoded = pc.dictionary_encode(values)
+        indices = np.asarray(encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False))
+        valid = indices >= 0
+        dictionary = encoded.dictionary.to_pylist()
+        counts = np.bincount(indices[valid], minlength=len(dictionary))
+        keep = np.argsort(-counts, kind="stable")[: self.max_bins - 1]
+        keep = keep[counts[keep] > 0]
+        if target is not None and keep.size:
+            # Smoothed mean target towards the global mean so tiny categories don't dominate.
+            sums = np.bincount(indices[valid], weights=target[valid], minlength=len(dictionary))
+            prior = float(target[valid].mean()) if valid.any() else 0.0
+            means = (sums[keep] + prior * 10.0) / (counts[keep] + 10.0)
+            keep = keep[np.argsort(means, kind="stable")]
+        return [dictionary[i] for i in keep]
+
+    def transform(self, table: pa.Table) -> np.ndarray:
+        """Bin codes as an ``(n_rows, n_features)`` column-major ``uint8`` matrix."""
+        codes = np.empty((table.num_rows, len(self.features)), dtype=np.uint8, order="F")
+        self.transform_into(table, codes)
+        return codes
+
+    def transform_into(self, table: pa.Table, out: np.ndarray) -> None:
+        for index, spec in enumerate(self.features):
+            column = table.column(spec.name)
+            if self.kinds[index] == "num":
+                values = _to_float(column)
+                binned = np.searchsorted(self.edges[index], values, side="left") + 1
+                binned[np.isnan(values)] = MISSING_BIN
+                out[:, index] = binned
+            else:
+                out[:, index] = self._category_codes(column, index)
+
+    def _category_codes(self, column, index: int) -> np.ndarray:
+        positions = pc.index_in(
+            _to_strings(column), value_set=pa.array(self.categories[index], type=pa.string())
+        )
+        codes = pc.add(positions, 1).fill_null(MISSING_BIN)
+        return np.asarray(codes.to_numpy(zero_copy_only=False))
+
+    def encode(self, table: pa.Table) -> np.ndarray:
+        """Raw-space ``float64`` matrix for scoring: values, category codes, NaN when missing."""
+        encoded = np.empty((table.num_rows, len(self.features)), dtype=np.float64)
+        for index, spec in enumerate(self.features):
+            column = table.column(spec.name)
+            if self.kinds[index] == "num":
+                encoded[:, index] = _to_float(column)
+            else:
+                codes = self._category_codes(column, index).astype(np.float64)
+                codes[codes == MISSING_BIN] = np.nan
+                encoded[:, index] = codes
+        return encoded
+
+    def encode_records(self, records: Sequence[Mapping]) -> np.ndarray:
+        """Same as :meth:`encode` for a few dict rows, without building an Arrow table.
+
+        Date and timestamp features accept ISO 8601 strings (as JSON carries them),
+        ``date``/``datetime`` objects or the already-encoded integer.
+        """
+        encoded = np.full((len(records), len(self.features)), np.nan)
+        for index, spec in enumerate(self.features):
+            name = spec.name
+            if self.kinds[index] == "num":
+                temporal = self.temporal[index]
+                for row, record in enumerate(records):
+                    value = record.get(name)
+                    if value is None:
+                        continue
+                    if temporal is not None and isinstance(value, str | date):
+                        encoded[row, index] = _temporal_value(value, temporal)
+                    else:
+                        encoded[row, index] = float(value)
+            else:
+                lookup = self._category_lookup(index)
+                for row, record in enumerate(records):
+                    value = record.get(name)
+                    if value is not None and str(value) in lookup:
+                        encoded[row, index] = lookup[str(value)]
+        return encoded
+
+    def _category_lookup(self, index: int) -> dict[str, int]:
+        if index not in self._lookups:
+            categories = self.categories[index]
+            self._lookups[index] = {value: code for code, value in enumerate(categories, 1)}
+        return self._lookups[index]
+
+    def threshold(self, feature: int, bin_code: int) -> float:
+        """Raw-space threshold equivalent to ``code <= bin_code`` for a non-missing value."""
+        if self.kinds[feature] == "num":
+            return float(self.edges[feature][bin_code - 1])
+        return float(bin_code)
+
+    def to_dict(self) -> dict:
+        return {
+            "max_bins": self.max_bins,
+            "features": [
+                {
+                    "name": spec.name,
+                    "kind": kind,
+                    "monotone": spec.monotone,
+                    "edges": edges.tolist() if edges is not None else None,
+                    "categories": categories,
+                    "temporal": str(temporal) if temporal is not None else None,
+                }
+                for spec, kind, edges, categories, temporal in zip(
+                    self.features, self.kinds, self.edges, self.categories, self.temporal
+                )
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "BinMapper":
+        items = payload["features"]
+        mapper = cls(
+            [FeatureSpec(item["name"], item["kind"], item["monotone"]) for item in items],
+            max_bins=payload["max_bins"],
+        )
+        for index, item in enumerate(items):
+            if item["edges"] is not None:
+                mapper.edges[index] = np.asarray(item["edges"], dtype=np.float64)
+            mapper.categories[index] = item["categories"]
+            mapper.temporal[index] = _temporal_type(item.get("temporal"))
+        return mapper
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml.gbm import GBMModel, Tree
+
+_CHUNK_ELEMENTS = 1 << 20
+
+
+def _depth(tree: Tree) -> int:
+    depth = np.zeros(tree.feature.size, dtype=np.int32)
+    # Children are always appended after their parent, so one forward pass suffices.
+    for node in np.flatnonzero(tree.feature >= 0):
+        depth[tree.left[node]] = depth[tree.right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+@dataclass(frozen=True)
+class CompiledEnsemble:
+    """All trees of a model concatenated into flat arrays for vectorized traversal.
+
+    Leaves point to themselves, so every row walks exactly ``depth`` steps in every
+    tree at once; there is no per-tree Python loop on the scoring path. Children
+    are interleaved (``children[2 * node + go_right]``) so each step is one gather.
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    missing_right: np.ndarray
+    children: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    depth: int
+    base_score: float
+    binary: bool
+
+    @classmethod
+    def from_model(cls, model: GBMModel) -> "CompiledEnsemble":
+        parts: dict[str, list[np.ndarray]] = {
+            name: [] for name in ("feature", "threshold", "missing_right", "children", "value")
+        }
+        roots, offset, depth = [], 0, 0
+        for tree in model.trees:
+            size = tree.feature.size
+            leaf = tree.feature < 0
+            own = np.arange(offset, offset + size)
+            left = np.where(leaf, own, tree.left + offset)
+            right = np.where(leaf, own, tree.right + offset)
+            parts["feature"].append(np.where(leaf, 0, tree.feature))
+            parts["threshold"].append(np.where(leaf, 0.0, tree.threshold))
+            parts["missing_right"].append(~tree.default_left)
+            parts["children"].append(np.stack([left, right], axis=1).ravel())
+            parts["value"].append(tree.value)
+            roots.append(offset)
+            offset += size
+            depth = max(depth, _depth(tree))
+        arrays = {
+            name: np.concatenate(values) if values else np.empty(0)
+            for name, values in parts.items()
+        }
+        return cls(
+            feature=arrays["feature"].astype(np.intp),
+            threshold=arrays["threshold"].astype(np.float64),
+            missing_right=arrays["missing_right"].astype(bool),
+            children=arrays["children"].astype(np.intp),
+            value=arrays["value"].astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=depth,
+            base_score=model.base_score,
+            binary=model.params.objective == "binary",
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            getattr(self, name).nbytes
+            for name in ("feature", "threshold", "missing_right", "children", "value", "roots")
+        )
+
+    def raw_score(self, encoded: np.ndarray) -> np.ndarray:
+        n_rows, n_features = encoded.shape
+        score = np.full(n_rows, self.base_score)
+        if not self.roots.size:
+            return score
+        chunk = max(1, _CHUNK_ELEMENTS // self.roots.size)
+        for start in range(0, n_rows, chunk):
+            block = np.ascontiguousarray(encoded[start : start + chunk], dtype=np.float64)
+            flat = block.ravel()
+            base = (np.arange(block.shape[0]) * n_features)[:, None]
+            node = np.broadcast_to(self.roots, (block.shape[0], self.roots.size)).copy()
+            for _ in range(self.depth):
+                x = flat.take(base + self.feature.take(node))
+                go_right = x > self.threshold.take(node)
+                missing = np.isnan(x)
+                if missing.any():
+                    go_right = np.where(missing, self.missing_right.take(node), go_right)
+                node = self.children.take(2 * node + go_right)
+            score[start : start + chunk] += self.value.take(node).sum(axis=1)
+        return score
+
+    def predict(self, encoded: np.ndarray) -> np.ndarray:
+        score = self.raw_score(encoded)
+        return 1.0 / (1.0 + np.exp(-score)) if self.binary else score
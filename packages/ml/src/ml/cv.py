@@ -0,0 +1,172 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from ml.binning import BinMapper
+from ml.dataset import BinnedDataset
+from ml.registry import get_trainer
+from ml.splits import Splits, fold_rows
+
+_attached: tuple[tuple, BinnedDataset, np.ndarray] | None = None
+
+
+@dataclass(frozen=True)
+class FoldResult:
+    fold: int
+    model_path: Path
+    metrics: dict[str, float]
+
+
+@dataclass
+class CVResult:
+    folds: list[FoldResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> dict[str, float]:
+        """Mean and standard deviation of every per-fold metric, as ``cv_<name>_mean/std``."""
+        summary: dict[str, float] = {"cv_folds": float(len(self.folds)), "cv_seconds": self.seconds}
+        names = sorted({name for result in self.folds for name in result.metrics})
+        for name in names:
+            values = np.array(
+                [result.metrics[name] for result in self.folds if name in result.metrics]
+            )
+            summary[f"cv_{name}_mean"] = float(values.mean())
+            summary[f"cv_{name}_std"] = float(values.std())
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            "seconds": self.seconds,
+            "summary": self.summary(),
+            "folds": [
+                {
+                    "fold": result.fold,
+                    "model": f"{result.model_path.parent.name}/{result.model_path.name}",
+                    **result.metrics,
+                }
+                for result in sorted(self.folds, key=lambda result: result.fold)
+            ],
+        }
+
+
+def share_arrays(
+    data: BinnedDataset, fold_ids: np.ndarray, workdir: Path
+) -> tuple[str, str, str]:
+    """Paths of on-disk copies of the codes, target and fold ids that workers can mmap.
+
+    A memory-mapped matrix (as returned by ``load_binned``) is reused in place;
+    anything in memory is written to ``workdir`` once.
+    """
+    paths = []
+    for name, array in (("codes", data.codes), ("target", data.target), ("folds", fold_ids)):
+        source = getattr(array, "filename", None)
+        if source and str(source).endswith(".npy"):
+            mapped = np.load(source, mmap_mode="r")
+            if mapped.shape == array.shape and mapped.dtype == array.dtype:
+                paths.append(str(source))
+                continue
+        path = workdir / f"{name}.npy"
+        np.save(path, np.asarray(array))
+        paths.append(str(path))
+    return tuple(paths)
+
+
+def attach_shared(
+    codes: str, target: str, folds: str, mapper: dict
+) -> tuple[BinnedDataset, np.ndarray]:
+    # Each worker maps the shared files once, in the pool initializer or on first use.
+    global _attached
+    key = (codes, target, folds)
+    if _attached is None or _attached[0] != key:
+        data = BinnedDataset(
+            codes=np.load(codes, mmap_mode="r"),
+            target=np.load(target, mmap_mode="r"),
+            mapper=BinMapper.from_dict(mapper),
+        )
+        _attached = (key, data, np.load(folds, mmap_mode="r"))
+    return _attached[1], _attached[2]
+
+
+def _fit_fold(args: tuple) -> tuple[int, str, dict[str, float]]:
+    fold, files, mapper, model_family, model_params, output_path = args
+    started = time.perf_counter()
+    data, fold_ids = attach_shared(*files, mapper)
+    train_rows, valid_rows = fold_rows(fold_ids, fold)
+    model = get_trainer(model_family, model_params).fit(data, train_rows, valid_rows)
+    model.save(output_path)
+    metrics = {
+        "train_rows": float(train_rows.size),
+        "valid_rows": float(valid_rows.size),
+        "train_loss": model.history["train_loss"][len(model.trees) - 1],
+        # Loss of the saved model, which early stopping may have truncated.
+        "valid_loss": model.history["valid_loss"][len(model.trees) - 1],
+        "best_iteration": float(model.history["best_iteration"]),
+        "seconds": time.perf_counter() - started,
+    }
+    return fold, output_path, metrics
+
+
+def cross_validate(
+    data: BinnedDataset,
+    splits: Splits,
+    model_family: str,
+    model_params: dict,
+    output_dir: str | Path,
+    *,
+    max_workers: int | None = None,
+    n_threads: int | None = None,
+) -> CVResult:
+    """Train one model per fold of ``splits`` in a process pool.
+
+    Workers memory-map a single on-disk copy of the binned matrix, target and fold
+    ids instead of receiving pickled arrays, so memory stays flat as folds are
+    added. Unless ``model_params`` pins ``n_threads``, ``n_threads`` (default: all
+    cores) is divided between the concurrently running folds. Models are written to
+    ``output_dir/fold-{i:05d}/model.json`` and metrics to ``output_dir/metrics.json``.
+    """
+    if splits.n_folds < 2:
+        raise ValueError("Cross-validation requires a split policy with n_folds")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    budget = n_threads or os.cpu_count() or 1
+    workers = max(1, min(splits.n_folds, max_workers or budget))
+    params = dict(model_params)
+    if params.get("n_threads") is None:
+        params["n_threads"] = max(1, budget // workers)
+    # Validate parameters once in the parent before forking workers.
+    get_trainer(model_family, params)
+
+    files = share_arrays(data, splits.fold_ids, output_dir)
+    mapper = data.mapper.to_dict()
+    tasks = []
+    for fold in range(splits.n_folds):
+        path = output_dir / f"fold-{fold:05d}" / "model.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tasks.append((fold, files, mapper, model_family, params, str(path)))
+
+    started = time.perf_counter()
+    result = CVResult()
+    try:
+        if workers == 1:
+            for fold, path, metrics in map(_fit_fold, tasks):
+                result.folds.append(FoldResult(fold, Path(path), metrics))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=attach_shared, initargs=(*files, mapper)
+            ) as pool:
+                for future in as_completed([pool.submit(_fit_fold, task) for task in tasks]):
+                    fold, path, metrics = future.result()
+                    result.folds.append(FoldResult(fold, Path(path), metrics))
+    finally:
+        for path in files:
+            if Path(path).parent == output_dir:
+                Path(path).unlink(missing_ok=True)
+    result.folds.sort(key=lambda item: item.fold)
+    result.seconds = time.perf_counter() - started
+    (output_dir / "metrics.json").write_text(json.dumps(result.to_dict(), indent=2))
+    return result
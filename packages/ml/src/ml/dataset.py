@@ -0,0 +1,156 @@
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ml.binning import MAX_BINS, BinMapper, FeatureSpec
+
+BINNED_FORMAT = "talaty-binned/1"
+BINNED_FILES = ("codes.npy", "target.npy", "bins.json")
+
+_DEFAULT_SAMPLE_ROWS = 200_000
+
+
+@dataclass
+class BinnedDataset:
+    """Pre-binned feature matrix shared by every boosting round, fold and trial."""
+
+    codes: np.ndarray
+    target: np.ndarray
+    mapper: BinMapper
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.codes.shape[0])
+
+    @property
+    def n_features(self) -> int:
+        return int(self.codes.shape[1])
+
+
+def target_values(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    if pa.types.is_boolean(column.type):
+        column = column.cast(pa.int8())
+    return np.asarray(column.cast(pa.float64()).to_numpy(zero_copy_only=False), dtype=np.float64)
+
+
+def _read(path: str | Path, columns: list[str], target: str) -> pa.Table:
+    parquet = pq.ParquetFile(path)
+    try:
+        table = parquet.read(columns=columns)
+    finally:
+        parquet.close()
+    return table.filter(pc.is_valid(table.column(target)))
+
+
+def read_columns(paths: list[str | Path], columns: list[str], target: str) -> pa.Table:
+    """Read ``columns`` in the row order of :func:`build_binned_dataset` (null targets dropped)."""
+    names = list(dict.fromkeys([*columns, target]))
+    return pa.concat_tables([_read(path, names, target) for path in paths])
+
+
+def build_binned_dataset(
+    paths: list[str | Path],
+    features: list[FeatureSpec],
+    target: str,
+    *,
+    max_bins: int = MAX_BINS,
+    sample_rows: int = _DEFAULT_SAMPLE_ROWS,
+    seed: int = 0,
+) -> BinnedDataset:
+    """Bin Parquet partitions into a single column-major ``uint8`` matrix.
+
+    Bin edges are fitted on a uniform sample of at most ``sample_rows`` rows drawn
+    across all partitions; the partitions are then binned one at a time, so peak
+    memory is the code matrix plus one decoded partition. Rows with a null target
+    are dropped.
+    """
+    if not paths:
+        raise ValueError("No partitions to bin")
+    columns = [spec.name for spec in features] + [target]
+    total = 0
+    for path in paths:
+        parquet = pq.ParquetFile(path)
+        total += parquet.metadata.num_rows
+        parquet.close()
+
+    rng = np.random.default_rng(seed)
+    fraction = min(1.0, sample_rows / max(total, 1))
+    samples = []
+    for path in paths:
+        table = _read(path, columns, target)
+        if fraction < 1.0:
+            take = rng.random(table.num_rows) < fraction
+            table = table.filter(pa.array(take))
+        samples.append(table)
+    sample = pa.concat_tables(samples)
+    mapper = BinMapper(features, max_bins=max_bins).fit(sample, target_values(sample[target]))
+    del samples, sample
+
+    codes = np.empty((total, len(features)), dtype=np.uint8, order="F")
+    labels = np.empty(total, dtype=np.float64)
+    offset = 0
+    for path in paths:
+        table = _read(path, columns, target)
+        rows = table.num_rows
+        mapper.transform_into(table, codes[offset : offset + rows])
+        labels[offset : offset + rows] = target_values(table[target])
+        offset += rows
+    return BinnedDataset(codes=codes[:offset], target=labels[:offset], mapper=mapper)
+
+
+def binning_key(
+    features: list[FeatureSpec],
+    target: str,
+    max_bins: int = MAX_BINS,
+    sample_rows: int = _DEFAULT_SAMPLE_ROWS,
+) -> str:
+    """Short hash of everything besides the data that determines the binned matrix."""
+    canonical = json.dumps(
+        {
+            "features": [asdict(spec) for spec in features],
+            "target": target,
+            "max_bins": max_bins,
+            "sample_rows": sample_rows,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def save_binned(data: BinnedDataset, directory: str | Path, metadata: dict | None = None) -> dict:
+    """Write ``codes.npy`` (column-major), ``target.npy`` and ``bins.json`` to ``directory``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {name: directory / name for name in BINNED_FILES}
+    np.save(paths["codes.npy"], np.asfortranarray(data.codes))
+    np.save(paths["target.npy"], np.ascontiguousarray(data.target))
+    bins = {
+        "format": BINNED_FORMAT,
+        "n_rows": data.n_rows,
+        "n_features": data.n_features,
+        "bin_mapper": data.mapper.to_dict(),
+        **(metadata or {}),
+    }
+    paths["bins.json"].write_text(json.dumps(bins, indent=2))
+    return paths
+
+
+def load_binned(paths: Mapping[str, str | Path], mmap: bool = True) -> BinnedDataset:
+    """Load a matrix written by :func:`save_binned`, memory-mapped read-only by default."""
+    bins = json.loads(Path(paths["bins.json"]).read_text())
+    if bins.get("format") != BINNED_FORMAT:
+        raise ValueError(f"Unsupported binned matrix format: {bins.get('format')}")
+    mode = "r" if mmap else None
+    codes = np.load(paths["codes.npy"], mmap_mode=mode)
+    target = np.load(paths["target.npy"], mmap_mode=mode)
+    if codes.shape != (bins["n_rows"], bins["n_features"]) or target.shape != (bins["n_rows"],):
+        raise ValueError("Binned matrix does not match bins.json")
+    return BinnedDataset(codes=codes, target=target, mapper=BinMapper.from_dict(bins["bin_mapper"]))
@@ -0,0 +1,302 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+_PSI_EPS = 1e-6
+_BOOTSTRAP_CHUNK = 64
+
+
+@dataclass(frozen=True)
+class EvaluationPolicy:
+    """Interpreted ``RunSpec.evaluation_policy``.
+
+    ``n_bins`` sets the rank buckets of the lift/gains table, ``calibration_bins``
+    those of the calibration curve, and ``psi_bins`` the reference-quantile buckets
+    for PSI. ``bootstrap`` resamples (0 disables) give two-sided ``confidence``
+    intervals, computed on a grid of ``grid_bins`` score quantiles.
+    """
+
+    n_bins: int = 10
+    calibration_bins: int = 10
+    psi_bins: int = 10
+    bootstrap: int = 0
+    confidence: float = 0.95
+    grid_bins: int = 10_000
+    seed: int = 0
+    n_threads: int | None = None
+
+    def __post_init__(self) -> None:
+        if min(self.n_bins, self.calibration_bins, self.psi_bins, self.grid_bins) < 2:
+            raise ValueError("Bin counts must be at least 2")
+        if self.bootstrap < 0:
+            raise ValueError("bootstrap must be non-negative")
+        if not 0.0 < self.confidence < 1.0:
+            raise ValueError("confidence must be in (0, 1)")
+
+    @classmethod
+    def from_dict(cls, policy: dict) -> "EvaluationPolicy":
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(policy) - known)
+        if unknown:
+            raise ValueError(f"Unknown evaluation_policy keys: {', '.join(unknown)}")
+        return cls(**policy)
+
+
+def _check(y: np.ndarray, score: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    y = np.asarray(y, dtype=np.float64)
+    score = np.asarray(score, dtype=np.float64)
+    if y.shape != score.shape or y.ndim != 1:
+        raise ValueError("y and score must be 1-D arrays of the same length")
+    if not np.isin(y, (0.0, 1.0)).all():
+        raise ValueError("Evaluation requires a 0/1 target")
+    positives = int(y.sum())
+    if positives == 0 or positives == y.size:
+        raise ValueError("Evaluation requires both classes")
+    return y, score
+
+
+def _sort_desc(y: np.ndarray, score: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    y, score = _check(y, score)
+    order = np.argsort(-score, kind="stable")
+    return y[order], score[order]
+
+
+def _rank_buckets(n_rows: int, n_bins: int) -> np.ndarray:
+    """Start offsets of ``n_bins`` equal-count buckets over ``n_rows`` sorted rows."""
+    starts = np.unique(np.linspace(0, n_rows, n_bins + 1)[:-1].astype(np.int64))
+    return starts[starts < n_rows]
+
+
+def evaluate(
+    y: np.ndarray,
+    score: np.ndarray,
+    *,
+    reference: np.ndarray | None = None,
+    n_bins: int = 10,
+    calibration_bins: int = 10,
+    psi_bins: int = 10,
+) -> dict:
+    """Ranking, calibration and stability metrics from one descending sort of ``score``.
+
+    Returns AUC, Gini, KS, Brier score, a lift/gains table and a calibration curve,
+    plus PSI against ``reference`` scores (e.g. the training rows) when given.
+    """
+    return _evaluate_sorted(
+        *_sort_desc(y, score),
+        reference=reference,
+        n_bins=n_bins,
+        calibration_bins=calibration_bins,
+        psi_bins=psi_bins,
+    )
+
+
+def _evaluate_sorted(
+    y_sorted: np.ndarray,
+    score_sorted: np.ndarray,
+    *,
+    reference: np.ndarray | None,
+    n_bins: int,
+    calibration_bins: int,
+    psi_bins: int,
+) -> dict:
+    n_rows = y_sorted.size
+    positives = y_sorted.sum()
+    negatives = n_rows - positives
+
+    # Cumulative counts at the last row of every group of tied scores.
+    cut = np.r_[np.flatnonzero(score_sorted[1:] != score_sorted[:-1]), n_rows - 1]
+    tp = np.cumsum(y_sorted)[cut]
+    fp = cut + 1 - tp
+    tpr = np.r_[0.0, tp / positives]
+    fpr = np.r_[0.0, fp / negatives]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2.0)
+
+    metrics = {
+        "rows": n_rows,
+        "event_rate": float(positives / n_rows),
+        "auc": auc,
+        "gini": 2.0 * auc - 1.0,
+        "ks": float(np.max(np.abs(tpr - fpr))),
+        "brier": float(np.mean((score_sorted - y_sorted) ** 2)),
+        "lift": _lift_table(y_sorted, score_sorted, n_bins),
+        "calibration": _calibration(y_sorted, score_sorted, calibration_bins),
+    }
+    gaps = [
+        row["rows"] * abs(row["mean_score"] - row["event_rate"]) for row in metrics["calibration"]
+    ]
+    metrics["calibration_error"] = float(sum(gaps) / n_rows)
+    if reference is not None:
+        metrics["psi"] = psi(reference, score_sorted, psi_bins)
+    return metrics
+
+
+def _lift_table(y_sorted: np.ndarray, score_sorted: np.ndarray, n_bins: int) -> list[dict]:
+    starts = _rank_buckets(y_sorted.size, n_bins)
+    rows = np.diff(np.r_[starts, y_sorted.size])
+    events = np.add.reduceat(y_sorted, starts)
+    overall = y_sorted.sum() / y_sorted.size
+    cum_rows, cum_events = np.cumsum(rows), np.cumsum(events)
+    table = []
+    for index, start in enumerate(starts):
+        rate = events[index] / rows[index]
+        cum_rate = cum_events[index] / cum_rows[index]
+        table.append(
+            {
+                "bin": index + 1,
+                "rows": int(rows[index]),
+                "events": int(events[index]),
+                "event_rate": float(rate),
+                "min_score": float(score_sorted[start + rows[index] - 1]),
+                "max_score": float(score_sorted[start]),
+                "cum_rows_share": float(cum_rows[index] / y_sorted.size),
+                "gain": float(cum_events[index] / y_sorted.sum()),
+                "lift": float(rate / overall),
+                "cum_lift": float(cum_rate / overall),
+            }
+        )
+    return table
+
+
+def _calibration(y_sorted: np.ndarray, score_sorted: np.ndarray, n_bins: int) -> list[dict]:
+    starts = _rank_buckets(y_sorted.size, n_bins)
+    rows = np.diff(np.r_[starts, y_sorted.size])
+    events = np.add.reduceat(y_sorted, starts)
+    scores = np.add.reduceat(score_sorted, starts)
+    # Report from the lowest scores up, the usual orientation for reliability curves.
+    return [
+        {
+            "rows": int(rows[index]),
+            "mean_score": float(scores[index] / rows[index]),
+            "event_rate": float(events[index] / rows[index]),
+        }
+        for index in reversed(range(starts.size))
+    ]
+
+
+def psi(expected: np.ndarray, actual: np.ndarray, n_bins: int = 10) -> float:
+    """Population stability index of ``actual`` against quantile buckets of ``expected``."""
+    expected = np.sort(np.asarray(expected, dtype=np.float64))
+    actual = np.asarray(actual, dtype=np.float64)
+    if not expected.size or not actual.size:
+        raise ValueError("PSI requires non-empty score arrays")
+    edges = np.unique(expected[_rank_buckets(expected.size, n_bins)[1:]])
+    expected_share = np.bincount(
+        np.searchsorted(edges, expected, side="right"), minlength=edges.size + 1
+    ) / expected.size
+    actual_share = np.bincount(
+        np.searchsorted(edges, actual, side="right"), minlength=edges.size + 1
+    ) / actual.size
+    expected_share = np.maximum(expected_share, _PSI_EPS)
+    actual_share = np.maximum(actual_share, _PSI_EPS)
+    return float(np.sum((actual_share - expected_share) * np.log(actual_share / expected_share)))
+
+
+def bootstrap_intervals(
+    y: np.ndarray,
+    score: np.ndarray,
+    *,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    grid_bins: int = 10_000,
+    seed: int = 0,
+    n_threads: int | None = None,
+) -> dict[str, dict[str, float]]:
+    """Stratified bootstrap intervals for AUC, Gini, KS and Brier score.
+
+    Positives and negatives are resampled separately, so every resample keeps the
+    holdout's event rate. Rows are collapsed once onto ``grid_bins`` score
+    quantiles (from a single sort); each resample then draws multinomial counts per
+    class over that grid, so its cost is independent of the number of rows. Rows
+    sharing a grid cell count as tied, which moves AUC by at most the within-cell
+    discordance. Resamples run in chunks on ``n_threads`` threads.
+    """
+    return _bootstrap_sorted(
+        *_sort_desc(y, score),
+        n_resamples=n_resamples,
+        confidence=confidence,
+        grid_bins=grid_bins,
+        seed=seed,
+        n_threads=n_threads,
+    )
+
+
+def _bootstrap_sorted(
+    y_sorted: np.ndarray,
+    score_sorted: np.ndarray,
+    *,
+    n_resamples: int,
+    confidence: float,
+    grid_bins: int,
+    seed: int,
+    n_threads: int | None,
+) -> dict[str, dict[str, float]]:
+    starts = _rank_buckets(y_sorted.size, grid_bins)
+    pos_counts = np.add.reduceat(y_sorted, starts)
+    neg_counts = np.diff(np.r_[starts, y_sorted.size]) - pos_counts
+    # Per-cell mean squared error for each class, so Brier follows the resampled counts.
+    pos_sse = np.add.reduceat(y_sorted * (score_sorted - 1.0) ** 2, starts)
+    neg_sse = np.add.reduceat((1.0 - y_sorted) * score_sorted**2, starts)
+    pos_err = np.divide(pos_sse, pos_counts, out=np.zeros_like(pos_sse), where=pos_counts > 0)
+    neg_err = np.divide(neg_sse, neg_counts, out=np.zeros_like(neg_sse), where=neg_counts > 0)
+    n_pos, n_neg = int(pos_counts.sum()), int(neg_counts.sum())
+
+    def chunk(args: tuple[np.random.SeedSequence, int]) -> np.ndarray:
+        seed_seq, size = args
+        rng = np.random.default_rng(seed_seq)
+        pos = rng.multinomial(n_pos, pos_counts / n_pos, size=size).astype(np.float64)
+        neg = rng.multinomial(n_neg, neg_counts / n_neg, size=size).astype(np.float64)
+        cum_pos = np.cumsum(pos, axis=1)
+        cum_neg = np.cumsum(neg, axis=1)
+        auc = (neg * (cum_pos - 0.5 * pos)).sum(axis=1) / (n_pos * n_neg)
+        ks = np.abs(cum_pos / n_pos - cum_neg / n_neg).max(axis=1)
+        brier = (pos @ pos_err + neg @ neg_err) / (n_pos + n_neg)
+        return np.stack([auc, 2.0 * auc - 1.0, ks, brier], axis=1)
+
+    starts = range(0, n_resamples, _BOOTSTRAP_CHUNK)
+    sizes = [min(_BOOTSTRAP_CHUNK, n_resamples - start) for start in starts]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    threads = max(1, min(len(sizes), n_threads or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        samples = np.concatenate(list(pool.map(chunk, zip(seeds, sizes, strict=True))))
+
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(samples, [alpha, 1.0 - alpha], axis=0)
+    std = samples.std(axis=0)
+    return {
+        name: {"low": float(low[index]), "high": float(high[index]), "std": float(std[index])}
+        for index, name in enumerate(("auc", "gini", "ks", "brier"))
+    }
+
+
+def evaluate_policy(
+    policy: EvaluationPolicy,
+    y: np.ndarray,
+    score: np.ndarray,
+    reference: np.ndarray | None = None,
+) -> dict:
+    """:func:`evaluate` configured by ``policy``, with bootstrap intervals when enabled.
+
+    Both share one sort of ``score``.
+    """
+    y_sorted, score_sorted = _sort_desc(y, score)
+    metrics = _evaluate_sorted(
+        y_sorted,
+        score_sorted,
+        reference=reference,
+        n_bins=policy.n_bins,
+        calibration_bins=policy.calibration_bins,
+        psi_bins=policy.psi_bins,
+    )
+    if policy.bootstrap:
+        metrics["intervals"] = _bootstrap_sorted(
+            y_sorted,
+            score_sorted,
+            n_resamples=policy.bootstrap,
+            confidence=policy.confidence,
+            grid_bins=policy.grid_bins,
+            seed=policy.seed,
+            n_threads=policy.n_threads,
+        )
+    return metrics
@@ -0,0 +1,324 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from ml.gbm import GBMModel, Tree
+
+_CHUNK_ELEMENTS = 1 << 22
+# Each leaf whose path has D distinct features adds D * 2**D float64s to the table.
+MAX_TABLE_BYTES = 1 << 30
+
+
+@dataclass(frozen=True)
+class ExplanationPolicy:
+    """Interpreted ``RunSpec.artifact_policy["explanations"]``.
+
+    Each scored row gets the ``top_n`` features with the largest contributions
+    toward a higher score, skipping contributions at or below
+    ``min_contribution``. ``contributions`` also writes every feature's
+    contribution.
+    """
+
+    top_n: int = 4
+    min_contribution: float = 0.0
+    contributions: bool = False
+    n_threads: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.top_n < 1:
+            raise ValueError("top_n must be positive")
+        if self.n_threads is not None and self.n_threads < 1:
+            raise ValueError("n_threads must be positive")
+
+    @classmethod
+    def from_dict(cls, policy: dict | None) -> "ExplanationPolicy":
+        policy = policy or {}
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(policy) - known)
+        if unknown:
+            raise ValueError(f"Unknown explanations keys: {', '.join(unknown)}")
+        return cls(**policy)
+
+
+def _leaf_paths(tree: Tree) -> list[tuple[int, list[tuple[int, bool]]]]:
+    """``(leaf, [(node, went_right), ...])`` for every root-to-leaf path."""
+    paths = []
+    stack: list[tuple[int, list[tuple[int, bool]]]] = [(0, [])]
+    while stack:
+        node, path = stack.pop()
+        if tree.feature[node] < 0:
+            paths.append((node, path))
+            continue
+        stack.append((int(tree.left[node]), [*path, (node, False)]))
+        stack.append((int(tree.right[node]), [*path, (node, True)]))
+    return paths
+
+
+def _shap_tables(zero: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """Contribution of each path feature for every pattern of satisfied conditions.
+
+    ``zero`` holds the cover fraction of each of the ``D`` distinct features on
+    ``m`` paths of the same length. Bit ``d`` of pattern ``p`` says whether a row
+    satisfies every split on feature ``d``. With the path-dependent value function
+    ``f(S) = value * prod_{j in S} one_j * prod_{j not in S} zero_j``, feature ``i``
+    receives ``value * (one_i - zero_i) * sum_k w_k * e_k``. ``e_k`` is the degree-``k``
+    coefficient of ``prod_{j != i} (zero_j + one_j t)`` and ``w_k = k! (D-1-k)! / D!``.
+    Returns an ``(m, 2**D, D)`` table.
+    """
+    m, depth = zero.shape
+    ones = ((np.arange(1 << depth)[:, None] >> np.arange(depth)) & 1).astype(np.float64)
+    weights = np.array(
+        [
+            math.factorial(k) * math.factorial(depth - 1 - k) / math.factorial(depth)
+            for k in range(depth)
+        ]
+    )
+    table = np.empty((m, 1 << depth, depth))
+    for i in range(depth):
+        coef = np.zeros((m, 1 << depth, depth))
+        coef[..., 0] = 1.0
+        for j in range(depth):
+            if j == i:
+                continue
+            shifted = np.zeros_like(coef)
+            shifted[..., 1:] = coef[..., :-1]
+            coef = coef * zero[:, j, None, None] + shifted * ones[None, :, j, None]
+        delta = ones[None, :, i] - zero[:, i, None]
+        table[..., i] = value[:, None] * delta * (coef @ weights)
+    return table
+
+
+@dataclass(frozen=True)
+class TreeExplainer:
+    """Path-dependent TreeSHAP for a :class:`GBMModel`, vectorized over rows and trees.
+
+    Every leaf's path is reduced to its distinct features ("slots"); a row's
+    contribution from a leaf depends only on which of those features' conditions
+    it satisfies. Contributions for each of those ``2**D`` patterns are tabulated
+    once. A batch then evaluates every split condition of the ensemble as two
+    comparisons, packs the bits into per-leaf pattern numbers and sums table
+    lookups per feature. Contributions are in raw-score (log-odds for binary)
+    units and add up, with ``expected_value``, to the raw score.
+    """
+
+    # Conditions as ``x > t`` (missing goes left) and ``x <= t`` (missing goes right),
+    # true when the row follows the path; columns past ``*_keep`` are negated.
+    gt_feature: np.ndarray
+    gt_threshold: np.ndarray
+    gt_keep: int
+    le_feature: np.ndarray
+    le_threshold: np.ndarray
+    le_keep: int
+    # Condition column per slot, plus ``(slots, columns)`` for features repeated on a path.
+    slot_condition: np.ndarray
+    repeated: tuple[tuple[np.ndarray, np.ndarray], ...]
+    # ``(leaf columns, slots)`` contributing bit ``p`` of each leaf's pattern.
+    pattern_bits: tuple[tuple[np.ndarray, np.ndarray], ...]
+    n_leaves: int
+    # Slots ordered by feature: table offset and leaf column of each, feature boundaries.
+    slot_table: np.ndarray
+    slot_leaf: np.ndarray
+    feature_starts: np.ndarray
+    feature_ids: np.ndarray
+    table: np.ndarray
+    expected_value: float
+    n_features: int
+
+    @classmethod
+    def from_model(cls, model: GBMModel, max_table_bytes: int = MAX_TABLE_BYTES) -> "TreeExplainer":
+        """Tabulate ``model``'s leaves; ``ValueError`` if that needs over ``max_table_bytes``.
+
+        The table grows as ``2**D`` in the number of distinct features on a path,
+        so it is sized from the paths before anything is allocated.
+        """
+        # Per condition: (feature, threshold, missing goes right, path goes right).
+        conditions: list[tuple[int, float, bool, bool]] = []
+        slot_feature: list[int] = []
+        slot_conditions: list[list[int]] = []
+        slot_leaf: list[int] = []
+        slot_position: list[int] = []
+        paths_by_depth: dict[int, list[tuple[list[float], float, int]]] = {}
+        expected = model.base_score
+        n_leaves = 0
+        for tree in model.trees:
+            if tree.feature.size > 1 and tree.cover.size != tree.feature.size:
+                raise ValueError("Model has no node covers; retrain it to explain predictions")
+            for leaf, path in _leaf_paths(tree):
+                value = float(tree.value[leaf])
+                if not path:
+                    expected += value
+                    continue
+                # Merge repeated features: conditions AND together, cover fractions multiply.
+                merged: dict[int, list[tuple[int, bool]]] = {}
+                for node, right in path:
+                    merged.setdefault(int(tree.feature[node]), []).append((node, right))
+                zero = []
+                for position, (feature, steps) in enumerate(merged.items()):
+                    slot_feature.append(feature)
+                    slot_leaf.append(n_leaves)
+                    slot_position.append(position)
+                    slot_conditions.append([])
+                    fraction = 1.0
+                    for node, right in steps:
+                        child = tree.right[node] if right else tree.left[node]
+                        fraction *= tree.cover[child] / tree.cover[node]
+                        slot_conditions[-1].append(len(conditions))
+                        threshold = float(tree.threshold[node])
+                        conditions.append((feature, threshold, not tree.default_left[node], right))
+                    zero.append(fraction)
+                expected += value * float(np.prod(zero))
+                paths_by_depth.setdefault(len(zero), []).append((zero, value, n_leaves))
+                n_leaves += 1
+
+        elements = sum(len(items) * depth * (1 << depth) for depth, items in paths_by_depth.items())
+        if elements * 8 > max_table_bytes or elements > np.iinfo(np.int32).max:
+            raise ValueError(
+                f"Explaining this model needs a {elements * 8 / (1 << 30):.1f} GiB TreeSHAP "
+                f"table (paths use up to {max(paths_by_depth)} distinct features), over the "
+                f"{max_table_bytes / (1 << 30):.1f} GiB limit; retrain with a smaller max_depth"
+            )
+
+        # ``x > t`` is the path condition for right steps when missing goes left, and its
+        # negation for left steps; ``x <= t`` likewise when missing goes right.
+        groups = [
+            [i for i, (_, _, mr, right) in enumerate(conditions) if mr == missing and right == go]
+            for missing, go in ((False, True), (False, False), (True, False), (True, True))
+        ]
+        order = [i for group in groups for i in group]
+        column = np.empty(len(conditions), dtype=np.intp)
+        column[order] = np.arange(len(order))
+        gt, le = groups[0] + groups[1], groups[2] + groups[3]
+
+        def condition_arrays(indices: list[int]) -> tuple[np.ndarray, np.ndarray]:
+            return (
+                np.asarray([conditions[i][0] for i in indices], dtype=np.intp),
+                np.asarray([conditions[i][1] for i in indices], dtype=np.float64),
+            )
+
+        gt_feature, gt_threshold = condition_arrays(gt)
+        le_feature, le_threshold = condition_arrays(le)
+        repeated = []
+        for rank in range(1, max((len(c) for c in slot_conditions), default=1)):
+            slots = [s for s, c in enumerate(slot_conditions) if len(c) > rank]
+            repeated.append(
+                (
+                    np.asarray(slots, dtype=np.intp),
+                    column[[slot_conditions[s][rank] for s in slots]],
+                )
+            )
+
+        positions = np.asarray(slot_position, dtype=np.intp)
+        leaves = np.asarray(slot_leaf, dtype=np.intp)
+        pattern_bits = tuple(
+            (leaves[positions == bit], np.flatnonzero(positions == bit))
+            for bit in range(int(positions.max()) + 1 if positions.size else 0)
+        )
+
+        # Fill the flat table per depth, each leaf's block (D, 2**D) row-major. Leaves go
+        # through _shap_tables in chunks so its temporaries stay small next to the table.
+        table, offset = np.empty(elements), 0
+        leaf_offset = np.zeros(n_leaves, dtype=np.intp)
+        leaf_width = np.zeros(n_leaves, dtype=np.intp)
+        for depth, items in sorted(paths_by_depth.items()):
+            step = max(1, _CHUNK_ELEMENTS // (depth << depth))
+            for start in range(0, len(items), step):
+                chunk = items[start : start + step]
+                block = _shap_tables(
+                    np.asarray([zero for zero, _, _ in chunk]),
+                    np.asarray([value for _, value, _ in chunk]),
+                ).transpose(0, 2, 1)
+                ids = np.asarray([leaf for _, _, leaf in chunk], dtype=np.intp)
+                leaf_offset[ids] = offset + np.arange(ids.size) * block[0].size
+                leaf_width[ids] = 1 << depth
+                table[offset : offset + block.size] = block.ravel()
+                offset += block.size
+        features = np.asarray(slot_feature, dtype=np.intp)
+        by_feature = np.argsort(features, kind="stable")
+        feature_ids, feature_starts = np.unique(features[by_feature], return_index=True)
+        # Within a leaf's block, slot ``d`` starts at ``d * 2**D``.
+        slot_table = (leaf_offset[leaves] + positions * leaf_width[leaves])[by_feature]
+        return cls(
+            gt_feature=gt_feature,
+            gt_threshold=gt_threshold,
+            gt_keep=len(groups[0]),
+            le_feature=le_feature,
+            le_threshold=le_threshold,
+            le_keep=len(groups[2]),
+            slot_condition=column[[c[0] for c in slot_conditions]],
+            repeated=tuple(repeated),
+            pattern_bits=pattern_bits,
+            n_leaves=n_leaves,
+            slot_table=slot_table.astype(np.int32),
+            slot_leaf=leaves[by_feature],
+            feature_starts=feature_starts,
+            feature_ids=feature_ids,
+            table=table,
+            expected_value=expected,
+            n_features=len(model.feature_names),
+        )
+
+    def _explain_block(self, block: np.ndarray) -> np.ndarray:
+        # Work feature-major: every gather below then copies contiguous rows.
+        x = np.ascontiguousarray(block.T)
+        phi = np.zeros((self.n_features, x.shape[1]))
+        if not self.slot_table.size:
+            return phi.T
+        gt = x[self.gt_feature] > self.gt_threshold[:, None]
+        np.logical_not(gt[self.gt_keep :], out=gt[self.gt_keep :])
+        le = x[self.le_feature] <= self.le_threshold[:, None]
+        np.logical_not(le[self.le_keep :], out=le[self.le_keep :])
+        satisfied = np.concatenate([gt, le])
+        bits = satisfied[self.slot_condition]
+        for slots, columns in self.repeated:
+            bits[slots] &= satisfied[columns]
+        pattern = np.zeros((self.n_leaves, x.shape[1]), dtype=np.int32)
+        for bit, (leaves, slots) in enumerate(self.pattern_bits):
+            pattern[leaves] |= bits[slots].astype(np.int32) << bit
+        values = self.table.take(self.slot_table[:, None] + pattern[self.slot_leaf])
+        phi[self.feature_ids] = np.add.reduceat(values, self.feature_starts, axis=0)
+        return phi.T
+
+    def shap_values(self, encoded: np.ndarray, n_threads: int | None = None) -> np.ndarray:
+        """Per-feature contributions for rows of a :meth:`BinMapper.encode` matrix."""
+        encoded = np.asarray(encoded, dtype=np.float64)
+        n_rows = encoded.shape[0]
+        width = self.gt_feature.size + self.le_feature.size + self.slot_table.size
+        chunk = max(1, _CHUNK_ELEMENTS // max(1, width))
+        starts = range(0, n_rows, chunk)
+        threads = max(1, min(len(starts), n_threads or os.cpu_count() or 1))
+        if threads == 1:
+            blocks = [self._explain_block(encoded[start : start + chunk]) for start in starts]
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                blocks = list(
+                    pool.map(
+                        lambda start: self._explain_block(encoded[start : start + chunk]), starts
+                    )
+                )
+        if not blocks:
+            return np.zeros((0, self.n_features))
+        return np.concatenate(blocks)
+
+
+def reason_codes(
+    contributions: np.ndarray, top_n: int, min_contribution: float = 0.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Indices and values of each row's ``top_n`` largest contributions.
+
+    Contributions at or below ``min_contribution`` are reported as index -1 with
+    value NaN.
+    """
+    top_n = min(top_n, contributions.shape[1])
+    if not top_n:
+        empty = np.empty((contributions.shape[0], 0))
+        return empty.astype(np.intp), empty
+    top = np.argpartition(-contributions, top_n - 1, axis=1)[:, :top_n]
+    values = np.take_along_axis(contributions, top, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    keep = values > min_contribution
+    return np.where(keep, top, -1), np.where(keep, values, np.nan)
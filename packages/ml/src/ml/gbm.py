@@ -0,0 +1,502 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from ml.binning import MISSING_BIN, BinMapper
+from ml.dataset import BinnedDataset
+
+MODEL_FORMAT = "talaty-gbm/1"
+OBJECTIVES = ("binary", "regression")
+
+_EPS = 1e-16
+
+
+@dataclass(frozen=True)
+class GBMParams:
+    objective: str = "binary"
+    n_estimators: int = 200
+    learning_rate: float = 0.1
+    max_depth: int = 6
+    min_samples_leaf: int = 20
+    min_child_weight: float = 1e-3
+    reg_lambda: float = 1.0
+    min_split_gain: float = 0.0
+    subsample: float = 1.0
+    max_bins: int = 255
+    early_stopping_rounds: int | None = None
+    n_threads: int | None = None
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.objective not in OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {self.objective}")
+        if self.n_estimators < 1 or self.max_depth < 1 or self.min_samples_leaf < 1:
+            raise ValueError("n_estimators, max_depth and min_samples_leaf must be positive")
+        if not 0.0 < self.learning_rate <= 1.0 or not 0.0 < self.subsample <= 1.0:
+            raise ValueError("learning_rate and subsample must be in (0, 1]")
+        if self.n_threads is not None and self.n_threads < 1:
+            raise ValueError("n_threads must be positive")
+
+    @classmethod
+    def from_dict(cls, params: dict) -> "GBMParams":
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(params) - known)
+        if unknown:
+            raise ValueError(f"Unknown gbm model_params: {', '.join(unknown)}")
+        return cls(**params)
+
+    def threads(self) -> int:
+        return self.n_threads or os.cpu_count() or 1
+
+
+@dataclass
+class Tree:
+    """One regression tree in flat-array form; ``feature == -1`` marks a leaf.
+
+    ``cover`` is the number of training rows that reached each node (empty for
+    models saved before it was recorded).
+    """
+
+    feature: np.ndarray
+    threshold_bin: np.ndarray
+    threshold: np.ndarray
+    default_left: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    gain: np.ndarray
+    cover: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def _route(self, matrix: np.ndarray, binned: bool, rows: np.ndarray | None) -> np.ndarray:
+        rows = np.arange(matrix.shape[0]) if rows is None else rows
+        node = np.zeros(rows.size, dtype=np.int32)
+        active = np.arange(rows.size)
+        while active.size:
+            current = node[active]
+            feature = self.feature[current]
+            internal = feature >= 0
+            active, current, feature = active[internal], current[internal], feature[internal]
+            if not active.size:
+                break
+            x = matrix[rows[active], feature]
+            if binned:
+                missing = x == MISSING_BIN
+                below = x <= self.threshold_bin[current]
+            else:
+                missing = np.isnan(x)
+                below = x <= self.threshold[current]
+            go_left = np.where(missing, self.default_left[current], below)
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+        return node
+
+    def predict_binned(self, codes: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        return self.value[self._route(codes, True, rows)]
+
+    def predict(self, encoded: np.ndarray) -> np.ndarray:
+        return self.value[self._route(encoded, False, None)]
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name).tolist() for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "Tree":
+        dtypes = {
+            "feature": np.int32,
+            "threshold_bin": np.int32,
+            "threshold": np.float64,
+            "default_left": bool,
+            "left": np.int32,
+            "right": np.int32,
+            "value": np.float64,
+            "gain": np.float64,
+        }
+        arrays = {name: np.asarray(payload[name], dtype=d) for name, d in dtypes.items()}
+        return cls(**arrays, cover=np.asarray(payload.get("cover", []), dtype=np.float64))
+
+
+@dataclass
+class GBMModel:
+    params: GBMParams
+    mapper: BinMapper
+    base_score: float
+    trees: list[Tree] = field(default_factory=list)
+    history: dict = field(default_factory=dict)
+
+    @property
+    def feature_names(self) -> list[str]:
+        return self.mapper.names
+
+    def raw_score(self, encoded: np.ndarray) -> np.ndarray:
+        score = np.full(encoded.shape[0], self.base_score)
+        for tree in self.trees:
+            score += tree.predict(encoded)
+        return score
+
+    def raw_score_binned(self, codes: np.ndarray) -> np.ndarray:
+        score = np.full(codes.shape[0], self.base_score)
+        for tree in self.trees:
+            score += tree.predict_binned(codes)
+        return score
+
+    def _link(self, score: np.ndarray) -> np.ndarray:
+        return _sigmoid(score) if self.params.objective == "binary" else score
+
+    def predict(self, table: pa.Table) -> np.ndarray:
+        """Probabilities (binary) or predictions (regression) for the rows of ``table``."""
+        return self._link(self.raw_score(self.mapper.encode(table)))
+
+    def predict_binned(self, codes: np.ndarray) -> np.ndarray:
+        return self._link(self.raw_score_binned(codes))
+
+    def feature_importance(self) -> dict[str, float]:
+        """Total split gain per feature."""
+        totals = np.zeros(len(self.mapper.features))
+        for tree in self.trees:
+            internal = tree.feature >= 0
+            np.add.at(totals, tree.feature[internal], tree.gain[internal])
+        return dict(zip(self.feature_names, totals.tolist()))
+
+    def to_dict(self) -> dict:
+        return {
+            "format": MODEL_FORMAT,
+            "params": asdict(self.params),
+            "base_score": self.base_score,
+            "bin_mapper": self.mapper.to_dict(),
+            "trees": [tree.to_dict() for tree in self.trees],
+            "history": self.history,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "GBMModel":
+        if payload.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported model format: {payload.get('format')}")
+        return cls(
+            params=GBMParams(**payload["params"]),
+            mapper=BinMapper.from_dict(payload["bin_mapper"]),
+            base_score=float(payload["base_score"]),
+            trees=[Tree.from_dict(item) for item in payload["trees"]],
+            history=payload.get("history", {}),
+        )
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")))
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "GBMModel":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def _sigmoid(score: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-score))
+
+
+class _HistogramBuilder:
+    """Per-node gradient/hessian/count histograms over the binned matrix.
+
+    Features are split into one block per thread; ``np.take`` and ``np.bincount``
+    release the GIL, so the blocks are built in parallel.
+    """
+
+    def __init__(self, codes: np.ndarray, n_bins: int, threads: int) -> None:
+        self._codes = codes
+        self._n_bins = n_bins
+        blocks = np.array_split(np.arange(codes.shape[1]), threads)
+        self._blocks = [block for block in blocks if block.size]
+        self._pool = ThreadPoolExecutor(max_workers=threads) if len(self._blocks) > 1 else None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def build(self, rows: np.ndarray, grad: np.ndarray, hess: np.ndarray) -> np.ndarray:
+        hist = np.empty((3, self._codes.shape[1], self._n_bins))
+        g, h = grad[rows], hess[rows]
+
+        def fill(block: np.ndarray) -> None:
+            for feature in block:
+                column = self._codes[:, feature].take(rows)
+                hist[0, feature] = np.bincount(column, weights=g, minlength=self._n_bins)
+                hist[1, feature] = np.bincount(column, weights=h, minlength=self._n_bins)
+                hist[2, feature] = np.bincount(column, minlength=self._n_bins)
+
+        if self._pool is None:
+            for block in self._blocks:
+                fill(block)
+        else:
+            list(self._pool.map(fill, self._blocks))
+        return hist
+
+
+@dataclass
+class _Split:
+    feature: int
+    bin: int
+    default_left: bool
+    gain: float
+    left_value: float
+    right_value: float
+
+
+@dataclass
+class _Node:
+    index: int
+    rows: np.ndarray
+    hist: np.ndarray
+    depth: int
+    lower: float = -np.inf
+    upper: float = np.inf
+
+
+class GBMTrainer:
+    """Histogram gradient boosting on a :class:`BinnedDataset`.
+
+    Trees grow depth-wise; each node's histogram is built only for the smaller
+    child and derived for the larger one by subtracting it from the parent.
+    Monotone constraints reject splits whose child values violate the expected
+    direction and bound descendant leaves by the midpoint of the split.
+    """
+
+    def __init__(self, params: GBMParams) -> None:
+        self.params = params
+
+    def fit(
+        self,
+        data: BinnedDataset,
+        train_rows: np.ndarray | None = None,
+        valid_rows: np.ndarray | None = None,
+    ) -> GBMModel:
+        params = self.params
+        y = data.target
+        rows = np.arange(data.n_rows) if train_rows is None else np.sort(train_rows)
+        if rows.size == 0:
+            raise ValueError("No training rows")
+        if params.objective == "binary" and not np.isin(y[rows], (0.0, 1.0)).all():
+            raise ValueError("Binary objective requires a 0/1 target")
+
+        base_score = self._base_score(y[rows])
+        model = GBMModel(params=params, mapper=data.mapper, base_score=base_score)
+        raw = np.full(data.n_rows, base_score)
+        valid_raw = np.full(len(valid_rows), base_score) if valid_rows is not None else None
+        history: dict = {"train_loss": []}
+        if valid_rows is not None:
+            history["valid_loss"] = []
+        best_round, best_loss = 0, np.inf
+
+        rng = np.random.default_rng(params.seed)
+        grad = np.zeros(data.n_rows)
+        hess = np.zeros(data.n_rows)
+        monotone = data.mapper.monotone
+        builder = _HistogramBuilder(data.codes, int(data.mapper.n_bins.max()), params.threads())
+        try:
+            for round_index in range(params.n_estimators):
+                self._gradients(raw, y, rows, grad, hess)
+                sample = rows
+                if params.subsample < 1.0:
+                    sample = rows[rng.random(rows.size) < params.subsample]
+                tree, leaves = self._grow(data, builder, sample, grad, hess, monotone)
+                model.trees.append(tree)
+                if params.subsample < 1.0:
+                    raw[rows] += tree.predict_binned(data.codes, rows)
+                else:
+                    for value, leaf_rows in leaves:
+                        raw[leaf_rows] += value
+                history["train_loss"].append(self._loss(raw[rows], y[rows]))
+
+                if valid_rows is not None:
+                    valid_raw += tree.predict_binned(data.codes, valid_rows)
+                    loss = self._loss(valid_raw, y[valid_rows])
+                    history["valid_loss"].append(loss)
+                    if loss < best_loss:
+                        best_round, best_loss = round_index, loss
+                    elif (
+                        params.early_stopping_rounds
+                        and round_index - best_round >= params.early_stopping_rounds
+                    ):
+                        model.trees = model.trees[: best_round + 1]
+                        break
+        finally:
+            builder.close()
+        if valid_rows is not None:
+            history["best_iteration"] = best_round + 1
+        model.history = history
+        return model
+
+    def _base_score(self, y: np.ndarray) -> float:
+        mean = float(y.mean())
+        if self.params.objective == "binary":
+            mean = min(max(mean, 1e-6), 1 - 1e-6)
+            return float(np.log(mean / (1 - mean)))
+        return mean
+
+    def _gradients(
+        self, raw: np.ndarray, y: np.ndarray, rows: np.ndarray, grad: np.ndarray, hess: np.ndarray
+    ) -> None:
+        if self.params.objective == "binary":
+            p = _sigmoid(raw[rows])
+            grad[rows] = p - y[rows]
+            hess[rows] = np.maximum(p * (1.0 - p), _EPS)
+        else:
+            grad[rows] = raw[rows] - y[rows]
+            hess[rows] = 1.0
+
+    def _loss(self, raw: np.ndarray, y: np.ndarray) -> float:
+        if self.params.objective == "binary":
+            # log(1 + exp(raw)) - y * raw, computed stably.
+            return float(np.mean(np.logaddexp(0.0, raw) - y * raw))
+        return float(np.mean(np.square(raw - y)))
+
+    def _grow(
+        self,
+        data: BinnedDataset,
+        builder: _HistogramBuilder,
+        rows: np.ndarray,
+        grad: np.ndarray,
+        hess: np.ndarray,
+        monotone: np.ndarray,
+    ) -> tuple[Tree, list[tuple[float, np.ndarray]]]:
+        params = self.params
+        columns = ("feature", "bin", "default_left", "left", "right", "value", "gain", "cover")
+        nodes: dict[str, list] = {name: [] for name in columns}
+
+        def add_node() -> int:
+            for values in nodes.values():
+                values.append(0)
+            nodes["feature"][-1] = -1
+            return len(nodes["feature"]) - 1
+
+        leaves: list[tuple[float, np.ndarray]] = []
+        frontier = [_Node(add_node(), rows, builder.build(rows, grad, hess), depth=0)]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                nodes["cover"][node.index] = node.rows.size
+                split = None
+                if node.depth < params.max_depth and node.rows.size >= 2 * params.min_samples_leaf:
+                    split = self._best_split(node, monotone)
+                if split is None:
+                    g, h = node.hist[0, 0].sum(), node.hist[1, 0].sum()
+                    value = _leaf_value(g, h, params.reg_lambda, node.lower, node.upper)
+                    nodes["value"][node.index] = value * params.learning_rate
+                    leaves.append((nodes["value"][node.index], node.rows))
+                    continue
+
+                column = data.codes[:, split.feature].take(node.rows)
+                go_left = (column <= split.bin) & (column != MISSING_BIN)
+                if split.default_left:
+                    go_left |= column == MISSING_BIN
+                left_rows, right_rows = node.rows[go_left], node.rows[~go_left]
+                if left_rows.size <= right_rows.size:
+                    left_hist = builder.build(left_rows, grad, hess)
+                    right_hist = node.hist - left_hist
+                else:
+                    right_hist = builder.build(right_rows, grad, hess)
+                    left_hist = node.hist - right_hist
+
+                left_bounds = right_bounds = (node.lower, node.upper)
+                direction = monotone[split.feature]
+                if direction:
+                    middle = (split.left_value + split.right_value) / 2.0
+                    if direction > 0:
+                        left_bounds, right_bounds = (node.lower, middle), (middle, node.upper)
+                    else:
+                        left_bounds, right_bounds = (middle, node.upper), (node.lower, middle)
+
+                left_index, right_index = add_node(), add_node()
+                nodes["feature"][node.index] = split.feature
+                nodes["bin"][node.index] = split.bin
+                nodes["default_left"][node.index] = split.default_left
+                nodes["gain"][node.index] = split.gain
+                nodes["left"][node.index] = left_index
+                nodes["right"][node.index] = right_index
+                next_frontier.append(
+                    _Node(left_index, left_rows, left_hist, node.depth + 1, *left_bounds)
+                )
+                next_frontier.append(
+                    _Node(right_index, right_rows, right_hist, node.depth + 1, *right_bounds)
+                )
+            frontier = next_frontier
+
+        feature = np.asarray(nodes["feature"], dtype=np.int32)
+        threshold_bin = np.asarray(nodes["bin"], dtype=np.int32)
+        threshold = np.array(
+            [
+                data.mapper.threshold(int(f), int(b)) if f >= 0 else np.nan
+                for f, b in zip(feature, threshold_bin)
+            ]
+        )
+        tree = Tree(
+            feature=feature,
+            threshold_bin=threshold_bin,
+            threshold=threshold,
+            default_left=np.asarray(nodes["default_left"], dtype=bool),
+            left=np.asarray(nodes["left"], dtype=np.int32),
+            right=np.asarray(nodes["right"], dtype=np.int32),
+            value=np.asarray(nodes["value"], dtype=np.float64),
+            gain=np.asarray(nodes["gain"], dtype=np.float64),
+            cover=np.asarray(nodes["cover"], dtype=np.float64),
+        )
+        return tree, leaves
+
+    def _best_split(self, node: _Node, monotone: np.ndarray) -> _Split | None:
+        params = self.params
+        lam = params.reg_lambda
+        grad, hess, count = node.hist
+        total_g, total_h, total_n = grad[0].sum(), hess[0].sum(), count[0].sum()
+        if grad.shape[1] < 3:
+            return None
+
+        # Candidate threshold ``s`` sends non-missing codes 1..s left; axis 0 picks where
+        # the missing bin goes (0: left, 1: right).
+        cum_g = np.cumsum(grad[:, 1:-1], axis=1)
+        cum_h = np.cumsum(hess[:, 1:-1], axis=1)
+        cum_n = np.cumsum(count[:, 1:-1], axis=1)
+        left_g = np.stack([cum_g + grad[:, :1], cum_g])
+        left_h = np.stack([cum_h + hess[:, :1], cum_h])
+        left_n = np.stack([cum_n + count[:, :1], cum_n])
+        right_g, right_h, right_n = total_g - left_g, total_h - left_h, total_n - left_n
+
+        left_w = _leaf_value(left_g, left_h, lam, node.lower, node.upper)
+        right_w = _leaf_value(right_g, right_h, lam, node.lower, node.upper)
+        parent_w = _leaf_value(total_g, total_h, lam, node.lower, node.upper)
+        gain = 0.5 * (
+            _score(left_g, left_h, left_w, lam)
+            + _score(right_g, right_h, right_w, lam)
+            - _score(total_g, total_h, parent_w, lam)
+        )
+        valid = (
+            (left_n >= params.min_samples_leaf)
+            & (right_n >= params.min_samples_leaf)
+            & (left_h >= params.min_child_weight)
+            & (right_h >= params.min_child_weight)
+            & (monotone[None, :, None] * (right_w - left_w) >= 0)
+        )
+        gain = np.where(valid, gain, -np.inf)
+        best = int(np.argmax(gain))
+        if not gain.flat[best] > params.min_split_gain:
+            return None
+        direction, feature, offset = np.unravel_index(best, gain.shape)
+        return _Split(
+            feature=int(feature),
+            bin=int(offset) + 1,
+            default_left=bool(direction == 0),
+            gain=float(gain.flat[best]),
+            left_value=float(left_w.flat[best]),
+            right_value=float(right_w.flat[best]),
+        )
+
+
+def _leaf_value(g, h, lam: float, lower: float, upper: float):
+    return np.clip(-g / (h + lam), lower, upper)
+
+
+def _score(g, h, w, lam: float):
+    # Negative second-order loss at leaf value ``w``; equals g**2 / (h + lam) when unclipped.
+    return -(2.0 * g * w + (h + lam) * w * w)
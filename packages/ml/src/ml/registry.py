@@ -0,0 +1,15 @@
+from ml.gbm import GBMParams, GBMTrainer
+
+TRAINERS = {"gbm": (GBMTrainer, GBMParams)}
+
+
+def get_trainer(model_family: str, model_params: dict | None = None) -> GBMTrainer:
+    """Trainer for ``RunSpec.model_family`` configured from ``RunSpec.model_params``."""
+    try:
+        trainer_cls, params_cls = TRAINERS[model_family]
+    except KeyError:
+        supported = ", ".join(sorted(TRAINERS))
+        raise ValueError(
+            f"Unsupported model_family: {model_family} (supported: {supported})"
+        ) from None
+    return trainer_cls(params_cls.from_dict(model_params or {}))
@@ -0,0 +1,221 @@
+import json
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml.compiled import CompiledEnsemble
+from ml.explain import ExplanationPolicy, TreeExplainer, reason_codes
+from ml.gbm import GBMModel
+
+SCORE_COLUMN = "score"
+ROW_COLUMN = "partition_row"
+REASON_COLUMN = "reason_{}"
+CONTRIBUTION_COLUMN = "contribution_{}"
+SHAP_COLUMN = "shap_{}"
+
+_DEFAULT_BATCH_ROWS = 64 * 1024
+
+_loaded: tuple[str, GBMModel, CompiledEnsemble] | None = None
+_explainer: tuple[str, TreeExplainer] | None = None
+
+
+@dataclass(frozen=True)
+class PartitionScore:
+    index: int
+    output_path: Path
+    rows: int
+    seconds: float
+    explanation_path: Path | None = None
+
+
+def _load_model(model_path: str) -> tuple[GBMModel, CompiledEnsemble]:
+    # One compiled model per worker process, loaded by the pool initializer or on first use.
+    global _loaded
+    if _loaded is None or _loaded[0] != model_path:
+        model = GBMModel.load(model_path)
+        _loaded = (model_path, model, CompiledEnsemble.from_model(model))
+    return _loaded[1], _loaded[2]
+
+
+def _load_explainer(model_path: str, model: GBMModel) -> TreeExplainer:
+    global _explainer
+    if _explainer is None or _explainer[0] != model_path:
+        _explainer = (model_path, TreeExplainer.from_model(model))
+    return _explainer[1]
+
+
+def _explanation_schema(
+    id_fields: list[pa.Field],
+    model: GBMModel,
+    explainer: TreeExplainer,
+    explain: ExplanationPolicy,
+    reason_texts: dict[str, str] | None,
+) -> pa.Schema:
+    top_n = min(explain.top_n, len(model.feature_names))
+    reason = pa.dictionary(pa.int16(), pa.string())
+    schema_fields = [*id_fields, pa.field(ROW_COLUMN, pa.int64())]
+    for rank in range(1, top_n + 1):
+        schema_fields.append(pa.field(REASON_COLUMN.format(rank), reason))
+        schema_fields.append(pa.field(CONTRIBUTION_COLUMN.format(rank), pa.float32()))
+    if explain.contributions:
+        schema_fields += [
+            pa.field(SHAP_COLUMN.format(name), pa.float32()) for name in model.feature_names
+        ]
+    metadata = {
+        "expected_value": json.dumps(explainer.expected_value),
+        "reason_codes": json.dumps(
+            {name: (reason_texts or {}).get(name, name) for name in model.feature_names}
+        ),
+    }
+    return pa.schema(schema_fields, metadata=metadata)
+
+
+def _explanation_arrays(
+    model: GBMModel,
+    contributions: np.ndarray,
+    explain: ExplanationPolicy,
+) -> list[pa.Array]:
+    names = pa.array(model.feature_names, type=pa.string())
+    top, values = reason_codes(contributions, explain.top_n, explain.min_contribution)
+    arrays: list[pa.Array] = []
+    for rank in range(top.shape[1]):
+        indices = pa.array(top[:, rank].astype(np.int16), mask=top[:, rank] < 0)
+        arrays.append(pa.DictionaryArray.from_arrays(indices, names))
+        arrays.append(pa.array(values[:, rank].astype(np.float32), from_pandas=True))
+    if explain.contributions:
+        arrays += [pa.array(column) for column in contributions.T.astype(np.float32)]
+    return arrays
+
+
+def score_partition(
+    model_path: str | Path,
+    input_path: str | Path,
+    output_path: str | Path,
+    id_columns: tuple[str, ...] = (),
+    batch_rows: int = _DEFAULT_BATCH_ROWS,
+    explain: ExplanationPolicy | None = None,
+    explanation_path: str | Path | None = None,
+    reason_texts: dict[str, str] | None = None,
+) -> tuple[int, float]:
+    """Score one Parquet partition batch by batch; returns ``(rows, seconds)``.
+
+    The output holds ``id_columns`` copied from the input, the row position within
+    the partition and the model score, and is written one row group per batch.
+    With ``explain``, TreeSHAP reason codes for the same rows are written to
+    ``explanation_path``. Reason columns are dictionary-encoded feature names
+    ranked by contribution. The schema metadata maps each name to its
+    ``reason_texts`` entry and records the explainer's ``expected_value``.
+    """
+    started = time.perf_counter()
+    model, compiled = _load_model(str(model_path))
+    parquet = pq.ParquetFile(input_path)
+    id_fields = [parquet.schema_arrow.field(name) for name in id_columns]
+    schema = pa.schema(
+        id_fields + [pa.field(ROW_COLUMN, pa.int64()), pa.field(SCORE_COLUMN, pa.float64())]
+    )
+    explainer = explain_writer = explain_schema = None
+    rows = 0
+    try:
+        with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+            if explain is not None:
+                explainer = _load_explainer(str(model_path), model)
+                explain_schema = _explanation_schema(
+                    id_fields, model, explainer, explain, reason_texts
+                )
+                explain_writer = pq.ParquetWriter(
+                    explanation_path, explain_schema, compression="zstd"
+                )
+            columns = list(dict.fromkeys([*model.feature_names, *id_columns]))
+            for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+                table = pa.Table.from_batches([batch])
+                encoded = model.mapper.encode(table)
+                scores = compiled.predict(encoded)
+                keys = [table.column(name) for name in id_columns] + [
+                    pa.array(np.arange(rows, rows + batch.num_rows, dtype=np.int64))
+                ]
+                writer.write_table(
+                    pa.Table.from_arrays([*keys, pa.array(scores)], schema=schema)
+                )
+                if explain_writer is not None:
+                    contributions = explainer.shap_values(encoded, explain.n_threads)
+                    arrays = _explanation_arrays(model, contributions, explain)
+                    explain_writer.write_table(
+                        pa.Table.from_arrays([*keys, *arrays], schema=explain_schema)
+                    )
+                rows += batch.num_rows
+    finally:
+        if explain_writer is not None:
+            explain_writer.close()
+        parquet.close()
+    return rows, time.perf_counter() - started
+
+
+def _score_task(args: tuple) -> tuple[int, int, float]:
+    index, model_path, input_path, output_path, id_columns, batch_rows, explain = args
+    rows, seconds = score_partition(
+        model_path, input_path, output_path, id_columns, batch_rows, *explain
+    )
+    return index, rows, seconds
+
+
+def iter_score_partitions(
+    model_path: str | Path,
+    input_paths: list[str | Path],
+    output_dir: str | Path,
+    *,
+    id_columns: tuple[str, ...] = (),
+    batch_rows: int = _DEFAULT_BATCH_ROWS,
+    max_workers: int | None = None,
+    explain: ExplanationPolicy | None = None,
+    reason_texts: dict[str, str] | None = None,
+) -> Iterator[PartitionScore]:
+    """Score partitions in a process pool, yielding each output as soon as it is written.
+
+    Outputs are named after the input position (``part-00000.parquet``, ...), so
+    callers can upload or post-process them while other partitions are scored.
+    With ``explain``, reason codes go to ``output_dir/explanations/`` under the
+    same names.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if explain is not None:
+        (output_dir / "explanations").mkdir(exist_ok=True)
+
+    def task(index: int, path: str | Path) -> tuple:
+        name = f"part-{index:05d}.parquet"
+        explain_args = ()
+        if explain is not None:
+            explain_args = (explain, str(output_dir / "explanations" / name), reason_texts)
+        return (
+            index,
+            str(model_path),
+            str(path),
+            str(output_dir / name),
+            tuple(id_columns),
+            batch_rows,
+            explain_args,
+        )
+
+    def result(task: tuple, rows: int, seconds: float) -> PartitionScore:
+        explanation_path = Path(task[6][1]) if task[6] else None
+        return PartitionScore(task[0], Path(task[3]), rows, seconds, explanation_path)
+
+    tasks = [task(index, path) for index, path in enumerate(input_paths)]
+    if max_workers == 1 or len(tasks) == 1:
+        for item in tasks:
+            _, rows, seconds = _score_task(item)
+            yield result(item, rows, seconds)
+        return
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_load_model, initargs=(str(model_path),)
+    ) as pool:
+        futures = {pool.submit(_score_task, item): item for item in tasks}
+        for future in as_completed(futures):
+            _, rows, seconds = future.result()
+            yield result(futures[future], rows, seconds)
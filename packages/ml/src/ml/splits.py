@@ -0,0 +1,295 @@
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SPLITS_FORMAT = "talaty-splits/1"
+SPLIT_METHODS = ("random", "stratified", "out_of_time", "group_kfold")
+DEFAULT_FOLDS = 5
+
+_TRAIN, _VALID, _TEST, _EXCLUDED = 0, 1, 2, -1
+_MAX_STRATA = 20
+_QUANTILE_STRATA = 10
+
+
+@dataclass(frozen=True)
+class SplitPolicy:
+    """Interpreted ``RunSpec.split_policy``.
+
+    ``random`` and ``stratified`` hold out ``test_fraction`` and ``valid_fraction``
+    of rows (stratified per target class, or per target decile for continuous
+    targets). ``out_of_time`` splits on ``date_column``: rows on or after
+    ``test_start`` are test and rows on or after ``valid_start`` are validation;
+    without explicit cutoffs the fractions are applied to the dataset's date range,
+    or to the observed dates. ``group_kfold`` keeps every value of ``group_column``
+    in one fold. Setting ``n_folds`` on any method but ``out_of_time`` assigns the
+    non-test rows to folds instead, and fold 0 doubles as the validation holdout.
+    """
+
+    method: str = "random"
+    valid_fraction: float = 0.2
+    test_fraction: float = 0.0
+    n_folds: int | None = None
+    date_column: str | None = None
+    valid_start: str | None = None
+    test_start: str | None = None
+    group_column: str | None = None
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.method not in SPLIT_METHODS:
+            raise ValueError(f"Unsupported split method: {self.method}")
+        if not 0.0 <= self.valid_fraction < 1.0 or not 0.0 <= self.test_fraction < 1.0:
+            raise ValueError("valid_fraction and test_fraction must be in [0, 1)")
+        if self.valid_fraction + self.test_fraction >= 1.0:
+            raise ValueError("valid_fraction + test_fraction must be below 1")
+        if self.n_folds is not None and self.n_folds < 2:
+            raise ValueError("n_folds must be at least 2")
+        if self.method == "out_of_time":
+            if not self.date_column:
+                raise ValueError("out_of_time splits require date_column")
+            if self.n_folds is not None:
+                raise ValueError("out_of_time splits do not support n_folds")
+        if self.method == "group_kfold" and not self.group_column:
+            raise ValueError("group_kfold splits require group_column")
+
+    @classmethod
+    def from_dict(cls, policy: dict) -> "SplitPolicy":
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(policy) - known)
+        if unknown:
+            raise ValueError(f"Unknown split_policy keys: {', '.join(unknown)}")
+        return cls(**policy)
+
+    @property
+    def folds(self) -> int | None:
+        if self.method == "group_kfold":
+            return self.n_folds or DEFAULT_FOLDS
+        return self.n_folds
+
+    @property
+    def columns(self) -> list[str]:
+        """Data columns besides the target needed to compute the split."""
+        if self.method == "out_of_time":
+            return [self.date_column]
+        if self.method == "group_kfold":
+            return [self.group_column]
+        return []
+
+
+def split_key(
+    policy: SplitPolicy, target: str, date_range: tuple[date | None, date | None] = (None, None)
+) -> str:
+    """Short hash of everything besides the data rows that determines the split."""
+    canonical = json.dumps(
+        {
+            "format": SPLITS_FORMAT,
+            "policy": asdict(policy),
+            "target": target,
+            "date_range": [value.isoformat() if value else None for value in date_range],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Splits:
+    """Row-index splits over one shared matrix; slicing with them never copies features."""
+
+    train: np.ndarray
+    valid: np.ndarray
+    test: np.ndarray
+    fold_ids: np.ndarray | None = None
+
+    @property
+    def n_folds(self) -> int:
+        return 0 if self.fold_ids is None else int(self.fold_ids.max()) + 1
+
+    def fold(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        """``(train_rows, valid_rows)`` for one fold; test rows are never included."""
+        if not 0 <= index < self.n_folds:
+            raise IndexError(f"Fold {index} out of range")
+        return fold_rows(self.fold_ids, index)
+
+    def counts(self) -> dict[str, int]:
+        return {"train": self.train.size, "valid": self.valid.size, "test": self.test.size}
+
+
+def fold_rows(fold_ids: np.ndarray, index: int) -> tuple[np.ndarray, np.ndarray]:
+    assigned = fold_ids >= 0
+    return np.flatnonzero(assigned & (fold_ids != index)), np.flatnonzero(fold_ids == index)
+
+
+def make_splits(
+    policy: SplitPolicy,
+    target: np.ndarray,
+    columns: Mapping[str, pa.Array | pa.ChunkedArray] | None = None,
+    date_range: tuple[date | None, date | None] = (None, None),
+) -> Splits:
+    """Compute ``policy`` over ``target`` and any columns listed in ``policy.columns``."""
+    columns = columns or {}
+    missing = [name for name in policy.columns if name not in columns]
+    if missing:
+        raise ValueError(f"Split columns not found: {', '.join(missing)}")
+    n_rows = target.shape[0]
+    rng = np.random.default_rng(policy.seed)
+    fold_ids = None
+
+    if policy.method == "out_of_time":
+        assignment = _out_of_time(policy, _as_datetime(columns[policy.date_column]), date_range)
+    elif policy.method == "group_kfold":
+        groups = _group_codes(columns[policy.group_column])
+        assignment, fold_ids = _grouped(policy, groups, rng)
+    else:
+        strata = _strata(target) if policy.method == "stratified" else np.zeros(n_rows, np.intp)
+        assignment, fold_ids = _stratified(policy, strata, rng)
+
+    return Splits(
+        train=np.flatnonzero(assignment == _TRAIN),
+        valid=np.flatnonzero(assignment == _VALID),
+        test=np.flatnonzero(assignment == _TEST),
+        fold_ids=fold_ids,
+    )
+
+
+def _strata(target: np.ndarray) -> np.ndarray:
+    values, codes = np.unique(target, return_inverse=True)
+    if values.size <= _MAX_STRATA:
+        return codes
+    edges = np.quantile(target, np.linspace(0, 1, _QUANTILE_STRATA + 1)[1:-1])
+    return np.searchsorted(edges, target, side="right")
+
+
+def _stratified(
+    policy: SplitPolicy, strata: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray | None]:
+    assignment = np.full(strata.size, _TRAIN, dtype=np.int8)
+    fold_ids = np.full(strata.size, -1, dtype=np.int16) if policy.folds else None
+    cycle = 0
+    for stratum in np.unique(strata):
+        rows = rng.permutation(np.flatnonzero(strata == stratum))
+        n_test = int(round(rows.size * policy.test_fraction))
+        assignment[rows[:n_test]] = _TEST
+        rest = rows[n_test:]
+        if fold_ids is not None:
+            # Continue the fold cycle across strata so fold sizes stay balanced.
+            fold_ids[rest] = (np.arange(rest.size) + cycle) % policy.folds
+            cycle += rest.size
+        else:
+            assignment[rest[: int(round(rows.size * policy.valid_fraction))]] = _VALID
+    if fold_ids is not None:
+        assignment[fold_ids == 0] = _VALID
+    return assignment, fold_ids
+
+
+def _grouped(
+    policy: SplitPolicy, groups: np.ndarray, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    sizes = np.bincount(groups[groups >= 0]) if groups.size else np.zeros(0, np.int64)
+    order = rng.permutation(sizes.size)
+    total = sizes.sum()
+    group_fold = np.full(sizes.size, -1, dtype=np.int16)
+
+    # Hold out whole groups for test, then spread the rest over folds largest first,
+    # always filling the currently smallest fold.
+    held = np.cumsum(sizes[order]) <= total * policy.test_fraction
+    remaining = order[~held]
+    if remaining.size < policy.folds:
+        raise ValueError(f"{remaining.size} groups cannot fill {policy.folds} folds")
+    remaining = remaining[np.argsort(-sizes[remaining], kind="stable")]
+    loads = np.zeros(policy.folds, dtype=np.int64)
+    for group in remaining:
+        fold = int(loads.argmin())
+        group_fold[group] = fold
+        loads[fold] += sizes[group]
+
+    fold_ids = np.where(groups >= 0, group_fold[np.maximum(groups, 0)], -1).astype(np.int16)
+    assignment = np.full(groups.size, _EXCLUDED, dtype=np.int8)
+    if held.any():
+        assignment[np.isin(groups, order[held])] = _TEST
+    assignment[fold_ids > 0] = _TRAIN
+    assignment[fold_ids == 0] = _VALID
+    return assignment, fold_ids
+
+
+def _out_of_time(
+    policy: SplitPolicy, dates: np.ndarray, date_range: tuple[date | None, date | None]
+) -> np.ndarray:
+    present = ~np.isnat(dates)
+    if policy.valid_start or policy.test_start:
+        valid_cut = _cutoff(policy.valid_start)
+        test_cut = _cutoff(policy.test_start)
+    elif all(date_range):
+        start, end = (np.datetime64(value, "us") for value in date_range)
+        # date_end is inclusive, so the range runs to the end of that day.
+        span = end + np.timedelta64(1, "D") - start
+        test_cut = end + np.timedelta64(1, "D") - span * policy.test_fraction
+        valid_cut = test_cut - span * policy.valid_fraction
+    elif present.any():
+        observed = np.sort(dates[present])
+        test_cut = _quantile(observed, 1.0 - policy.test_fraction)
+        valid_cut = _quantile(observed, 1.0 - policy.test_fraction - policy.valid_fraction)
+    else:
+        raise ValueError(f"Column {policy.date_column} has no dates")
+
+    assignment = np.where(present, _TRAIN, _EXCLUDED).astype(np.int8)
+    if valid_cut is not None:
+        assignment[present & (dates >= valid_cut)] = _VALID
+    if test_cut is not None:
+        assignment[present & (dates >= test_cut)] = _TEST
+    return assignment
+
+
+def _cutoff(value: str | None) -> np.datetime64 | None:
+    return np.datetime64(value, "us") if value else None
+
+
+def _quantile(observed: np.ndarray, q: float) -> np.datetime64 | None:
+    if q >= 1.0:
+        return None
+    return observed[min(int(q * observed.size), observed.size - 1)]
+
+
+def _as_datetime(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    if not pa.types.is_timestamp(column.type) or column.type.unit != "us":
+        column = pc.cast(column, pa.timestamp("us"))
+    return np.asarray(column.to_numpy(zero_copy_only=False), dtype="datetime64[us]")
+
+
+def _group_codes(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    encoded = pc.dictionary_encode(column)
+    if isinstance(encoded, pa.ChunkedArray):
+        encoded = encoded.unify_dictionaries().combine_chunks()
+    return encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(np.intp)
+
+
+def save_splits(splits: Splits, path: str | Path, metadata: dict | None = None) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {"train": splits.train, "valid": splits.valid, "test": splits.test}
+    if splits.fold_ids is not None:
+        arrays["fold_ids"] = splits.fold_ids
+    meta = json.dumps({"format": SPLITS_FORMAT, **(metadata or {})}, sort_keys=True)
+    with open(path, "wb") as handle:
+        np.savez_compressed(handle, meta=np.array(meta), **arrays)
+    return path
+
+
+def load_splits(path: str | Path) -> Splits:
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(str(archive["meta"]))
+        if meta.get("format") != SPLITS_FORMAT:
+            raise ValueError(f"Unsupported splits format: {meta.get('format')}")
+        return Splits(
+            train=archive["train"],
+            valid=archive["valid"],
+            test=archive["test"],
+            fold_ids=archive["fold_ids"] if "fold_ids" in archive.files else None,
+        )
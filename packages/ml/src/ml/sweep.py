@@ -0,0 +1,281 @@
+import itertools
+import json
+import math
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ml.cv import attach_shared, share_arrays
+from ml.dataset import BinnedDataset
+from ml.registry import get_trainer
+from ml.splits import fold_rows
+
+
+# Parameters that shape the binned matrix, which is built once and shared by all trials.
+BINNING_PARAMS = ("max_bins",)
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    """Search space and successive-halving schedule for a hyperparameter sweep.
+
+    ``grid`` maps parameter names to lists of values and expands to their
+    cartesian product. ``random`` maps names to a list (uniform choice) or a
+    ``{"low", "high", "log", "type"}`` range and draws ``n_trials`` samples. Both
+    may be given; the grid trials come first. Trials start with ``min_resource``
+    of ``resource`` (boosting rounds by default), and the best ``1 / eta`` of each
+    rung are promoted to ``eta`` times more, up to ``max_resource``.
+    """
+
+    grid: dict[str, list] = field(default_factory=dict)
+    random: dict[str, Any] = field(default_factory=dict)
+    n_trials: int = 0
+    resource: str = "n_estimators"
+    min_resource: int = 25
+    max_resource: int | None = None
+    eta: int = 3
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.grid and not self.random:
+            raise ValueError("A sweep needs a grid or random search space")
+        if self.random and self.n_trials < 1:
+            raise ValueError("Random search requires n_trials")
+        if self.resource in self.grid or self.resource in self.random:
+            raise ValueError(f"{self.resource} is the sweep resource and cannot be searched")
+        binning = sorted(set(BINNING_PARAMS) & (set(self.grid) | set(self.random)))
+        if binning:
+            raise ValueError(
+                f"{', '.join(binning)} set the shared binning and cannot be searched; "
+                "set them in model_params instead"
+            )
+        if self.eta < 2 or self.min_resource < 1:
+            raise ValueError("eta must be at least 2 and min_resource positive")
+        if self.max_resource is not None and self.max_resource < self.min_resource:
+            raise ValueError("max_resource must be at least min_resource")
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "SweepSpec":
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(spec) - known)
+        if unknown:
+            raise ValueError(f"Unknown sweep keys: {', '.join(unknown)}")
+        return cls(**spec)
+
+    def rungs(self, max_resource: int) -> list[int]:
+        """Resource per rung: ``min_resource * eta**k``, ending exactly at ``max_resource``."""
+        rungs = [self.min_resource]
+        while rungs[-1] * self.eta < max_resource:
+            rungs.append(rungs[-1] * self.eta)
+        if rungs[-1] < max_resource:
+            rungs.append(max_resource)
+        return rungs
+
+
+def expand_trials(spec: SweepSpec, base_params: dict) -> list[dict]:
+    """Concrete ``model_params`` for every trial, each layered over ``base_params``."""
+    trials = []
+    if spec.grid:
+        names = sorted(spec.grid)
+        for values in itertools.product(*(spec.grid[name] for name in names)):
+            trials.append({**base_params, **dict(zip(names, values, strict=True))})
+    rng = np.random.default_rng(spec.seed)
+    for _ in range(spec.n_trials if spec.random else 0):
+        sampled = {name: _sample(space, rng) for name, space in sorted(spec.random.items())}
+        trials.append({**base_params, **sampled})
+    return trials
+
+
+def _sample(space: Any, rng: np.random.Generator) -> Any:
+    if isinstance(space, list):
+        return space[int(rng.integers(len(space)))]
+    low, high = float(space["low"]), float(space["high"])
+    if space.get("log"):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    if space.get("type") == "int":
+        return int(round(value))
+    return float(value)
+
+
+class AshaScheduler:
+    """Asynchronous successive halving: promote as soon as a trial ranks in a rung's top ``1/eta``.
+
+    Workers never wait for a rung to fill; when no promotion is possible the next
+    new trial starts at the bottom rung.
+    """
+
+    def __init__(self, n_trials: int, n_rungs: int, eta: int) -> None:
+        self._n_trials = n_trials
+        self._eta = eta
+        self._next_trial = 0
+        self._losses: list[dict[int, float]] = [{} for _ in range(n_rungs)]
+        self._promoted: list[set[int]] = [set() for _ in range(n_rungs)]
+
+    def next_job(self) -> tuple[int, int] | None:
+        """``(trial, rung)`` to run next, or None when nothing can start right now."""
+        for rung in reversed(range(len(self._losses) - 1)):
+            losses = self._losses[rung]
+            ranked = sorted(losses, key=losses.__getitem__)
+            for trial in ranked[: len(ranked) // self._eta]:
+                if trial not in self._promoted[rung]:
+                    self._promoted[rung].add(trial)
+                    return trial, rung + 1
+        if self._next_trial < self._n_trials:
+            self._next_trial += 1
+            return self._next_trial - 1, 0
+        return None
+
+    def report(self, trial: int, rung: int, loss: float) -> None:
+        self._losses[rung][trial] = loss if math.isfinite(loss) else math.inf
+
+
+@dataclass
+class SweepResult:
+    trials: list[dict]
+    rungs: list[int]
+    best_trial: int
+    jobs: int
+    seconds: float
+
+    @property
+    def best(self) -> dict:
+        return self.trials[self.best_trial]
+
+    def to_dict(self) -> dict:
+        return {
+            "rungs": self.rungs,
+            "best_trial": self.best_trial,
+            "jobs": self.jobs,
+            "seconds": self.seconds,
+            "trials": self.trials,
+        }
+
+
+def _fit_trial(args: tuple) -> tuple[int, int, dict[str, float]]:
+    trial, rung, files, mapper, model_family, model_params, output_path = args
+    started = time.perf_counter()
+    data, holdout = attach_shared(*files, mapper)
+    train_rows, valid_rows = fold_rows(holdout, 0)
+    model = get_trainer(model_family, model_params).fit(data, train_rows, valid_rows)
+    model.save(output_path)
+    metrics = {
+        "valid_loss": model.history["valid_loss"][len(model.trees) - 1],
+        "train_loss": model.history["train_loss"][len(model.trees) - 1],
+        "best_iteration": float(model.history["best_iteration"]),
+        "seconds": time.perf_counter() - started,
+    }
+    return trial, rung, metrics
+
+
+def run_sweep(
+    data: BinnedDataset,
+    train_rows: np.ndarray,
+    valid_rows: np.ndarray,
+    model_family: str,
+    trials: list[dict],
+    spec: SweepSpec,
+    output_dir: str | Path,
+    *,
+    max_workers: int | None = None,
+    n_threads: int | None = None,
+    on_result: Callable[[int, int, dict[str, float]], None] | None = None,
+) -> SweepResult:
+    """Run ``trials`` under :class:`AshaScheduler`, ranking by validation loss.
+
+    Trials run in a process pool whose workers memory-map one copy of the binned
+    matrix and holdout, exactly like cross-validation folds. ``on_result(trial,
+    resource, metrics)`` is called in this process as each job finishes. Each
+    trial's latest model is kept at ``output_dir/trial-{i:05d}/model.json`` and the
+    summary at ``output_dir/sweep.json``.
+    """
+    if not trials:
+        raise ValueError("Sweep has no trials")
+    if not valid_rows.size:
+        raise ValueError("Sweeps require a split policy with validation rows")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Without an explicit cap, trials grow to the resource's configured (or default) value.
+    max_resource = spec.max_resource or int(
+        getattr(get_trainer(model_family, trials[0]).params, spec.resource)
+    )
+    rungs = spec.rungs(max(max_resource, spec.min_resource))
+    budget = n_threads or os.cpu_count() or 1
+    workers = max(1, min(len(trials), max_workers or budget))
+    threads = max(1, budget // workers)
+    for params in trials:
+        # Validate every trial before any work starts.
+        get_trainer(model_family, {**params, spec.resource: rungs[0]})
+
+    holdout = np.full(data.n_rows, -1, dtype=np.int16)
+    holdout[train_rows] = 1
+    holdout[valid_rows] = 0
+    files = share_arrays(data, holdout, output_dir)
+    mapper = data.mapper.to_dict()
+    records = [
+        {"trial": index, "model_params": params, "losses": {}}
+        for index, params in enumerate(trials)
+    ]
+    scheduler = AshaScheduler(len(trials), len(rungs), spec.eta)
+
+    def job(trial: int, rung: int) -> tuple:
+        params = {"n_threads": threads, **trials[trial], spec.resource: rungs[rung]}
+        path = output_dir / f"trial-{trial:05d}" / "model.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return trial, rung, files, mapper, model_family, params, str(path)
+
+    started = time.perf_counter()
+    jobs = 0
+    executor: Executor
+    if workers == 1:
+        executor = ThreadPoolExecutor(max_workers=1)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=attach_shared, initargs=(*files, mapper)
+        )
+    try:
+        with executor:
+            pending = set()
+            while True:
+                while len(pending) < workers and (next_job := scheduler.next_job()) is not None:
+                    pending.add(executor.submit(_fit_trial, job(*next_job)))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial, rung, metrics = future.result()
+                    jobs += 1
+                    scheduler.report(trial, rung, metrics["valid_loss"])
+                    records[trial]["losses"][rungs[rung]] = metrics["valid_loss"]
+                    records[trial].update(resource=rungs[rung], **metrics)
+                    if on_result is not None:
+                        on_result(trial, rungs[rung], metrics)
+    finally:
+        for path in files:
+            if Path(path).parent == output_dir:
+                Path(path).unlink(missing_ok=True)
+
+    # Rank by the deepest rung reached, then by loss there.
+    best = min(records, key=lambda record: (-record["resource"], record["valid_loss"]))
+    result = SweepResult(
+        trials=records,
+        rungs=rungs,
+        best_trial=best["trial"],
+        jobs=jobs,
+        seconds=time.perf_counter() - started,
+    )
+    (output_dir / "sweep.json").write_text(json.dumps(result.to_dict(), indent=2))
+    return result
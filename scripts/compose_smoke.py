@@ -138,7 +138,8 @@ def main() -> None:
     required_keys = {
         f"runs/{run_id}/runspec.yaml",
         f"runs/{run_id}/meta.json",
-        f"runs/{run_id}/logs/runner.log",
+        f"runs/{run_id}/logs/runner-000000.log",
+        f"runs/{run_id}/logs/runner.end",
     }
 
     def artifacts_ready() -> bool:
@@ -0,0 +1,81 @@
+"""secondary indexes for list endpoints and the run claim query
+
+Revision ID: 0002_indexes
+Revises: 0001_init
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002_indexes"
+down_revision = "0001_init"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial index predicate). List endpoints page by
+# (created_at, id), optionally under an equality filter, so every index ends with
+# those keyset columns.
+INDEXES = [
+    ("ix_datasets_created_at_id", "datasets", ["created_at", "id"], None),
+    (
+        "ix_dataset_versions_dataset_id_created_at",
+        "dataset_versions",
+        ["dataset_id", "created_at", "id"],
+        None,
+    ),
+    ("ix_features_created_at_id", "features", ["created_at", "id"], None),
+    ("ix_feature_sets_created_at_id", "feature_sets", ["created_at", "id"], None),
+    (
+        "ix_feature_set_versions_feature_set_id_created_at",
+        "feature_set_versions",
+        ["feature_set_id", "created_at", "id"],
+        None,
+    ),
+    ("ix_run_specs_created_at_id", "run_specs", ["created_at", "id"], None),
+    (
+        "ix_run_specs_dataset_version_id_created_at",
+        "run_specs",
+        ["dataset_version_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_run_specs_feature_set_version_id_created_at",
+        "run_specs",
+        ["feature_set_version_id", "created_at", "id"],
+        None,
+    ),
+    ("ix_runs_created_at_id", "runs", ["created_at", "id"], None),
+    ("ix_runs_run_spec_id_created_at", "runs", ["run_spec_id", "created_at", "id"], None),
+    ("ix_runs_status_created_at", "runs", ["status", "created_at", "id"], None),
+    # Queued and running runs are a small, hot slice: the runner's claim query and the
+    # "active runs" page read only this index.
+    (
+        "ix_runs_active_created_at",
+        "runs",
+        ["status", "created_at"],
+        "status IN ('queued', 'running')",
+    ),
+    ("ix_models_produced_from_run_id", "models", ["produced_from_run_id"], None),
+]
+
+
+def upgrade() -> None:
+    # Build without blocking writes on tables that are already populated.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
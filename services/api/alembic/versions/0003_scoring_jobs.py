@@ -0,0 +1,55 @@
+"""scoring_jobs table for queued batch scoring
+
+Revision ID: 0003_scoring_jobs
+Revises: 0002_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0003_scoring_jobs"
+down_revision = "0002_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    run_status = postgresql.ENUM(
+        "queued", "running", "succeeded", "failed", name="run_status", create_type=False
+    )
+    op.create_table(
+        "scoring_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("run_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("dataset_version_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("id_columns", postgresql.JSONB(), nullable=False),
+        sa.Column("status", run_status, nullable=False),
+        sa.Column("output_prefix", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("summary", postgresql.JSONB(), nullable=True),
+        sa.Column("failure_reason", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["run_id"], ["runs.id"]),
+        sa.ForeignKeyConstraint(["dataset_version_id"], ["dataset_versions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scoring_jobs_run_id_created_at", "scoring_jobs", ["run_id", "created_at", "id"]
+    )
+    # Workers claim from this slice, like ix_runs_active_created_at for runs.
+    op.create_index(
+        "ix_scoring_jobs_active_created_at",
+        "scoring_jobs",
+        ["status", "created_at"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scoring_jobs_active_created_at", table_name="scoring_jobs")
+    op.drop_index("ix_scoring_jobs_run_id_created_at", table_name="scoring_jobs")
+    op.drop_table("scoring_jobs")
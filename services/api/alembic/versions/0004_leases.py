@@ -0,0 +1,32 @@
+"""worker leases on runs and scoring_jobs
+
+Revision ID: 0004_leases
+Revises: 0003_scoring_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_leases"
+down_revision = "0003_scoring_jobs"
+branch_labels = None
+depends_on = None
+
+TABLES = ("runs", "scoring_jobs")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+        op.add_column(
+            table,
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, "attempts")
+        op.drop_column(table, "heartbeat_at")
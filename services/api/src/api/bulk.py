@@ -0,0 +1,83 @@
+import json
+from collections import defaultdict
+from typing import TypeVar
+
+import pyarrow as pa
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from api.config import get_settings
+from api.schemas import BulkRowResult
+
+JSONL_TYPES = {"application/jsonl", "application/x-ndjson", "application/x-jsonlines"}
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _parse_jsonl(body: bytes) -> list[dict]:
+    rows = []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON on line {number}") from exc
+    return rows
+
+
+def _parse_arrow(body: bytes) -> list[dict]:
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as exc:
+        raise HTTPException(status_code=400, detail="Invalid Arrow IPC stream") from exc
+    # Nulls are dropped so optional fields fall back to their defaults, as in JSONL.
+    return [
+        {name: value for name, value in row.items() if value is not None}
+        for row in table.to_pylist()
+    ]
+
+
+async def read_rows(request: Request) -> list[dict]:
+    """The request body as row dicts, from JSON Lines or an Arrow IPC stream."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in JSONL_TYPES:
+        rows = _parse_jsonl(await request.body())
+    elif content_type == ARROW_STREAM_TYPE:
+        rows = _parse_arrow(await request.body())
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Expected JSON Lines or {ARROW_STREAM_TYPE}, got {content_type or 'none'}",
+        )
+    max_rows = get_settings().BULK_MAX_ROWS
+    if len(rows) > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} rows per request")
+    return rows
+
+
+def validate_rows(
+    schema: type[T], rows: list[dict]
+) -> tuple[list[tuple[int, T]], dict[int, BulkRowResult]]:
+    """Validate every row in one pass; returns the valid ``(index, item)`` pairs and failures.
+
+    The whole payload goes through a single ``list[schema]`` adapter. Only when
+    that fails are the untouched rows validated again, without the failed ones.
+    """
+    adapter = TypeAdapter(list[schema])
+    try:
+        return list(enumerate(adapter.validate_python(rows))), {}
+    except ValidationError as exc:
+        messages: dict[int, list[str]] = defaultdict(list)
+        for error in exc.errors(include_url=False):
+            index, *field = error["loc"]
+            where = ".".join(str(part) for part in field) or "row"
+            messages[index].append(f"{where}: {error['msg']}")
+    failed = {
+        index: BulkRowResult(index=index, status="invalid", error="; ".join(errors))
+        for index, errors in messages.items()
+    }
+    indexes = [index for index in range(len(rows)) if index not in failed]
+    items = adapter.validate_python([rows[index] for index in indexes])
+    return list(zip(indexes, items)), failed
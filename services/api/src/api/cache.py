@@ -0,0 +1,86 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from api.config import get_settings
+
+SCHEMA_CACHE_CONTROL = "public, max-age=3600"
+# For resources that can change in place: clients must revalidate with the ETag.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized JSON body with its strong ETag (a digest of the body)."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_payload(cls, payload: object) -> "CachedResponse":
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches.
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def cached_response(request: Request, cached: CachedResponse, cache_control: str) -> Response:
+    """``cached`` as a 200, or a bodiless 304 when the client already holds its ETag."""
+    headers = {"ETag": cached.etag, "Cache-Control": cache_control}
+    if _matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses whose entries expire after ``ttl_s`` seconds.
+
+    Handlers run on the event loop, so access is never concurrent.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[Hashable, tuple[float, CachedResponse]] = OrderedDict()
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={int(self.ttl_s)}"
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, cached = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def put(self, key: Hashable, cached: CachedResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_s, cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Feature set versions are write-once. Dataset version entries are keyed by a digest of
+# statistics_summary (which re-profiling rewrites), so a stale body is never served.
+_settings = get_settings()
+version_cache = ResponseCache(_settings.VERSION_CACHE_SIZE, _settings.VERSION_CACHE_TTL_S)
@@ -1,7 +1,19 @@
+import enum
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -15,8 +27,14 @@ from core.domain.v0.enums import (
 )
 
 
+def _enum_values(enum_cls: type[enum.Enum]) -> list[str]:
+    # Persist enum values ("queued"), matching the labels created by the migrations.
+    return [member.value for member in enum_cls]
+
+
 class Dataset(Base):
     __tablename__ = "datasets"
+    __table_args__ = (Index("ix_datasets_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -28,7 +46,9 @@ class Dataset(Base):
     date_end: Mapped[date | None] = mapped_column(Date, nullable=True)
     target_definition: Mapped[str | None] = mapped_column(Text, nullable=True)
     status: Mapped[DatasetStatus] = mapped_column(
-        Enum(DatasetStatus, name="dataset_status"), nullable=False, default=DatasetStatus.DRAFT
+        Enum(DatasetStatus, name="dataset_status", values_callable=_enum_values),
+        nullable=False,
+        default=DatasetStatus.DRAFT,
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
@@ -38,6 +58,9 @@ class Dataset(Base):
 
 class DatasetVersion(Base):
     __tablename__ = "dataset_versions"
+    __table_args__ = (
+        Index("ix_dataset_versions_dataset_id_created_at", "dataset_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     dataset_id: Mapped[uuid.UUID] = mapped_column(
@@ -52,14 +75,16 @@ class DatasetVersion(Base):
 
 class Feature(Base):
     __tablename__ = "features"
+    __table_args__ = (Index("ix_features_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     dtype: Mapped[FeatureDType] = mapped_column(
-        Enum(FeatureDType, name="feature_dtype"), nullable=False
+        Enum(FeatureDType, name="feature_dtype", values_callable=_enum_values), nullable=False
     )
     origin: Mapped[FeatureOrigin] = mapped_column(
-        Enum(FeatureOrigin, name="feature_origin"), nullable=False
+        Enum(FeatureOrigin, name="feature_origin", values_callable=_enum_values),
+        nullable=False,
     )
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     monotonic_expectation: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -69,6 +94,7 @@ class Feature(Base):
 
 class FeatureSet(Base):
     __tablename__ = "feature_sets"
+    __table_args__ = (Index("ix_feature_sets_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -78,6 +104,14 @@ class FeatureSet(Base):
 
 class FeatureSetVersion(Base):
     __tablename__ = "feature_set_versions"
+    __table_args__ = (
+        Index(
+            "ix_feature_set_versions_feature_set_id_created_at",
+            "feature_set_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     feature_set_id: Mapped[uuid.UUID] = mapped_column(
@@ -92,6 +126,18 @@ class FeatureSetVersion(Base):
 
 class RunSpec(Base):
     __tablename__ = "run_specs"
+    __table_args__ = (
+        Index("ix_run_specs_created_at_id", "created_at", "id"),
+        Index(
+            "ix_run_specs_dataset_version_id_created_at", "dataset_version_id", "created_at", "id"
+        ),
+        Index(
+            "ix_run_specs_feature_set_version_id_created_at",
+            "feature_set_version_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     dataset_version_id: Mapped[uuid.UUID] = mapped_column(
@@ -111,13 +157,26 @@ class RunSpec(Base):
 
 class Run(Base):
     __tablename__ = "runs"
+    __table_args__ = (
+        Index("ix_runs_created_at_id", "created_at", "id"),
+        Index("ix_runs_run_spec_id_created_at", "run_spec_id", "created_at", "id"),
+        Index("ix_runs_status_created_at", "status", "created_at", "id"),
+        Index(
+            "ix_runs_active_created_at",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     run_spec_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("run_specs.id"), nullable=False
     )
     status: Mapped[RunStatus] = mapped_column(
-        Enum(RunStatus, name="run_status"), nullable=False, default=RunStatus.QUEUED
+        Enum(RunStatus, name="run_status", values_callable=_enum_values),
+        nullable=False,
+        default=RunStatus.QUEUED,
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -126,10 +185,48 @@ class Run(Base):
     artifacts_uri: Mapped[str | None] = mapped_column(Text, nullable=True)
     failure_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
     failure_trace_uri: Mapped[str | None] = mapped_column(Text, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ScoringJob(Base):
+    __tablename__ = "scoring_jobs"
+    __table_args__ = (
+        Index("ix_scoring_jobs_run_id_created_at", "run_id", "created_at", "id"),
+        Index(
+            "ix_scoring_jobs_active_created_at",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    run_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("runs.id"), nullable=False
+    )
+    dataset_version_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("dataset_versions.id"), nullable=False
+    )
+    id_columns: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    status: Mapped[RunStatus] = mapped_column(
+        Enum(RunStatus, name="run_status", values_callable=_enum_values),
+        nullable=False,
+        default=RunStatus.QUEUED,
+    )
+    output_prefix: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    summary: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    failure_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Model(Base):
     __tablename__ = "models"
+    __table_args__ = (Index("ix_models_produced_from_run_id", "produced_from_run_id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -137,7 +234,7 @@ class Model(Base):
         UUID(as_uuid=True), ForeignKey("runs.id"), nullable=False
     )
     registry_state: Mapped[ModelRegistryState] = mapped_column(
-        Enum(ModelRegistryState, name="model_registry_state"),
+        Enum(ModelRegistryState, name="model_registry_state", values_callable=_enum_values),
         nullable=False,
         default=ModelRegistryState.DRAFT,
     )
@@ -1,23 +1,33 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from api.config import get_settings
 
 
-def _create_engine():
-    return create_engine(get_settings().DATABASE_URL, pool_pre_ping=True)
+def _create_engine() -> AsyncEngine:
+    # postgresql+psycopg:// URLs resolve to psycopg's async driver here.
+    settings = get_settings()
+    return create_async_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_S,
+    )
 
 
 engine = _create_engine()
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# Committed objects stay loaded: handlers serialize them after commit, and lazy
+# refreshes are not possible outside an awaited call.
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 
-def get_session() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
-
@@ -1,7 +1,12 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.config import get_settings
+from api.db.session import engine
+from api.pagination import NEXT_CURSOR_HEADER
 from api.routes import (
     datasets_router,
     feature_sets_router,
@@ -11,6 +16,17 @@ from api.routes import (
     runs_router,
     schemas_router,
 )
+from api.routes.schemas import schema_responses
+from api.runner_client import create_runner_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    schema_responses()
+    async with create_runner_client() as runner_client:
+        app.state.runner_client = runner_client
+        yield
+    await engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -18,6 +34,7 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Talaty Scoring API",
         version=settings.APP_VERSION,
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -26,6 +43,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
     )
 
     app.include_router(health_router)
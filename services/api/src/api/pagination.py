@@ -0,0 +1,126 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.db.base import Base
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by every list endpoint.
+
+    Results are ordered newest first by ``(created_at, id)``. ``cursor`` is the
+    opaque ``X-Next-Cursor`` value from the previous page, and ``fields``
+    projects each item to a comma-separated subset of its fields.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+        fields: str | None = Query(None, description="Comma-separated fields to return"),
+        created_after: datetime | None = Query(None, description="Inclusive lower bound"),
+        created_before: datetime | None = Query(None, description="Exclusive upper bound"),
+    ) -> None:
+        self.limit = limit
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.fields = [name.strip() for name in fields.split(",") if name.strip()] if fields else []
+        self.created_after = created_after
+        self.created_before = created_before
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(item_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail="Invalid cursor") from exc
+
+
+def page_statement(
+    model: type[Base],
+    page: PageParams,
+    filters: list[ColumnElement[bool]],
+    columns: list[str] | None = None,
+) -> Select:
+    """One page of ``model`` rows: filtered, keyset-positioned and bounded to ``limit + 1``.
+
+    The extra row only tells whether another page exists. ``columns`` selects
+    those columns instead of whole entities.
+    """
+    created_at, item_id = model.created_at, model.id
+    statement = select(*(getattr(model, name) for name in columns)) if columns else select(model)
+    statement = statement.where(*filters)
+    if page.created_after is not None:
+        statement = statement.where(created_at >= page.created_after)
+    if page.created_before is not None:
+        statement = statement.where(created_at < page.created_before)
+    if page.cursor is not None:
+        statement = statement.where(tuple_(created_at, item_id) < tuple_(*page.cursor))
+    return statement.order_by(created_at.desc(), item_id.desc()).limit(page.limit + 1)
+
+
+def _projection(model: type[Base], schema: type[BaseModel], fields: list[str]) -> list[str]:
+    unknown = sorted(
+        name for name in fields if name not in schema.model_fields or name not in model.__table__.c
+    )
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    # The keyset columns are always read so the next cursor can be built.
+    return list(dict.fromkeys([*fields, "created_at", "id"]))
+
+
+async def paginate(
+    db: AsyncSession,
+    model: type[Base],
+    schema: type[BaseModel],
+    page: PageParams,
+    response: Response,
+    filters: list[ColumnElement[bool]] | None = None,
+) -> list | JSONResponse:
+    """Run :func:`page_statement` and shape the items as ``schema``.
+
+    A further page is advertised in the ``X-Next-Cursor`` header. Projected
+    pages are returned as a ``JSONResponse`` of partial items, since they do
+    not satisfy ``schema``.
+    """
+    filters = filters or []
+    if page.fields:
+        columns = _projection(model, schema, page.fields)
+        result = await db.execute(page_statement(model, page, filters, columns))
+        rows = result.mappings().all()
+    else:
+        rows = (await db.scalars(page_statement(model, page, filters))).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        if page.fields:
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    if page.fields:
+        items = [{name: row[name] for name in page.fields} for row in rows]
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [schema.model_validate(row) for row in rows]
@@ -1,48 +1,66 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from api.auth import get_user
-from sqlalchemy.orm import Session
+from sqlalchemy import Text, cast, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import read_rows, validate_rows
+from api.cache import REVALIDATE_CACHE_CONTROL, CachedResponse, cached_response, version_cache
 from api.db import models
 from api.db.session import get_session
-from api.schemas import DatasetCreate, DatasetVersionCreate
-from core.domain.v0 import Dataset, DatasetVersion
+from api.pagination import PageParams, paginate
+from api.schemas import BulkResponse, BulkRowResult, DatasetCreate, DatasetVersionCreate
+from core.domain.v0 import Dataset, DatasetStatus, DatasetVersion
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
 
 @router.post("/", response_model=Dataset)
-def create_dataset(payload: DatasetCreate, db: Session = Depends(get_session)) -> Dataset:
+async def create_dataset(
+    payload: DatasetCreate, db: AsyncSession = Depends(get_session)
+) -> Dataset:
     dataset = models.Dataset(**payload.model_dump())
     db.add(dataset)
-    db.commit()
-    db.refresh(dataset)
+    await db.commit()
+    await db.refresh(dataset)
     return Dataset.model_validate(dataset)
 
 
 @router.get("/", response_model=list[Dataset])
-def list_datasets(db: Session = Depends(get_session)) -> list[Dataset]:
-    datasets = db.query(models.Dataset).order_by(models.Dataset.created_at.desc()).all()
-    return [Dataset.model_validate(item) for item in datasets]
+async def list_datasets(
+    response: Response,
+    status: DatasetStatus | None = None,
+    name: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[Dataset]:
+    filters = []
+    if status is not None:
+        filters.append(models.Dataset.status == status)
+    if name is not None:
+        filters.append(models.Dataset.name == name)
+    return await paginate(db, models.Dataset, Dataset, page, response, filters)
 
 
 @router.get("/{dataset_id}", response_model=Dataset)
-def get_dataset(dataset_id: UUID, db: Session = Depends(get_session)) -> Dataset:
-    dataset = db.query(models.Dataset).filter(models.Dataset.id == dataset_id).one_or_none()
+async def get_dataset(dataset_id: UUID, db: AsyncSession = Depends(get_session)) -> Dataset:
+    dataset = await db.get(models.Dataset, dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
     return Dataset.model_validate(dataset)
 
 
 @router.post("/{dataset_id}/versions", response_model=DatasetVersion)
-def create_dataset_version(
+async def create_dataset_version(
     dataset_id: UUID,
     payload: DatasetVersionCreate,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     user: str = Depends(get_user),
 ) -> DatasetVersion:
-    dataset = db.query(models.Dataset).filter(models.Dataset.id == dataset_id).one_or_none()
+    dataset = await db.get(models.Dataset, dataset_id)
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
     data = payload.model_dump()
@@ -50,18 +68,80 @@ def create_dataset_version(
         data["created_by"] = user
     version = models.DatasetVersion(dataset_id=dataset_id, **data)
     db.add(version)
-    db.commit()
-    db.refresh(version)
+    await db.commit()
+    await db.refresh(version)
     return DatasetVersion.model_validate(version)
 
 
+@router.post("/{dataset_id}/versions:bulk", response_model=BulkResponse)
+async def create_dataset_versions_bulk(
+    dataset_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    user: str = Depends(get_user),
+) -> BulkResponse:
+    """Register many versions of one dataset from JSON Lines or Arrow in one transaction."""
+    if not await db.get(models.Dataset, dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    valid, failed = validate_rows(DatasetVersionCreate, await read_rows(request))
+    results = list(failed.values())
+    created_at = datetime.utcnow()
+    params = []
+    for index, version in valid:
+        row = {"id": uuid.uuid4(), "dataset_id": dataset_id, "created_at": created_at}
+        row.update(version.model_dump())
+        row["created_by"] = row["created_by"] or user
+        params.append(row)
+        results.append(BulkRowResult(index=index, status="created", id=row["id"]))
+    if params:
+        await db.execute(insert(models.DatasetVersion.__table__), params)
+        await db.commit()
+    return BulkResponse.from_results(results)
+
+
 @router.get("/{dataset_id}/versions", response_model=list[DatasetVersion])
-def list_dataset_versions(dataset_id: UUID, db: Session = Depends(get_session)) -> list[DatasetVersion]:
-    versions = (
-        db.query(models.DatasetVersion)
-        .filter(models.DatasetVersion.dataset_id == dataset_id)
-        .order_by(models.DatasetVersion.created_at.desc())
-        .all()
-    )
-    return [DatasetVersion.model_validate(item) for item in versions]
+async def list_dataset_versions(
+    dataset_id: UUID,
+    response: Response,
+    created_by: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[DatasetVersion]:
+    filters = [models.DatasetVersion.dataset_id == dataset_id]
+    if created_by is not None:
+        filters.append(models.DatasetVersion.created_by == created_by)
+    return await paginate(db, models.DatasetVersion, DatasetVersion, page, response, filters)
+
+
+@router.get("/{dataset_id}/versions/{version_id}", response_model=DatasetVersion)
+async def get_dataset_version(
+    dataset_id: UUID,
+    version_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+) -> Response:
+    """One dataset version, revalidated on every request.
 
+    Re-profiling rewrites ``statistics_summary``, so each request reads only its
+    digest; the cached body is reused while the digest is unchanged. Clients get
+    ``no-cache`` and revalidate with the ETag.
+    """
+    row = (
+        await db.execute(
+            select(
+                models.DatasetVersion.dataset_id,
+                func.md5(cast(models.DatasetVersion.statistics_summary, Text)),
+            ).where(models.DatasetVersion.id == version_id)
+        )
+    ).one_or_none()
+    if row is None or row[0] != dataset_id:
+        raise HTTPException(status_code=404, detail="Dataset version not found")
+    key = ("dataset_version", dataset_id, version_id, row[1])
+    cached = version_cache.get(key)
+    if cached is None:
+        version = await db.get(models.DatasetVersion, version_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Dataset version not found")
+        cached = CachedResponse.from_payload(DatasetVersion.model_validate(version))
+        version_cache.put(key, cached)
+    return cached_response(request, cached, REVALIDATE_CACHE_CONTROL)
@@ -1,11 +1,13 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from api.auth import get_user
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import CachedResponse, cached_response, version_cache
 from api.db import models
 from api.db.session import get_session
+from api.pagination import PageParams, paginate
 from api.schemas import FeatureSetCreate, FeatureSetVersionCreate
 from core.domain.v0 import FeatureSet, FeatureSetVersion
 
@@ -13,30 +15,35 @@ router = APIRouter(prefix="/feature-sets", tags=["feature_sets"])
 
 
 @router.post("/", response_model=FeatureSet)
-def create_feature_set(payload: FeatureSetCreate, db: Session = Depends(get_session)) -> FeatureSet:
+async def create_feature_set(
+    payload: FeatureSetCreate, db: AsyncSession = Depends(get_session)
+) -> FeatureSet:
     feature_set = models.FeatureSet(**payload.model_dump())
     db.add(feature_set)
-    db.commit()
-    db.refresh(feature_set)
+    await db.commit()
+    await db.refresh(feature_set)
     return FeatureSet.model_validate(feature_set)
 
 
 @router.get("/", response_model=list[FeatureSet])
-def list_feature_sets(db: Session = Depends(get_session)) -> list[FeatureSet]:
-    feature_sets = db.query(models.FeatureSet).order_by(models.FeatureSet.created_at.desc()).all()
-    return [FeatureSet.model_validate(item) for item in feature_sets]
+async def list_feature_sets(
+    response: Response,
+    name: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[FeatureSet]:
+    filters = [models.FeatureSet.name == name] if name is not None else []
+    return await paginate(db, models.FeatureSet, FeatureSet, page, response, filters)
 
 
 @router.post("/{feature_set_id}/versions", response_model=FeatureSetVersion)
-def create_feature_set_version(
+async def create_feature_set_version(
     feature_set_id: UUID,
     payload: FeatureSetVersionCreate,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     user: str = Depends(get_user),
 ) -> FeatureSetVersion:
-    feature_set = (
-        db.query(models.FeatureSet).filter(models.FeatureSet.id == feature_set_id).one_or_none()
-    )
+    feature_set = await db.get(models.FeatureSet, feature_set_id)
     if not feature_set:
         raise HTTPException(status_code=404, detail="Feature set not found")
     data = payload.model_dump()
@@ -44,20 +51,39 @@ def create_feature_set_version(
         data["created_by"] = user
     version = models.FeatureSetVersion(feature_set_id=feature_set_id, **data)
     db.add(version)
-    db.commit()
-    db.refresh(version)
+    await db.commit()
+    await db.refresh(version)
     return FeatureSetVersion.model_validate(version)
 
 
 @router.get("/{feature_set_id}/versions", response_model=list[FeatureSetVersion])
-def list_feature_set_versions(
-    feature_set_id: UUID, db: Session = Depends(get_session)
+async def list_feature_set_versions(
+    feature_set_id: UUID,
+    response: Response,
+    created_by: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
 ) -> list[FeatureSetVersion]:
-    versions = (
-        db.query(models.FeatureSetVersion)
-        .filter(models.FeatureSetVersion.feature_set_id == feature_set_id)
-        .order_by(models.FeatureSetVersion.created_at.desc())
-        .all()
-    )
-    return [FeatureSetVersion.model_validate(item) for item in versions]
+    filters = [models.FeatureSetVersion.feature_set_id == feature_set_id]
+    if created_by is not None:
+        filters.append(models.FeatureSetVersion.created_by == created_by)
+    return await paginate(db, models.FeatureSetVersion, FeatureSetVersion, page, response, filters)
+
 
+@router.get("/{feature_set_id}/versions/{version_id}", response_model=FeatureSetVersion)
+async def get_feature_set_version(
+    feature_set_id: UUID,
+    version_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+) -> Response:
+    """One feature set version, served from the version cache after the first read."""
+    key = ("feature_set_version", feature_set_id, version_id)
+    cached = version_cache.get(key)
+    if cached is None:
+        version = await db.get(models.FeatureSetVersion, version_id)
+        if not version or version.feature_set_id != feature_set_id:
+            raise HTTPException(status_code=404, detail="Feature set version not found")
+        cached = CachedResponse.from_payload(FeatureSetVersion.model_validate(version))
+        version_cache.put(key, cached)
+    return cached_response(request, cached, version_cache.cache_control)
@@ -1,25 +1,87 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import uuid
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.bulk import read_rows, validate_rows
 from api.db import models
 from api.db.session import get_session
-from api.schemas import FeatureCreate
-from core.domain.v0 import Feature
+from api.pagination import PageParams, paginate
+from api.schemas import BulkResponse, BulkRowResult, FeatureCreate
+from core.domain.v0 import Feature, FeatureDType, FeatureOrigin
 
 router = APIRouter(prefix="/features", tags=["features"])
 
 
 @router.post("/", response_model=Feature)
-def create_feature(payload: FeatureCreate, db: Session = Depends(get_session)) -> Feature:
+async def create_feature(
+    payload: FeatureCreate, db: AsyncSession = Depends(get_session)
+) -> Feature:
     feature = models.Feature(**payload.model_dump())
     db.add(feature)
-    db.commit()
-    db.refresh(feature)
+    await db.commit()
+    await db.refresh(feature)
     return Feature.model_validate(feature)
 
 
+@router.post(":bulk", response_model=BulkResponse)
+async def create_features_bulk(
+    request: Request, db: AsyncSession = Depends(get_session)
+) -> BulkResponse:
+    """Register many features from JSON Lines or Arrow in one transaction.
+
+    Names are unique: rows whose name is already registered report ``exists`` with
+    the registered id and leave it unchanged.
+    """
+    valid, failed = validate_rows(FeatureCreate, await read_rows(request))
+    results = list(failed.values())
+    first_index: dict[str, int] = {}
+    pending: list[tuple[int, dict]] = []
+    created_at = datetime.utcnow()
+    for index, feature in valid:
+        if feature.name in first_index:
+            error = f"name: duplicates row {first_index[feature.name]}"
+            results.append(BulkRowResult(index=index, status="invalid", error=error))
+            continue
+        first_index[feature.name] = index
+        row = {"id": uuid.uuid4(), "created_at": created_at, **feature.model_dump()}
+        pending.append((index, row))
+
+    if pending:
+        table = models.Feature.__table__
+        statement = insert(table).on_conflict_do_nothing(index_elements=["name"])
+        params = [row for _, row in pending]
+        inserted = set((await db.execute(statement.returning(table.c.name), params)).scalars())
+        conflicting = [row["name"] for row in params if row["name"] not in inserted]
+        registered = {}
+        if conflicting:
+            lookup = select(table.c.name, table.c.id).where(table.c.name.in_(conflicting))
+            registered = dict((await db.execute(lookup)).tuples().all())
+        await db.commit()
+        for index, row in pending:
+            if row["name"] in inserted:
+                results.append(BulkRowResult(index=index, status="created", id=row["id"]))
+            else:
+                feature_id = registered.get(row["name"])
+                results.append(BulkRowResult(index=index, status="exists", id=feature_id))
+    return BulkResponse.from_results(results)
+
+
 @router.get("/", response_model=list[Feature])
-def list_features(db: Session = Depends(get_session)) -> list[Feature]:
-    features = db.query(models.Feature).order_by(models.Feature.created_at.desc()).all()
-    return [Feature.model_validate(item) for item in features]
+async def list_features(
+    response: Response,
+    dtype: FeatureDType | None = None,
+    origin: FeatureOrigin | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[Feature]:
+    filters = []
+    if dtype is not None:
+        filters.append(models.Feature.dtype == dtype)
+    if origin is not None:
+        filters.append(models.Feature.origin == origin)
+    return await paginate(db, models.Feature, Feature, page, response, filters)
 
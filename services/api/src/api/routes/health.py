@@ -6,12 +6,12 @@ router = APIRouter()
 
 
 @router.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok"}
 
 
 @router.get("/version")
-def version() -> dict:
+async def version() -> dict:
     settings = get_settings()
     return {"version": settings.APP_VERSION, "git_sha": settings.GIT_SHA}
 
@@ -1,34 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+import uuid
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from api.auth import get_user
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import read_rows, validate_rows
 from api.db import models
 from api.db.session import get_session
-from api.schemas import RunSpecCreate
+from api.pagination import PageParams, paginate
+from api.schemas import BulkResponse, BulkRowResult, RunSpecCreate
 from core.domain.v0 import RunSpec
 
 router = APIRouter(prefix="/run-specs", tags=["run_specs"])
 
 
 @router.post("/", response_model=RunSpec)
-def create_run_spec(
+async def create_run_spec(
     payload: RunSpecCreate,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_session),
     user: str = Depends(get_user),
 ) -> RunSpec:
-    dataset_version = (
-        db.query(models.DatasetVersion)
-        .filter(models.DatasetVersion.id == payload.dataset_version_id)
-        .one_or_none()
-    )
+    dataset_version = await db.get(models.DatasetVersion, payload.dataset_version_id)
     if not dataset_version:
         raise HTTPException(status_code=404, detail="Dataset version not found")
 
-    feature_set_version = (
-        db.query(models.FeatureSetVersion)
-        .filter(models.FeatureSetVersion.id == payload.feature_set_version_id)
-        .one_or_none()
-    )
+    feature_set_version = await db.get(models.FeatureSetVersion, payload.feature_set_version_id)
     if not feature_set_version:
         raise HTTPException(status_code=404, detail="Feature set version not found")
 
@@ -37,13 +36,80 @@ def create_run_spec(
         data["created_by"] = user
     run_spec = models.RunSpec(**data)
     db.add(run_spec)
-    db.commit()
-    db.refresh(run_spec)
+    await db.commit()
+    await db.refresh(run_spec)
     return RunSpec.model_validate(run_spec)
 
 
+@router.post(":bulk", response_model=BulkResponse)
+async def create_run_specs_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+    user: str = Depends(get_user),
+) -> BulkResponse:
+    """Register many run specs from JSON Lines or Arrow in one transaction.
+
+    Rows whose dataset or feature set version does not exist are reported ``invalid``.
+    """
+    valid, failed = validate_rows(RunSpecCreate, await read_rows(request))
+    results = list(failed.values())
+    dataset_versions = {spec.dataset_version_id for _, spec in valid}
+    feature_set_versions = {spec.feature_set_version_id for _, spec in valid}
+    if dataset_versions:
+        found = select(models.DatasetVersion.id).where(
+            models.DatasetVersion.id.in_(dataset_versions)
+        )
+        dataset_versions = set((await db.scalars(found)).all())
+        found = select(models.FeatureSetVersion.id).where(
+            models.FeatureSetVersion.id.in_(feature_set_versions)
+        )
+        feature_set_versions = set((await db.scalars(found)).all())
+
+    created_at = datetime.utcnow()
+    params = []
+    for index, spec in valid:
+        if spec.dataset_version_id not in dataset_versions:
+            error = "dataset_version_id: Dataset version not found"
+        elif spec.feature_set_version_id not in feature_set_versions:
+            error = "feature_set_version_id: Feature set version not found"
+        else:
+            row = {"id": uuid.uuid4(), "created_at": created_at, **spec.model_dump()}
+            row["created_by"] = row["created_by"] or user
+            params.append(row)
+            results.append(BulkRowResult(index=index, status="created", id=row["id"]))
+            continue
+        results.append(BulkRowResult(index=index, status="invalid", error=error))
+    if params:
+        await db.execute(insert(models.RunSpec.__table__), params)
+        await db.commit()
+    return BulkResponse.from_results(results)
+
+
 @router.get("/", response_model=list[RunSpec])
-def list_run_specs(db: Session = Depends(get_session)) -> list[RunSpec]:
-    run_specs = db.query(models.RunSpec).order_by(models.RunSpec.created_at.desc()).all()
-    return [RunSpec.model_validate(item) for item in run_specs]
+async def list_run_specs(
+    response: Response,
+    dataset_id: UUID | None = None,
+    dataset_version_id: UUID | None = None,
+    feature_set_version_id: UUID | None = None,
+    model_family: str | None = None,
+    created_by: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[RunSpec]:
+    spec = models.RunSpec
+    filters = []
+    if dataset_id is not None:
+        versions = select(models.DatasetVersion.id).where(
+            models.DatasetVersion.dataset_id == dataset_id
+        )
+        filters.append(spec.dataset_version_id.in_(versions))
+    if dataset_version_id is not None:
+        filters.append(spec.dataset_version_id == dataset_version_id)
+    if feature_set_version_id is not None:
+        filters.append(spec.feature_set_version_id == feature_set_version_id)
+    if model_family is not None:
+        filters.append(spec.model_family == model_family)
+    if created_by is not None:
+        filters.append(spec.created_by == created_by)
+    return await paginate(db, spec, RunSpec, page, response, filters)
 
@@ -1,23 +1,38 @@
 from datetime import datetime
+from uuid import UUID
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.config import get_settings
 from api.db import models
-from api.db.session import get_session
-from api.schemas import RunCreate, RunExecuteRequest
+from api.config import get_settings
+from api.db.session import SessionLocal, get_session
+from api.pagination import PageParams, paginate
+from api.run_logs import parse_position, tail_run_log
+from api.runner_client import get_runner_client
+from api.schemas import (
+    RunCreate,
+    RunExecuteRequest,
+    RunExecuteResponse,
+    RunScoreRequest,
+    RunScoreResponse,
+    ScoringJob,
+)
+from api.store import get_store
 from core.domain.v0 import Run, RunStatus
+from core.storage import ObjectStore
+
+FINISHED_STATUSES = (RunStatus.SUCCEEDED, RunStatus.FAILED)
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
 
 @router.post("/", response_model=Run)
-def create_run(payload: RunCreate, db: Session = Depends(get_session)) -> Run:
-    run_spec = (
-        db.query(models.RunSpec).filter(models.RunSpec.id == payload.run_spec_id).one_or_none()
-    )
+async def create_run(payload: RunCreate, db: AsyncSession = Depends(get_session)) -> Run:
+    run_spec = await db.get(models.RunSpec, payload.run_spec_id)
     if not run_spec:
         raise HTTPException(status_code=404, detail="Run spec not found")
 
@@ -27,28 +42,137 @@ def create_run(payload: RunCreate, db: Session = Depends(get_session)) -> Run:
         created_at=datetime.utcnow(),
     )
     db.add(run)
-    db.commit()
-    db.refresh(run)
+    await db.commit()
+    await db.refresh(run)
     return Run.model_validate(run)
 
 
 @router.get("/", response_model=list[Run])
-def list_runs(db: Session = Depends(get_session)) -> list[Run]:
-    runs = db.query(models.Run).order_by(models.Run.created_at.desc()).all()
-    return [Run.model_validate(item) for item in runs]
+async def list_runs(
+    response: Response,
+    status: RunStatus | None = None,
+    run_spec_id: UUID | None = None,
+    dataset_id: UUID | None = None,
+    created_by: str | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[Run]:
+    """Runs newest first; ``dataset_id`` and ``created_by`` match through the run spec."""
+    filters = []
+    if status is not None:
+        filters.append(models.Run.status == status)
+    if run_spec_id is not None:
+        filters.append(models.Run.run_spec_id == run_spec_id)
+    if dataset_id is not None or created_by is not None:
+        specs = select(models.RunSpec.id)
+        if dataset_id is not None:
+            specs = specs.join(
+                models.DatasetVersion,
+                models.DatasetVersion.id == models.RunSpec.dataset_version_id,
+            ).where(models.DatasetVersion.dataset_id == dataset_id)
+        if created_by is not None:
+            specs = specs.where(models.RunSpec.created_by == created_by)
+        filters.append(models.Run.run_spec_id.in_(specs))
+    return await paginate(db, models.Run, Run, page, response, filters)
 
 
-@router.post("/execute")
-def execute_run(payload: RunExecuteRequest) -> dict:
-    settings = get_settings()
+@router.post("/execute", response_model=RunExecuteResponse, status_code=202)
+async def execute_run(
+    payload: RunExecuteRequest, db: AsyncSession = Depends(get_session)
+) -> RunExecuteResponse:
+    """Queue a run for ``payload.run_spec_id``; runner workers claim it from the runs table."""
+    run_spec = await db.get(models.RunSpec, payload.run_spec_id)
+    if not run_spec:
+        raise HTTPException(status_code=404, detail="Run spec not found")
+
+    run = models.Run(
+        run_spec_id=payload.run_spec_id,
+        status=RunStatus.QUEUED,
+        created_at=datetime.utcnow(),
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    return RunExecuteResponse(run_id=run.id, status=run.status, created_at=run.created_at)
+
+
+@router.post("/{run_id}/score", response_model=RunScoreResponse, status_code=202)
+async def score_run(
+    run_id: UUID,
+    payload: RunScoreRequest,
+    runner: httpx.AsyncClient = Depends(get_runner_client),
+) -> RunScoreResponse:
+    """Queue batch scoring with the run's model; outputs land under ``reports/{run_id}/``.
+
+    The runner validates the request and records a ``scoring_jobs`` row that its
+    workers claim; poll ``GET /runs/{run_id}/scoring-jobs/{job_id}`` for the outcome.
+    """
     try:
-        response = httpx.post(
-            f"{settings.RUNNER_URL}/execute",
-            json={"run_spec_id": str(payload.run_spec_id)},
-            timeout=30,
+        response = await runner.post(
+            f"/runs/{run_id}/score", json=payload.model_dump(mode="json")
         )
-        response.raise_for_status()
     except httpx.HTTPError as exc:
         raise HTTPException(status_code=502, detail=f"Runner error: {exc}") from exc
-    return response.json()
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail=response.json().get("detail"))
+    if response.is_error:
+        raise HTTPException(status_code=502, detail=f"Runner error: {response.status_code}")
+    return RunScoreResponse.model_validate(response.json())
+
+
+@router.get("/{run_id}/scoring-jobs", response_model=list[ScoringJob])
+async def list_scoring_jobs(
+    run_id: UUID,
+    response: Response,
+    status: RunStatus | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_session),
+) -> list[ScoringJob]:
+    filters = [models.ScoringJob.run_id == run_id]
+    if status is not None:
+        filters.append(models.ScoringJob.status == status)
+    return await paginate(db, models.ScoringJob, ScoringJob, page, response, filters)
+
 
+@router.get("/{run_id}/scoring-jobs/{job_id}", response_model=ScoringJob)
+async def get_scoring_job(
+    run_id: UUID, job_id: UUID, db: AsyncSession = Depends(get_session)
+) -> ScoringJob:
+    job = await db.get(models.ScoringJob, job_id)
+    if not job or job.run_id != run_id:
+        raise HTTPException(status_code=404, detail="Scoring job not found")
+    return ScoringJob.model_validate(job)
+
+
+@router.get("/{run_id}/logs/stream")
+async def stream_run_log(
+    run_id: UUID,
+    position: str | None = Query(None, description="chunk:offset to resume after"),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_session),
+    store: ObjectStore = Depends(get_store),
+) -> StreamingResponse:
+    """Tail a run's log as server-sent events, one event per line, until the run ends."""
+    if not await db.get(models.Run, run_id):
+        raise HTTPException(status_code=404, detail="Run not found")
+    resume = last_event_id or position
+    start = parse_position(resume) if resume else None
+
+    async def finished() -> bool:
+        # The request's session is closed once streaming starts.
+        async with SessionLocal() as session:
+            status = await session.scalar(select(models.Run.status).where(models.Run.id == run_id))
+        return status is None or status in FINISHED_STATUSES
+
+    settings = get_settings()
+    events = tail_run_log(
+        store,
+        str(run_id),
+        start,
+        finished,
+        poll_interval_s=settings.LOG_TAIL_POLL_INTERVAL_S,
+        keepalive_s=settings.LOG_TAIL_KEEPALIVE_S,
+        grace_s=settings.LOG_TAIL_GRACE_S,
+    )
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events, media_type="text/event-stream", headers=headers)
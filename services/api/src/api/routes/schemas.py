@@ -1,7 +1,10 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from api.cache import SCHEMA_CACHE_CONTROL, CachedResponse, cached_response
 
 router = APIRouter(prefix="/schemas", tags=["schemas"])
 
@@ -11,18 +14,26 @@ def _schema_dir() -> Path:
     return repo_root / "schemas" / "v0"
 
 
+@lru_cache(maxsize=1)
+def schema_responses() -> dict[str, CachedResponse]:
+    """Every checked-in schema, serialized once per process (warmed at startup)."""
+    return {
+        path.stem: CachedResponse.from_payload(json.loads(path.read_text()))
+        for path in sorted(_schema_dir().glob("*.json"))
+    }
+
+
 @router.get("/v0")
-def schema_bundle() -> dict:
-    path = _schema_dir() / "bundle.json"
-    if not path.exists():
+async def schema_bundle(request: Request) -> Response:
+    cached = schema_responses().get("bundle")
+    if cached is None:
         raise HTTPException(status_code=404, detail="Schema bundle not found")
-    return json.loads(path.read_text())
+    return cached_response(request, cached, SCHEMA_CACHE_CONTROL)
 
 
 @router.get("/v0/{name}")
-def schema_by_name(name: str) -> dict:
-    path = _schema_dir() / f"{name}.json"
-    if not path.exists():
+async def schema_by_name(name: str, request: Request) -> Response:
+    cached = schema_responses().get(name)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Schema not found")
-    return json.loads(path.read_text())
-
+    return cached_response(request, cached, SCHEMA_CACHE_CONTROL)
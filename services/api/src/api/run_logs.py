@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from fastapi import HTTPException
+
+from core.storage import ObjectStore, run_log_chunk_key, run_log_end_key, run_log_prefix
+
+# Chunk keys are run_log_chunk_key(): runner-{seq:06d}.log under the run's log prefix.
+CHUNK_PREFIX = "runner-"
+CHUNK_SUFFIX = ".log"
+
+
+def parse_position(value: str) -> tuple[int, int]:
+    """A ``"{chunk}:{offset}"`` event id, as sent back in ``Last-Event-ID``."""
+    try:
+        seq, offset = (int(part) for part in value.split(":"))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail="Invalid log position") from exc
+    if seq < 0 or offset < 0:
+        raise HTTPException(status_code=422, detail="Invalid log position")
+    return seq, offset
+
+
+def _list_chunks(store: ObjectStore, run_id: str) -> tuple[list[int], bool]:
+    prefix = run_log_prefix(run_id)
+    end_key = run_log_end_key(run_id)
+    chunks, ended = [], False
+    for key in store.iter_keys(prefix):
+        name = key[len(prefix) :]
+        if key == end_key:
+            ended = True
+        elif name.startswith(CHUNK_PREFIX) and name.endswith(CHUNK_SUFFIX):
+            chunks.append(int(name[len(CHUNK_PREFIX) : -len(CHUNK_SUFFIX)]))
+    return sorted(chunks), ended
+
+
+def _read_lines(store: ObjectStore, key: str, offset: int) -> tuple[list[tuple[str, int]], int]:
+    """Complete lines of ``key`` after ``offset``, each with the offset just past it."""
+    size = store.size(key)
+    if size <= offset:
+        return [], size
+    data = store.get_range(key, offset, size)
+    lines = []
+    start = 0
+    while (end := data.find(b"\n", start)) != -1:
+        lines.append((data[start:end].decode("utf-8", errors="replace"), offset + end + 1))
+        start = end + 1
+    return lines, size
+
+
+def _event(data: str, event_id: str | None = None, event: str | None = None) -> str:
+    fields = []
+    if event:
+        fields.append(f"event: {event}")
+    if event_id:
+        fields.append(f"id: {event_id}")
+    # Lines never contain "\n"; a stray "\r" would also end an SSE field.
+    fields.append(f"data: {data.replace(chr(13), '')}")
+    return "\n".join(fields) + "\n\n"
+
+
+async def tail_run_log(
+    store: ObjectStore,
+    run_id: str,
+    position: tuple[int, int] | None,
+    finished: Callable[[], Awaitable[bool]],
+    poll_interval_s: float = 1.0,
+    keepalive_s: float = 15.0,
+    grace_s: float = 30.0,
+) -> AsyncIterator[str]:
+    """Server-sent events for each line of a run's chunked log, following it as it grows.
+
+    Without ``position`` the tail starts at the newest chunk. Every event id is
+    the ``chunk:offset`` just past its line, so a client resumes exactly where
+    it stopped. The stream ends with an ``end`` event once the runner has written
+    its end marker and every chunk has been read, or when the run has finished
+    without a marker (a crashed runner) and nothing new arrived for ``grace_s``.
+    """
+    seq, offset = position if position is not None else (None, 0)
+    last_event = time.monotonic()
+    idle_since: float | None = None
+    while True:
+        done = await finished()
+        chunks, ended = await asyncio.to_thread(_list_chunks, store, run_id)
+        if seq is None and chunks:
+            seq = chunks[-1]
+        progressed = False
+        while seq is not None and chunks and seq <= chunks[-1]:
+            if seq in chunks:
+                key = run_log_chunk_key(run_id, seq)
+                lines, size = await asyncio.to_thread(_read_lines, store, key, offset)
+                for line, next_offset in lines:
+                    yield _event(line, f"{seq}:{next_offset}")
+                if lines:
+                    offset = lines[-1][1]
+                    progressed = True
+                if offset < size or seq == chunks[-1]:
+                    break
+            seq, offset = seq + 1, 0
+        now = time.monotonic()
+        if progressed:
+            last_event, idle_since = now, None
+            continue
+        caught_up = seq is None or not chunks or seq >= chunks[-1]
+        if ended and caught_up:
+            yield _event("", event="end")
+            return
+        if done:
+            idle_since = idle_since if idle_since is not None else now
+            if now - idle_since >= grace_s:
+                yield _event("", event="end")
+                return
+        if now - last_event >= keepalive_s:
+            last_event = now
+            yield ": keepalive\n\n"
+        await asyncio.sleep(poll_interval_s)
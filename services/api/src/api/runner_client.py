@@ -0,0 +1,21 @@
+import httpx
+from fastapi import Request
+
+from api.config import get_settings
+
+
+def create_runner_client() -> httpx.AsyncClient:
+    """A pooled client for runner calls, shared by every request of the app."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        base_url=settings.RUNNER_URL,
+        timeout=settings.RUNNER_TIMEOUT_S,
+        limits=httpx.Limits(
+            max_connections=settings.RUNNER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.RUNNER_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def get_runner_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.runner_client
@@ -1,9 +1,10 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from core.domain.v0.enums import DatasetStatus, FeatureDType, FeatureOrigin
+from core.domain.v0.enums import DatasetStatus, FeatureDType, FeatureOrigin, RunStatus
 
 
 class APIBase(BaseModel):
@@ -68,3 +69,66 @@ class RunCreate(APIBase):
 class RunExecuteRequest(APIBase):
     run_spec_id: UUID
 
+
+
+class RunExecuteResponse(APIBase):
+    run_id: UUID
+    status: RunStatus
+    created_at: datetime
+
+
+class RunScoreRequest(APIBase):
+    dataset_version_id: UUID | None = None
+    id_columns: list[str] = Field(default_factory=list)
+
+
+class RunScoreResponse(APIBase):
+    job_id: UUID
+    status: RunStatus
+    run_id: UUID
+    dataset_version_id: UUID
+    output_prefix: str
+    partitions: int
+
+
+class ScoringJob(APIBase):
+    model_config = ConfigDict(extra="forbid", from_attributes=True)
+
+    id: UUID
+    run_id: UUID
+    dataset_version_id: UUID
+    id_columns: list[str]
+    status: RunStatus
+    output_prefix: str
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    summary: dict | None = None
+    failure_reason: str | None = None
+
+
+class BulkRowResult(APIBase):
+    index: int
+    status: Literal["created", "exists", "invalid"]
+    id: UUID | None = None
+    error: str | None = None
+
+
+class BulkResponse(APIBase):
+    created: int
+    existing: int
+    invalid: int
+    results: list[BulkRowResult]
+
+    @classmethod
+    def from_results(cls, results: list[BulkRowResult]) -> "BulkResponse":
+        results = sorted(results, key=lambda result: result.index)
+        counts = {status: 0 for status in ("created", "exists", "invalid")}
+        for result in results:
+            counts[result.status] += 1
+        return cls(
+            created=counts["created"],
+            existing=counts["exists"],
+            invalid=counts["invalid"],
+            results=results,
+        )
@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+from api.config import get_settings
+from core.storage import S3CompatibleStore, S3Settings
+
+
+@lru_cache(maxsize=1)
+def get_store() -> S3CompatibleStore:
+    settings = get_settings()
+    return S3CompatibleStore(
+        S3Settings(
+            endpoint_url=settings.S3_ENDPOINT,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            bucket=settings.S3_BUCKET,
+            region=settings.S3_REGION,
+        )
+    )
@@ -1,14 +1,20 @@
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.concurrency import run_in_threadpool
 
 from core.domain.v0 import RunSpec
 from core.domain.v0.enums import RunStatus
 from runner.config import get_settings
-from runner.runtime import execute_run_spec, get_run_spec_by_id
-from runner.store import get_store
+from runner.db import fetch_scoring_job
+from runner.engine import pool_metrics, transaction
+from runner.runtime import enqueue_run_spec, get_run_spec_by_id
+from runner.scoring import enqueue_scoring
+from runner.serving import ModelNotFound, get_model_cache
+from runner.store import get_cache, get_store
 
 
 class ExecuteRequest(BaseModel):
@@ -21,7 +27,47 @@ class ExecuteRequest(BaseModel):
 class ExecuteResponse(BaseModel):
     run_id: UUID
     status: RunStatus
-    started_at: datetime
+
+
+class ScoreRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    dataset_version_id: UUID | None = None
+    id_columns: list[str] = Field(default_factory=list)
+
+
+class ScoreResponse(BaseModel):
+    job_id: UUID
+    status: RunStatus
+    run_id: UUID
+    dataset_version_id: UUID
+    output_prefix: str
+    partitions: int
+
+
+class ScoringJobResponse(BaseModel):
+    id: UUID
+    run_id: UUID
+    dataset_version_id: UUID
+    id_columns: list[str]
+    status: RunStatus
+    output_prefix: str
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    summary: dict | None = None
+    failure_reason: str | None = None
+
+
+class ModelScoreRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    records: list[dict[str, Any]] = Field(min_length=1)
+
+
+class ModelScoreResponse(BaseModel):
+    model_id: UUID
+    scores: list[float]
 
 
 def create_app() -> FastAPI:
@@ -31,13 +77,30 @@ def create_app() -> FastAPI:
     def health() -> dict:
         return {"status": "ok"}
 
-    @app.post("/execute", response_model=ExecuteResponse)
+    @app.get("/metrics/db-pool")
+    def db_pool_metrics() -> dict:
+        return pool_metrics(get_settings())
+
+    @app.get("/metrics/cache")
+    def cache_metrics() -> dict:
+        cache = get_cache(get_settings())
+        return {**cache.stats.snapshot(), "size_bytes": cache.size_bytes()}
+
+    @app.get("/metrics/models")
+    def model_cache_metrics() -> dict:
+        cache = get_model_cache(get_settings())
+        return {
+            **cache.stats.snapshot(),
+            "size_bytes": cache.size_bytes(),
+            "models": [str(model_id) for model_id in cache.model_ids()],
+        }
+
+    @app.post("/execute", response_model=ExecuteResponse, status_code=202)
     def execute(payload: ExecuteRequest) -> ExecuteResponse:
         if not payload.run_spec_id and not payload.run_spec:
             raise HTTPException(status_code=400, detail="Provide run_spec_id or run_spec")
 
         settings = get_settings()
-        store = get_store(settings)
 
         if payload.run_spec_id:
             run_spec = get_run_spec_by_id(settings, payload.run_spec_id)
@@ -46,12 +109,60 @@ def create_app() -> FastAPI:
         else:
             run_spec = payload.run_spec
 
-        run_id, started_at, status = execute_run_spec(
-            settings=settings,
-            store=store,
-            run_spec=run_spec,
+        try:
+            run_id = enqueue_run_spec(settings, run_spec)
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return ExecuteResponse(run_id=run_id, status=RunStatus.QUEUED)
+
+    @app.post("/runs/{run_id}/score", response_model=ScoreResponse, status_code=202)
+    def score(run_id: UUID, payload: ScoreRequest) -> ScoreResponse:
+        """Queue a scoring job; runner workers claim it from the ``scoring_jobs`` table."""
+        settings = get_settings()
+        try:
+            job_id, plan = enqueue_scoring(
+                settings,
+                get_store(settings),
+                run_id,
+                payload.dataset_version_id,
+                tuple(payload.id_columns),
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return ScoreResponse(
+            job_id=job_id,
+            status=RunStatus.QUEUED,
+            run_id=run_id,
+            dataset_version_id=plan.dataset_version_id,
+            output_prefix=plan.output_prefix,
+            partitions=len(plan.partition_keys),
         )
-        return ExecuteResponse(run_id=run_id, status=status, started_at=started_at)
+
+    @app.get("/scoring-jobs/{job_id}", response_model=ScoringJobResponse)
+    def scoring_job(job_id: UUID) -> ScoringJobResponse:
+        with transaction(get_settings()) as conn:
+            job = fetch_scoring_job(conn, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Scoring job not found")
+        return ScoringJobResponse.model_validate(job)
+
+    @app.post("/models/{model_id}/score", response_model=ModelScoreResponse)
+    async def score_records(model_id: UUID, payload: ModelScoreRequest) -> ModelScoreResponse:
+        cache = get_model_cache(get_settings())
+        try:
+            served = await run_in_threadpool(cache.get, model_id)
+        except ModelNotFound as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        try:
+            encoded = served.encode(payload.records)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=422, detail=f"Invalid record: {exc}") from exc
+        scores = await served.batcher.submit(encoded)
+        return ModelScoreResponse(model_id=model_id, scores=scores.tolist())
+
+    @app.delete("/models/{model_id}/cache", status_code=204)
+    def evict_model(model_id: UUID) -> None:
+        get_model_cache(get_settings()).invalidate(model_id)
 
     return app
 
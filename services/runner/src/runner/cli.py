@@ -1,12 +1,21 @@
 import argparse
+import json
+import logging
 from pathlib import Path
+from uuid import UUID
 
 import yaml
 
 from core.domain.v0 import RunSpec
+from ml import SweepSpec
 from runner.config import get_settings
+from runner.ingest import ingest_dataset_version, profile_dataset_version
 from runner.runtime import execute_run_spec
+from runner.scoring import score_run
 from runner.store import get_store
+from runner.sweep import sweep_run_spec
+from runner.tracking import replay_spool, tracking_client
+from runner.worker import run_worker_pool
 
 
 def _load_spec(path: Path) -> RunSpec:
@@ -24,16 +33,118 @@ def run_from_spec(spec_path: Path) -> int:
     return 0
 
 
+def sweep(spec_path: Path) -> int:
+    payload = yaml.safe_load(spec_path.read_text())
+    sweep_spec = SweepSpec.from_dict(payload.pop("sweep", None) or {})
+    run_spec = RunSpec.model_validate(payload)
+    settings = get_settings()
+    summary = sweep_run_spec(settings, get_store(settings), run_spec, sweep_spec)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def ingest(
+    dataset_id: UUID, version: str, source_format: str | None, created_by: str | None
+) -> int:
+    settings = get_settings()
+    version_id, result = ingest_dataset_version(
+        settings,
+        get_store(settings),
+        dataset_id,
+        version,
+        source_format=source_format,
+        created_by=created_by,
+    )
+    print(
+        json.dumps(
+            {
+                "dataset_version_id": str(version_id),
+                "data_fingerprint": result.data_fingerprint,
+                "schema_hash": result.schema_hash,
+                "row_count": result.row_count,
+                "partitions": result.partitions,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+def profile(dataset_version_id: UUID) -> int:
+    settings = get_settings()
+    summary = profile_dataset_version(settings, get_store(settings), dataset_version_id)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def score(run_id: UUID, dataset_version_id: UUID | None, id_columns: list[str]) -> int:
+    settings = get_settings()
+    summary = score_run(
+        settings, get_store(settings), run_id, dataset_version_id, tuple(id_columns)
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def replay_tracking(spool_dir: Path) -> int:
+    run_id = replay_spool(tracking_client(get_settings()), spool_dir)
+    print(json.dumps({"mlflow_run_id": run_id}, indent=2))
+    return 0
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(prog="runner")
     subparsers = parser.add_subparsers(dest="command", required=True)
     run_cmd = subparsers.add_parser("run", help="Run a spec file")
     run_cmd.add_argument("--spec", required=True, type=Path)
+    sweep_cmd = subparsers.add_parser(
+        "sweep", help="Sweep model_params of a spec file (with a top-level 'sweep' section)"
+    )
+    sweep_cmd.add_argument("--spec", required=True, type=Path)
+    ingest_cmd = subparsers.add_parser("ingest", help="Ingest a dataset's storage_uri")
+    ingest_cmd.add_argument("--dataset-id", required=True, type=UUID)
+    ingest_cmd.add_argument("--version", required=True)
+    ingest_cmd.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    ingest_cmd.add_argument("--created-by", default=None)
+    profile_cmd = subparsers.add_parser(
+        "profile", help="Recompute statistics_summary for a dataset version"
+    )
+    profile_cmd.add_argument("--dataset-version-id", required=True, type=UUID)
+    score_cmd = subparsers.add_parser(
+        "score", help="Batch-score a dataset version with a run's model"
+    )
+    score_cmd.add_argument("--run-id", required=True, type=UUID)
+    score_cmd.add_argument("--dataset-version-id", type=UUID, default=None)
+    score_cmd.add_argument(
+        "--id-column", dest="id_columns", action="append", default=[], help="Column to copy"
+    )
+    replay_cmd = subparsers.add_parser(
+        "tracking-replay", help="Ship a run's spooled MLflow tracking data"
+    )
+    replay_cmd.add_argument(
+        "--spool-dir", required=True, type=Path, help="The run's RUN_WORKDIR/<run_id>/tracking"
+    )
+    worker_cmd = subparsers.add_parser("worker", help="Execute queued runs")
+    worker_cmd.add_argument("--concurrency", type=int, default=None)
 
     args = parser.parse_args()
 
     if args.command == "run":
         run_from_spec(args.spec)
+    elif args.command == "sweep":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+        sweep(args.spec)
+    elif args.command == "ingest":
+        ingest(args.dataset_id, args.version, args.format, args.created_by)
+    elif args.command == "profile":
+        profile(args.dataset_version_id)
+    elif args.command == "score":
+        score(args.run_id, args.dataset_version_id, args.id_columns)
+    elif args.command == "tracking-replay":
+        replay_tracking(args.spool_dir)
+    elif args.command == "worker":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+        run_worker_pool(args.concurrency)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,49 @@
+import enum
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import Column, DateTime, Enum, MetaData, String, Table, select, update
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    select,
+    update,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.engine import Connection
 
-from core.domain.v0.enums import RunStatus
+from core.domain.v0.enums import FeatureDType, ModelRegistryState, RunStatus
+from runner.lease import LeaseLost
 
 
 metadata = MetaData()
 
+
+def _enum_values(enum_cls: type[enum.Enum]) -> list[str]:
+    # Persist enum values ("queued"), matching the labels created by the migrations.
+    return [member.value for member in enum_cls]
+
+
+datasets = Table(
+    "datasets",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("name", String(length=255), nullable=False),
+    Column("storage_uri", Text, nullable=False),
+    Column("schema_hash", String(length=128), nullable=True),
+    Column("row_count", Integer, nullable=True),
+    Column("date_start", Date, nullable=True),
+    Column("date_end", Date, nullable=True),
+    Column("target_definition", Text, nullable=True),
+    Column("updated_at", DateTime, nullable=False),
+)
+
 dataset_versions = Table(
     "dataset_versions",
     metadata,
@@ -17,6 +51,23 @@ dataset_versions = Table(
     Column("dataset_id", UUID(as_uuid=True), nullable=False),
     Column("version", String(length=64), nullable=False),
     Column("created_at", DateTime, nullable=False),
+    Column("created_by", String(length=255), nullable=True),
+    Column("data_fingerprint", String(length=128), nullable=False),
+    Column("statistics_summary", JSONB, nullable=True),
+)
+
+features = Table(
+    "features",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("name", String(length=255), nullable=False),
+    Column(
+        "dtype",
+        Enum(FeatureDType, name="feature_dtype", values_callable=_enum_values),
+        nullable=False,
+    ),
+    Column("description", Text, nullable=True),
+    Column("monotonic_expectation", String(length=64), nullable=True),
 )
 
 feature_set_versions = Table(
@@ -26,6 +77,7 @@ feature_set_versions = Table(
     Column("feature_set_id", UUID(as_uuid=True), nullable=False),
     Column("version", String(length=64), nullable=False),
     Column("created_at", DateTime, nullable=False),
+    Column("features", JSONB, nullable=True),
 )
 
 run_specs = Table(
@@ -48,7 +100,11 @@ runs = Table(
     metadata,
     Column("id", UUID(as_uuid=True), primary_key=True),
     Column("run_spec_id", UUID(as_uuid=True), nullable=False),
-    Column("status", Enum(RunStatus, name="run_status"), nullable=False),
+    Column(
+        "status",
+        Enum(RunStatus, name="run_status", values_callable=_enum_values),
+        nullable=False,
+    ),
     Column("created_at", DateTime, nullable=False),
     Column("started_at", DateTime, nullable=True),
     Column("finished_at", DateTime, nullable=True),
@@ -56,8 +112,119 @@ runs = Table(
     Column("artifacts_uri", String(length=512), nullable=True),
     Column("failure_reason", String(length=2048), nullable=True),
     Column("failure_trace_uri", String(length=512), nullable=True),
+    Column("heartbeat_at", DateTime, nullable=True),
+    Column("attempts", Integer, nullable=False, default=0),
 )
 
+scoring_jobs = Table(
+    "scoring_jobs",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("run_id", UUID(as_uuid=True), nullable=False),
+    Column("dataset_version_id", UUID(as_uuid=True), nullable=False),
+    Column("id_columns", JSONB, nullable=False),
+    Column(
+        "status",
+        Enum(RunStatus, name="run_status", values_callable=_enum_values),
+        nullable=False,
+    ),
+    Column("output_prefix", Text, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("started_at", DateTime, nullable=True),
+    Column("finished_at", DateTime, nullable=True),
+    Column("summary", JSONB, nullable=True),
+    Column("failure_reason", Text, nullable=True),
+    Column("heartbeat_at", DateTime, nullable=True),
+    Column("attempts", Integer, nullable=False, default=0),
+)
+
+models = Table(
+    "models",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("name", String(length=255), nullable=False),
+    Column("produced_from_run_id", UUID(as_uuid=True), nullable=False),
+    Column(
+        "registry_state",
+        Enum(ModelRegistryState, name="model_registry_state", values_callable=_enum_values),
+        nullable=False,
+    ),
+    Column("created_at", DateTime, nullable=False),
+)
+
+
+def fetch_dataset(conn: Connection, dataset_id: uuid.UUID) -> dict | None:
+    result = conn.execute(select(datasets).where(datasets.c.id == dataset_id)).mappings().first()
+    return dict(result) if result else None
+
+
+def fetch_dataset_version(
+    conn: Connection, dataset_id: uuid.UUID, version: str
+) -> dict | None:
+    result = (
+        conn.execute(
+            select(dataset_versions).where(
+                dataset_versions.c.dataset_id == dataset_id,
+                dataset_versions.c.version == version,
+            )
+        )
+        .mappings()
+        .first()
+    )
+    return dict(result) if result else None
+
+
+def fetch_dataset_version_by_id(conn: Connection, dataset_version_id: uuid.UUID) -> dict | None:
+    result = (
+        conn.execute(select(dataset_versions).where(dataset_versions.c.id == dataset_version_id))
+        .mappings()
+        .first()
+    )
+    return dict(result) if result else None
+
+
+def update_dataset_version_statistics(
+    conn: Connection, dataset_version_id: uuid.UUID, statistics_summary: dict
+) -> None:
+    conn.execute(
+        update(dataset_versions)
+        .where(dataset_versions.c.id == dataset_version_id)
+        .values(statistics_summary=statistics_summary)
+    )
+
+
+def insert_dataset_version(
+    conn: Connection,
+    dataset_id: uuid.UUID,
+    version: str,
+    data_fingerprint: str,
+    statistics_summary: dict | None,
+    created_by: str | None,
+) -> uuid.UUID:
+    version_id = uuid.uuid4()
+    conn.execute(
+        dataset_versions.insert().values(
+            id=version_id,
+            dataset_id=dataset_id,
+            version=version,
+            created_at=datetime.utcnow(),
+            created_by=created_by,
+            data_fingerprint=data_fingerprint,
+            statistics_summary=statistics_summary,
+        )
+    )
+    return version_id
+
+
+def update_dataset_ingest(
+    conn: Connection, dataset_id: uuid.UUID, schema_hash: str, row_count: int
+) -> None:
+    conn.execute(
+        update(datasets)
+        .where(datasets.c.id == dataset_id)
+        .values(schema_hash=schema_hash, row_count=row_count, updated_at=datetime.utcnow())
+    )
+
 
 def dataset_version_exists(conn: Connection, dataset_version_id: uuid.UUID) -> bool:
     result = conn.execute(
@@ -75,6 +242,22 @@ def feature_set_version_exists(conn: Connection, feature_set_version_id: uuid.UU
     return result is not None
 
 
+def fetch_feature_set_version(conn: Connection, feature_set_version_id: uuid.UUID) -> dict | None:
+    result = (
+        conn.execute(
+            select(feature_set_versions).where(feature_set_versions.c.id == feature_set_version_id)
+        )
+        .mappings()
+        .first()
+    )
+    return dict(result) if result else None
+
+
+def fetch_features_by_name(conn: Connection, names: list[str]) -> dict[str, dict]:
+    rows = conn.execute(select(features).where(features.c.name.in_(names))).mappings().all()
+    return {row["name"]: dict(row) for row in rows}
+
+
 def fetch_run_spec(conn: Connection, run_spec_id: uuid.UUID) -> dict | None:
     result = conn.execute(select(run_specs).where(run_specs.c.id == run_spec_id)).mappings().first()
     return dict(result) if result else None
@@ -113,6 +296,104 @@ def create_run(conn: Connection, run_spec_id: uuid.UUID, status: RunStatus) -> u
     return run_id
 
 
+def fetch_run(conn: Connection, run_id: uuid.UUID) -> dict | None:
+    result = conn.execute(select(runs).where(runs.c.id == run_id)).mappings().first()
+    return dict(result) if result else None
+
+
+def fetch_model(conn: Connection, model_id: uuid.UUID) -> dict | None:
+    result = conn.execute(select(models).where(models.c.id == model_id)).mappings().first()
+    return dict(result) if result else None
+
+
+def claim_next_run(conn: Connection) -> dict | None:
+    """Claim the oldest queued run and mark it running.
+
+    Uses ``FOR UPDATE SKIP LOCKED`` so concurrent workers never claim the same row;
+    the claim becomes visible to other workers when the caller's transaction commits.
+    The claim starts the run's lease (``heartbeat_at``) and counts an attempt;
+    ``attempt`` in the result fences the run's later status writes.
+    """
+    result = (
+        conn.execute(
+            select(runs.c.id, runs.c.run_spec_id, runs.c.attempts)
+            .where(runs.c.status == RunStatus.QUEUED)
+            .order_by(runs.c.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        .mappings()
+        .first()
+    )
+    if result is None:
+        return None
+    started_at = datetime.utcnow()
+    conn.execute(
+        update(runs)
+        .where(runs.c.id == result["id"])
+        .values(
+            status=RunStatus.RUNNING,
+            started_at=started_at,
+            heartbeat_at=started_at,
+            attempts=runs.c.attempts + 1,
+        )
+    )
+    return {
+        "id": result["id"],
+        "run_spec_id": result["run_spec_id"],
+        "started_at": started_at,
+        "attempt": result["attempts"] + 1,
+    }
+
+
+def _held(table: Table, row_id: uuid.UUID, attempt: int) -> list:
+    """Match ``row_id`` only while it is still running under the claim ``attempt``."""
+    return [table.c.id == row_id, table.c.status == RunStatus.RUNNING, table.c.attempts == attempt]
+
+
+def touch_lease(conn: Connection, table: Table, row_id: uuid.UUID, attempt: int) -> bool:
+    """Extend the lease on a running ``runs`` or ``scoring_jobs`` row.
+
+    Returns False when the row is no longer held under ``attempt``: the reaper
+    requeued or failed it, possibly for another worker to claim.
+    """
+    result = conn.execute(
+        update(table).where(*_held(table, row_id, attempt)).values(heartbeat_at=datetime.utcnow())
+    )
+    return result.rowcount == 1
+
+
+def reap_expired_leases(
+    conn: Connection, table: Table, lease_s: float, max_attempts: int
+) -> tuple[int, int]:
+    """Recover running rows whose worker stopped heartbeating ``lease_s`` ago.
+
+    Rows with attempts left go back to ``queued``; the rest are failed. Rows
+    without a heartbeat (runs executed inline by ``talaty-runner run``) are left
+    alone. Returns ``(requeued, failed)``.
+    """
+    now = datetime.utcnow()
+    expired = [
+        table.c.status == RunStatus.RUNNING,
+        table.c.heartbeat_at < now - timedelta(seconds=lease_s),
+    ]
+    requeued = conn.execute(
+        update(table)
+        .where(*expired, table.c.attempts < max_attempts)
+        .values(status=RunStatus.QUEUED, started_at=None, heartbeat_at=None)
+    ).rowcount
+    failed = conn.execute(
+        update(table)
+        .where(*expired, table.c.attempts >= max_attempts)
+        .values(
+            status=RunStatus.FAILED,
+            finished_at=now,
+            failure_reason=f"Worker lease expired after {max_attempts} attempts",
+        )
+    ).rowcount
+    return requeued, failed
+
+
 def update_run_status(
     conn: Connection,
     run_id: uuid.UUID,
@@ -123,7 +404,12 @@ def update_run_status(
     mlflow_run_id: str | None = None,
     failure_reason: str | None = None,
     failure_trace_uri: str | None = None,
+    attempt: int | None = None,
 ) -> None:
+    """Update a run row; with ``attempt``, only while that claim still holds it.
+
+    Raises :class:`LeaseLost` when a fenced update matches no row.
+    """
     values: dict = {"status": status}
     if started_at is not None:
         values["started_at"] = started_at
@@ -137,5 +423,96 @@ def update_run_status(
         values["failure_reason"] = failure_reason
     if failure_trace_uri is not None:
         values["failure_trace_uri"] = failure_trace_uri
-    conn.execute(update(runs).where(runs.c.id == run_id).values(**values))
+    _fenced_update(conn, runs, run_id, attempt, values)
+
+
+def _fenced_update(
+    conn: Connection, table: Table, row_id: uuid.UUID, attempt: int | None, values: dict
+) -> None:
+    where = [table.c.id == row_id] if attempt is None else _held(table, row_id, attempt)
+    result = conn.execute(update(table).where(*where).values(**values))
+    if attempt is not None and result.rowcount != 1:
+        raise LeaseLost(f"{table.name} row {row_id} is no longer held by attempt {attempt}")
 
+
+def create_scoring_job(
+    conn: Connection,
+    run_id: uuid.UUID,
+    dataset_version_id: uuid.UUID,
+    id_columns: list[str],
+    output_prefix: str,
+) -> uuid.UUID:
+    job_id = uuid.uuid4()
+    conn.execute(
+        scoring_jobs.insert().values(
+            id=job_id,
+            run_id=run_id,
+            dataset_version_id=dataset_version_id,
+            id_columns=id_columns,
+            status=RunStatus.QUEUED,
+            output_prefix=output_prefix,
+            created_at=datetime.utcnow(),
+        )
+    )
+    return job_id
+
+
+def fetch_scoring_job(conn: Connection, job_id: uuid.UUID) -> dict | None:
+    result = (
+        conn.execute(select(scoring_jobs).where(scoring_jobs.c.id == job_id)).mappings().first()
+    )
+    return dict(result) if result else None
+
+
+def claim_next_scoring_job(conn: Connection) -> dict | None:
+    """Claim the oldest queued scoring job and mark it running, as :func:`claim_next_run`."""
+    result = (
+        conn.execute(
+            select(scoring_jobs)
+            .where(scoring_jobs.c.status == RunStatus.QUEUED)
+            .order_by(scoring_jobs.c.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        .mappings()
+        .first()
+    )
+    if result is None:
+        return None
+    started_at = datetime.utcnow()
+    conn.execute(
+        update(scoring_jobs)
+        .where(scoring_jobs.c.id == result["id"])
+        .values(
+            status=RunStatus.RUNNING,
+            started_at=started_at,
+            heartbeat_at=started_at,
+            attempts=scoring_jobs.c.attempts + 1,
+        )
+    )
+    return {
+        **result,
+        "status": RunStatus.RUNNING,
+        "started_at": started_at,
+        "attempt": result["attempts"] + 1,
+    }
+
+
+def update_scoring_job(
+    conn: Connection,
+    job_id: uuid.UUID,
+    status: RunStatus,
+    finished_at: datetime | None = None,
+    summary: dict | None = None,
+    failure_reason: str | None = None,
+    attempt: int | None = None,
+) -> None:
+    """Update a scoring job row, fenced on ``attempt`` as :func:`update_run_status`."""
+    values: dict = {"status": status}
+    if finished_at is not None:
+        values["finished_at"] = finished_at
+    if summary is not None:
+        values["summary"] = summary
+    if failure_reason is not None:
+        values["failure_reason"] = failure_reason
+    _fenced_update(conn, scoring_jobs, job_id, attempt, values)
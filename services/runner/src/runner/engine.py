@@ -0,0 +1,110 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+
+from runner.config import RunnerSettings
+
+
+@dataclass
+class PoolMetrics:
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    timed_checkouts: int = 0
+    checkout_wait_total_s: float = 0.0
+    checkout_wait_max_s: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.timed_checkouts += 1
+            self.checkout_wait_total_s += seconds
+            self.checkout_wait_max_s = max(self.checkout_wait_max_s, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            payload = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"}
+        timed = payload["timed_checkouts"]
+        payload["checkout_wait_avg_s"] = payload["checkout_wait_total_s"] / timed if timed else 0.0
+        return payload
+
+
+_engines: dict[str, Engine] = {}
+_metrics: dict[str, PoolMetrics] = {}
+_lock = threading.Lock()
+
+
+def _instrument(engine: Engine, metrics: PoolMetrics) -> None:
+    event.listen(engine, "connect", lambda *_: metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *_: metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *_: metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *_: metrics.incr("invalidations"))
+
+
+def get_engine(settings: RunnerSettings) -> Engine:
+    """Return the process-wide engine for ``settings.DATABASE_URL``, creating it once."""
+    url = settings.DATABASE_URL
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            engine = create_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_S,
+                pool_recycle=settings.DB_POOL_RECYCLE_S,
+            )
+            metrics = PoolMetrics()
+            _instrument(engine, metrics)
+            _engines[url] = engine
+            _metrics[url] = metrics
+    return engine
+
+
+@contextmanager
+def transaction(settings: RunnerSettings) -> Iterator[Connection]:
+    """``engine.begin()`` on the shared engine, recording how long checkout waited."""
+    engine = get_engine(settings)
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        _metrics[settings.DATABASE_URL].record_wait(time.perf_counter() - started)
+        with conn.begin():
+            yield conn
+
+
+def pool_metrics(settings: RunnerSettings) -> dict:
+    engine = get_engine(settings)
+    pool = engine.pool
+    payload = _metrics[settings.DATABASE_URL].snapshot()
+    payload.update(
+        {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+    )
+    return payload
+
+
+def dispose_engines() -> None:
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _metrics.clear()
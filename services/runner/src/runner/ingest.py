@@ -0,0 +1,87 @@
+import json
+from uuid import UUID
+
+from core.storage import S3CompatibleStore, dataset_prefix
+from data.ingest import MANIFEST_NAME, IngestResult, ingest_dataset
+from data.profile import profile_partitions
+from runner.config import RunnerSettings
+from runner.db import (
+    fetch_dataset,
+    fetch_dataset_version,
+    fetch_dataset_version_by_id,
+    insert_dataset_version,
+    update_dataset_ingest,
+    update_dataset_version_statistics,
+)
+from runner.engine import transaction
+from runner.store import get_cache
+
+
+def ingest_dataset_version(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    dataset_id: UUID,
+    version: str,
+    source_format: str | None = None,
+    created_by: str | None = None,
+) -> tuple[UUID, IngestResult]:
+    """Materialize ``Dataset.storage_uri`` as Parquet and register a new dataset version."""
+    with transaction(settings) as conn:
+        dataset = fetch_dataset(conn, dataset_id)
+        if not dataset:
+            raise ValueError("Dataset not found")
+        if fetch_dataset_version(conn, dataset_id, version):
+            raise ValueError(f"Dataset version {version} already exists")
+
+    result = ingest_dataset(
+        store,
+        dataset["storage_uri"],
+        str(dataset_id),
+        version,
+        source_format=source_format,
+        block_size=settings.INGEST_BLOCK_SIZE,
+        rows_per_partition=settings.INGEST_ROWS_PER_PARTITION,
+    )
+
+    with transaction(settings) as conn:
+        version_id = insert_dataset_version(
+            conn,
+            dataset_id,
+            version,
+            data_fingerprint=result.data_fingerprint,
+            statistics_summary=result.statistics_summary,
+            created_by=created_by,
+        )
+        update_dataset_ingest(conn, dataset_id, result.schema_hash, result.row_count)
+    return version_id, result
+
+
+def dataset_partition_keys(store: S3CompatibleStore, dataset_id: UUID, version: str) -> list[str]:
+    """Parquet partition keys of a materialized dataset version, in manifest order."""
+    prefix = dataset_prefix(str(dataset_id), version)
+    manifest_key = f"{prefix}{MANIFEST_NAME}"
+    if store.exists(manifest_key):
+        manifest = json.loads(store.get_bytes(manifest_key))
+        return [item["key"] for item in manifest["partitions"]]
+    return sorted(key for key in store.iter_keys(prefix) if key.endswith(".parquet"))
+
+
+def profile_dataset_version(
+    settings: RunnerSettings, store: S3CompatibleStore, dataset_version_id: UUID
+) -> dict:
+    """Recompute ``statistics_summary`` for a materialized dataset version."""
+    with transaction(settings) as conn:
+        version = fetch_dataset_version_by_id(conn, dataset_version_id)
+    if not version:
+        raise ValueError("Dataset version not found")
+
+    keys = dataset_partition_keys(store, version["dataset_id"], version["version"])
+    if not keys:
+        raise ValueError("Dataset version has no materialized partitions")
+    cache = get_cache(settings)
+    paths = [cache.fetch(key, version["data_fingerprint"]) for key in keys]
+    summary = profile_partitions(paths, max_workers=settings.PROFILE_MAX_WORKERS).summary()
+
+    with transaction(settings) as conn:
+        update_dataset_version_statistics(conn, dataset_version_id, summary)
+    return summary
@@ -0,0 +1,26 @@
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+
+class LeaseLost(RuntimeError):
+    """The reaper reclaimed a row this worker claimed; its outcome must not be written."""
+
+
+@dataclass
+class Lease:
+    """The claim a worker holds on a ``runs`` or ``scoring_jobs`` row.
+
+    ``attempt`` is the row's ``attempts`` value set by the claim. Final status
+    writes match on it, so a worker whose row was requeued and claimed again
+    cannot overwrite the new owner's outcome. The heartbeat sets ``lost`` once
+    the row no longer carries this claim.
+    """
+
+    row_id: uuid.UUID
+    attempt: int
+    lost: threading.Event = field(default_factory=threading.Event)
+
+    def check(self) -> None:
+        if self.lost.is_set():
+            raise LeaseLost(f"Lease on {self.row_id} (attempt {self.attempt}) was lost")
@@ -0,0 +1,102 @@
+import logging
+import threading
+from pathlib import Path
+
+from core.storage import ObjectStore, run_log_chunk_key, run_log_end_key
+
+logger = logging.getLogger(__name__)
+
+
+class RunLogSink:
+    """Streams a run's log lines to the object store in size-bounded chunks.
+
+    Lines are appended to ``local_path`` and to the open chunk
+    ``runs/{run_id}/logs/runner-{seq:06d}.log``. A background thread re-uploads
+    the open chunk every ``flush_interval_s`` while it has new lines, so readers
+    see it grow in place; once it would exceed ``chunk_bytes`` it is sealed and
+    the next chunk starts. Only the open chunk and sealed chunks awaiting upload
+    are held in memory. :meth:`close` uploads the rest and writes the
+    ``runner.end`` marker.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore,
+        run_id: str,
+        local_path: Path,
+        chunk_bytes: int = 1024 * 1024,
+        flush_interval_s: float = 5.0,
+    ) -> None:
+        self.store = store
+        self.run_id = run_id
+        self.chunk_bytes = chunk_bytes
+        self.flush_interval_s = flush_interval_s
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = local_path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._upload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._seq = 0
+        self._chunk = bytearray()
+        self._dirty = False
+        self._sealed: list[tuple[int, bytes]] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="run-log-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        text = line.rstrip("\n") + "\n"
+        data = text.encode("utf-8")
+        with self._lock:
+            if self._closed:
+                return
+            self._file.write(text)
+            self._file.flush()
+            if self._chunk and len(self._chunk) + len(data) > self.chunk_bytes:
+                self._sealed.append((self._seq, bytes(self._chunk)))
+                self._seq += 1
+                self._chunk = bytearray()
+            self._chunk += data
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Upload sealed chunks and the open chunk if it changed since the last upload."""
+        with self._upload_lock:
+            with self._lock:
+                sealed = list(self._sealed)
+                current = (self._seq, bytes(self._chunk)) if self._dirty else None
+                self._dirty = False
+            try:
+                for seq, data in sealed:
+                    self._put(seq, data)
+                    with self._lock:
+                        self._sealed.remove((seq, data))
+                if current is not None:
+                    self._put(*current)
+            except Exception:
+                if current is not None:
+                    with self._lock:
+                        self._dirty = True
+                raise
+
+    def close(self) -> None:
+        """Stop the flush thread, upload everything and mark the log complete."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._file.close()
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self.store.put_bytes(run_log_end_key(self.run_id), b"", "text/plain")
+
+    def _put(self, seq: int, data: bytes) -> None:
+        self.store.put_bytes(run_log_chunk_key(self.run_id, seq), data, "text/plain")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001
+                logger.warning("Log upload for run %s failed; retrying", self.run_id, exc_info=True)
@@ -1,17 +1,15 @@
 import json
-import os
 import traceback
 from datetime import datetime
 from pathlib import Path
 from uuid import UUID
 
-import mlflow
 import yaml
-from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
 
 from core.domain.v0 import RunSpec
 from core.domain.v0.enums import RunStatus
-from core.storage import S3CompatibleStore, run_prefix
+from core.storage import S3CompatibleStore, TransferStats, UploadItem, run_prefix
 from runner.config import RunnerSettings
 from runner.db import (
     create_run,
@@ -21,6 +19,11 @@ from runner.db import (
     insert_run_spec,
     update_run_status,
 )
+from runner.engine import transaction
+from runner.lease import Lease, LeaseLost
+from runner.logs import RunLogSink
+from runner.tracking import TrackingSink, start_tracking
+from runner.training import train_model
 
 
 def _write_text(path: Path, content: str) -> None:
@@ -28,160 +31,216 @@ def _write_text(path: Path, content: str) -> None:
     path.write_text(content)
 
 
-def _upload_text(store: S3CompatibleStore, key: str, content: str, content_type: str) -> None:
-    store.put_bytes(key, content.encode("utf-8"), content_type)
+def _upload_stats_line(stats: TransferStats) -> str:
+    return (
+        f"Uploaded {stats.objects} artifacts ({stats.bytes} bytes) "
+        f"in {stats.seconds:.3f}s ({stats.bytes_per_s / 1e6:.2f} MB/s)"
+    )
 
 
-def _log_params(run_spec: RunSpec, settings: RunnerSettings) -> None:
-    payload = run_spec.model_dump()
-    for key, value in payload.items():
+def _artifact_content_type(name: str) -> str:
+    return "application/json" if name.endswith(".json") else "application/octet-stream"
+
+
+def _run_params(run_spec: RunSpec, settings: RunnerSettings) -> dict[str, str]:
+    params = {}
+    for key, value in run_spec.model_dump().items():
         if value is None:
             continue
-        if isinstance(value, (dict, list)):
-            mlflow.log_param(key, json.dumps(value))
-        else:
-            mlflow.log_param(key, str(value))
+        params[key] = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
     if settings.GIT_SHA:
-        mlflow.log_param("git_sha", settings.GIT_SHA)
+        params["git_sha"] = settings.GIT_SHA
     if settings.IMAGE_TAG:
-        mlflow.log_param("image_tag", settings.IMAGE_TAG)
+        params["image_tag"] = settings.IMAGE_TAG
+    return params
 
 
 def get_run_spec_by_id(settings: RunnerSettings, run_spec_id: UUID) -> RunSpec | None:
-    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-    with engine.begin() as conn:
+    with transaction(settings) as conn:
         payload = fetch_run_spec(conn, run_spec_id)
         return RunSpec.model_validate(payload) if payload else None
 
 
+def _resolve_run_spec_id(conn: Connection, run_spec: RunSpec) -> UUID:
+    if not dataset_version_exists(conn, run_spec.dataset_version_id):
+        raise ValueError("Dataset version not found")
+    if not feature_set_version_exists(conn, run_spec.feature_set_version_id):
+        raise ValueError("Feature set version not found")
+
+    if run_spec.id and fetch_run_spec(conn, run_spec.id):
+        return run_spec.id
+    return insert_run_spec(conn, run_spec.model_dump())
+
+
+def enqueue_run_spec(settings: RunnerSettings, run_spec: RunSpec) -> UUID:
+    """Persist ``run_spec`` (if new) and create a queued run for the worker pool."""
+    with transaction(settings) as conn:
+        run_spec_id = _resolve_run_spec_id(conn, run_spec)
+        return create_run(conn, run_spec_id, RunStatus.QUEUED)
+
+
 def execute_run_spec(
     settings: RunnerSettings,
     store: S3CompatibleStore,
     run_spec: RunSpec,
 ) -> tuple[UUID, datetime, RunStatus]:
-    log_lines: list[str] = []
+    """Create a run for ``run_spec`` and execute it inline, bypassing the queue."""
+    started_at = datetime.utcnow()
+    with transaction(settings) as conn:
+        run_spec_id = _resolve_run_spec_id(conn, run_spec)
+        run_id = create_run(conn, run_spec_id, RunStatus.QUEUED)
+        update_run_status(conn, run_id, RunStatus.RUNNING, started_at=started_at)
+
+    run_spec = run_spec.model_copy(update={"id": run_spec_id})
+    status = execute_run(settings, store, run_id, run_spec, started_at)
+    return run_id, started_at, status
+
+
+def execute_run(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_id: UUID,
+    run_spec: RunSpec,
+    started_at: datetime,
+    lease: Lease | None = None,
+) -> RunStatus:
+    """Execute a run that has already been claimed (status ``running``).
+
+    With the worker's ``lease`` every status write is fenced on its attempt, and the
+    run aborts between stages once the heartbeat has marked the lease lost.
+    """
+    log_sink: RunLogSink | None = None
+    attempt = lease.attempt if lease is not None else None
 
     def log(message: str) -> None:
-        timestamp = datetime.utcnow().isoformat()
-        log_lines.append(f"{timestamp} {message}")
-
-    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-    run_id: UUID | None = None
-    run_spec_id: UUID | None = None
-    artifacts_uri: str | None = None
-    workdir: Path | None = None
-    started_at = datetime.utcnow()
-    mlflow_run_id: str | None = None
-    mlflow_active = False
+        if log_sink is not None:
+            log_sink.write(f"{datetime.utcnow().isoformat()} {message}")
+
+    def progress(message: str) -> None:
+        if lease is not None:
+            lease.check()
+        log(message)
+
+    artifacts_uri = f"s3://{store.bucket}/{run_prefix(str(run_id))}"
+    workdir = Path(settings.RUN_WORKDIR) / str(run_id)
+    tracking: TrackingSink | None = None
+    upload_stats = TransferStats()
 
     try:
-        with engine.begin() as conn:
-            if not dataset_version_exists(conn, run_spec.dataset_version_id):
-                raise ValueError("Dataset version not found")
-            if not feature_set_version_exists(conn, run_spec.feature_set_version_id):
-                raise ValueError("Feature set version not found")
-
-            if run_spec.id:
-                existing = fetch_run_spec(conn, run_spec.id)
-                if existing:
-                    run_spec_id = run_spec.id
-                else:
-                    run_spec_id = insert_run_spec(conn, run_spec.model_dump())
-            else:
-                run_spec_id = insert_run_spec(conn, run_spec.model_dump())
-
-            run_id = create_run(conn, run_spec_id, RunStatus.QUEUED)
-            artifacts_uri = f"s3://{store.bucket}/{run_prefix(str(run_id))}"
-
-            if settings.MLFLOW_TRACKING_URI:
-                mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
-            if settings.MLFLOW_S3_ENDPOINT_URL:
-                os.environ.setdefault("MLFLOW_S3_ENDPOINT_URL", settings.MLFLOW_S3_ENDPOINT_URL)
-
-            mlflow_run = mlflow.start_run(run_name=str(run_id))
-            mlflow_run_id = mlflow_run.info.run_id
-            mlflow_active = True
-            _log_params(run_spec, settings)
+        workdir.mkdir(parents=True, exist_ok=True)
+        log_sink = RunLogSink(
+            store,
+            str(run_id),
+            workdir / "logs" / "runner.log",
+            settings.RUN_LOG_CHUNK_BYTES,
+            settings.RUN_LOG_FLUSH_INTERVAL_S,
+        )
+
+        # Tracking calls only buffer; a background thread ships (or spools) them.
+        tracking = start_tracking(settings, str(run_id), workdir)
+        tracking.log_params(_run_params(run_spec, settings))
+
+        with transaction(settings) as conn:
             update_run_status(
                 conn,
                 run_id,
                 RunStatus.RUNNING,
                 started_at=started_at,
                 artifacts_uri=artifacts_uri,
-                mlflow_run_id=mlflow_run_id,
+                mlflow_run_id=tracking.run_id,
+                attempt=attempt,
             )
 
-        workdir = Path(settings.RUN_WORKDIR) / str(run_id)
-        workdir.mkdir(parents=True, exist_ok=True)
-
-        log(f"Run created with id {run_id}")
+        log(f"Run started with id {run_id}")
         log("Writing artifacts to object store")
 
-        runspec_key = f"{run_prefix(str(run_id))}runspec.yaml"
-        runspec_text = yaml.safe_dump(run_spec.model_dump(), sort_keys=False)
+        prefix = run_prefix(str(run_id))
+        runspec_text = yaml.safe_dump(run_spec.model_dump(mode="json"), sort_keys=False)
         _write_text(workdir / "runspec.yaml", runspec_text)
-        _upload_text(store, runspec_key, runspec_text, "application/x-yaml")
-        if mlflow_active:
-            mlflow.log_artifact(str(workdir / "runspec.yaml"))
+
+        training = train_model(settings, store, run_spec, workdir, progress)
 
         meta = {
             "run_id": str(run_id),
-            "run_spec_id": str(run_spec_id),
+            "run_spec_id": str(run_spec.id),
             "created_at": datetime.utcnow().isoformat(),
             "git_sha": settings.GIT_SHA,
             "image_tag": settings.IMAGE_TAG,
+            "model_key": f"{prefix}model/model.json",
+            "training": training.metrics,
+            "artifacts": sorted(f"{prefix}{name}" for name in training.artifacts),
         }
-        meta_key = f"{run_prefix(str(run_id))}meta.json"
         meta_text = json.dumps(meta, indent=2)
         _write_text(workdir / "meta.json", meta_text)
-        _upload_text(store, meta_key, meta_text, "application/json")
-        if mlflow_active:
-            mlflow.log_artifact(str(workdir / "meta.json"))
 
-        with engine.begin() as conn:
+        uploads = [
+            UploadItem(f"{prefix}runspec.yaml", workdir / "runspec.yaml", "application/x-yaml"),
+            UploadItem(f"{prefix}meta.json", workdir / "meta.json", "application/json"),
+            UploadItem(f"{prefix}model/model.json", training.model_path, "application/json"),
+        ]
+        uploads.extend(
+            UploadItem(f"{prefix}{name}", path, _artifact_content_type(name))
+            for name, path in training.artifacts.items()
+        )
+        progress("Uploading artifacts")
+        upload_stats += store.put_many(uploads)
+        tracking.log_artifact(workdir / "runspec.yaml")
+        tracking.log_artifact(workdir / "meta.json")
+        tracking.log_metrics(training.metrics)
+        tracking.log_artifact(training.model_path, artifact_path="model")
+        for name, path in training.artifacts.items():
+            tracking.log_artifact(path, artifact_path=str(Path(name).parent))
+
+        with transaction(settings) as conn:
             update_run_status(
                 conn,
                 run_id,
                 RunStatus.SUCCEEDED,
                 finished_at=datetime.utcnow(),
                 artifacts_uri=artifacts_uri,
+                attempt=attempt,
             )
 
         log("Run succeeded")
-        log_key = f"{run_prefix(str(run_id))}logs/runner.log"
-        log_text = "\n".join(log_lines) + "\n"
-        _write_text(workdir / "logs" / "runner.log", log_text)
-        _upload_text(store, log_key, log_text, "text/plain")
-        if mlflow_active:
-            mlflow.log_artifact(str(workdir / "logs" / "runner.log"))
-            mlflow.end_run(status="FINISHED")
-        return run_id, started_at, RunStatus.SUCCEEDED
+        log(_upload_stats_line(upload_stats))
+        log_sink.close()
+        tracking.log_metric("artifact_upload_bytes_per_s", upload_stats.bytes_per_s)
+        tracking.log_artifact(workdir / "logs" / "runner.log")
+        tracking.close("FINISHED", settings.TRACKING_CLOSE_TIMEOUT_S)
+        return RunStatus.SUCCEEDED
+    except LeaseLost as exc:
+        # The run was requeued and belongs to another claim: record nothing on its row.
+        log(f"Run aborted: {exc}")
+        if log_sink is not None:
+            log_sink.close()
+        if tracking is not None:
+            tracking.close("KILLED", settings.TRACKING_CLOSE_TIMEOUT_S)
+        raise
     except Exception as exc:  # noqa: BLE001
         log(f"Run failed: {exc}")
         trace = traceback.format_exc()
 
-        if run_id and workdir:
-            trace_key = f"{run_prefix(str(run_id))}logs/stacktrace.txt"
-            _write_text(workdir / "logs" / "stacktrace.txt", trace)
-            _upload_text(store, trace_key, trace, "text/plain")
-            log_key = f"{run_prefix(str(run_id))}logs/runner.log"
-            log_text = "\n".join(log_lines) + "\n"
-            _write_text(workdir / "logs" / "runner.log", log_text)
-            _upload_text(store, log_key, log_text, "text/plain")
-            if mlflow_active:
-                mlflow.log_artifact(str(workdir / "logs" / "stacktrace.txt"))
-                mlflow.log_artifact(str(workdir / "logs" / "runner.log"))
-            with engine.begin() as conn:
-                update_run_status(
-                    conn,
-                    run_id,
-                    RunStatus.FAILED,
-                    finished_at=datetime.utcnow(),
-                    artifacts_uri=artifacts_uri,
-                    mlflow_run_id=mlflow_run_id,
-                    failure_reason=str(exc),
-                    failure_trace_uri=trace_key,
-                )
-        if mlflow_active:
-            mlflow.end_run(status="FAILED")
+        trace_key = f"{run_prefix(str(run_id))}logs/stacktrace.txt"
+        _write_text(workdir / "logs" / "stacktrace.txt", trace)
+        log(_upload_stats_line(upload_stats))
+        store.put_file(trace_key, workdir / "logs" / "stacktrace.txt", "text/plain")
+        if log_sink is not None:
+            log_sink.close()
+        if tracking is not None:
+            tracking.log_artifact(workdir / "logs" / "stacktrace.txt")
+            tracking.log_artifact(workdir / "logs" / "runner.log")
+        with transaction(settings) as conn:
+            update_run_status(
+                conn,
+                run_id,
+                RunStatus.FAILED,
+                finished_at=datetime.utcnow(),
+                artifacts_uri=artifacts_uri,
+                mlflow_run_id=tracking.run_id if tracking is not None else None,
+                failure_reason=str(exc),
+                failure_trace_uri=trace_key,
+                attempt=attempt,
+            )
+        if tracking is not None:
+            tracking.close("FAILED", settings.TRACKING_CLOSE_TIMEOUT_S)
         raise
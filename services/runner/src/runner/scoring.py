@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+from core.domain.v0.enums import RunStatus
+from core.storage import S3CompatibleStore, report_prefix, run_prefix
+from data.ingest import MANIFEST_NAME
+from ml.explain import ExplanationPolicy
+from ml.scoring import iter_score_partitions
+from runner.config import RunnerSettings
+from runner.db import (
+    create_scoring_job,
+    fetch_dataset_version_by_id,
+    fetch_feature_set_version,
+    fetch_features_by_name,
+    fetch_run,
+    fetch_run_spec,
+    update_scoring_job,
+)
+from runner.engine import transaction
+from runner.ingest import dataset_partition_keys
+from runner.lease import Lease, LeaseLost
+from runner.store import get_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    run_id: UUID
+    dataset_version_id: UUID
+    data_fingerprint: str
+    model_key: str
+    partition_keys: list[str]
+    output_prefix: str
+    id_columns: tuple[str, ...] = ()
+    explain: ExplanationPolicy | None = None
+    explanation_prefix: str | None = None
+    reason_texts: dict[str, str] = field(default_factory=dict)
+
+
+def reason_texts(feature_rows: dict[str, dict]) -> dict[str, str]:
+    """Adverse-action text per feature: its registered description, else its name."""
+    return {name: row.get("description") or name for name, row in feature_rows.items()}
+
+
+def plan_scoring(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_id: UUID,
+    dataset_version_id: UUID | None = None,
+    id_columns: tuple[str, ...] = (),
+) -> ScoringPlan:
+    """Validate a scoring request; defaults to the dataset version the run trained on.
+
+    An ``explanations`` entry in the run spec's ``artifact_policy`` adds TreeSHAP
+    reason codes, worded from the feature set's registered feature descriptions.
+    """
+    explain, texts = None, {}
+    with transaction(settings) as conn:
+        run = fetch_run(conn, run_id)
+        if not run:
+            raise ValueError("Run not found")
+        run_spec = fetch_run_spec(conn, run["run_spec_id"])
+        version = fetch_dataset_version_by_id(
+            conn, dataset_version_id or run_spec["dataset_version_id"]
+        )
+        artifact_policy = run_spec.get("artifact_policy") or {}
+        if "explanations" in artifact_policy:
+            explain = ExplanationPolicy.from_dict(artifact_policy["explanations"])
+            feature_set_version = fetch_feature_set_version(
+                conn, run_spec["feature_set_version_id"]
+            )
+            names = (feature_set_version or {}).get("features") or []
+            texts = reason_texts(fetch_features_by_name(conn, names))
+    if not version:
+        raise ValueError("Dataset version not found")
+
+    model_key = f"{run_prefix(str(run_id))}model/model.json"
+    if not store.exists(model_key):
+        raise ValueError("Run has no trained model")
+    keys = dataset_partition_keys(store, version["dataset_id"], version["version"])
+    if not keys:
+        raise ValueError("Dataset version has no materialized partitions")
+    return ScoringPlan(
+        run_id=run_id,
+        dataset_version_id=version["id"],
+        data_fingerprint=version["data_fingerprint"],
+        model_key=model_key,
+        partition_keys=keys,
+        output_prefix=f"{report_prefix(str(run_id))}scores/{version['id']}/",
+        id_columns=tuple(id_columns),
+        explain=explain,
+        explanation_prefix=(
+            f"{report_prefix(str(run_id))}explanations/{version['id']}/" if explain else None
+        ),
+        reason_texts=texts,
+    )
+
+
+def execute_scoring(
+    settings: RunnerSettings, store: S3CompatibleStore, plan: ScoringPlan
+) -> dict:
+    """Score every partition in a process pool and stream the outputs to ``report_prefix``.
+
+    Each output partition is uploaded as soon as its worker finishes, while the
+    remaining partitions are still being scored. Throughput is written to
+    ``runs/{run_id}/scoring/{dataset_version_id}/summary.json``. Explanations,
+    when planned, are uploaded alongside under ``explanation_prefix``.
+    """
+    explain = plan.explain
+    if explain is not None and explain.n_threads is None:
+        # Split the cores between the scoring processes rather than oversubscribing.
+        cores = os.cpu_count() or 1
+        workers = min(settings.SCORING_MAX_WORKERS or cores, len(plan.partition_keys))
+        explain = replace(explain, n_threads=max(1, cores // max(1, workers)))
+    cache = get_cache(settings)
+    model_path = cache.fetch(plan.model_key, str(plan.run_id))
+    inputs = [cache.fetch(key, plan.data_fingerprint) for key in plan.partition_keys]
+    workdir = Path(settings.RUN_WORKDIR) / str(plan.run_id) / f"scores-{plan.dataset_version_id}"
+
+    started = time.perf_counter()
+    partitions = []
+    for result in iter_score_partitions(
+        model_path,
+        inputs,
+        workdir,
+        id_columns=plan.id_columns,
+        batch_rows=settings.SCORING_BATCH_ROWS,
+        max_workers=settings.SCORING_MAX_WORKERS,
+        explain=explain,
+        reason_texts=plan.reason_texts,
+    ):
+        key = f"{plan.output_prefix}{result.output_path.name}"
+        store.put_file(key, result.output_path, "application/vnd.apache.parquet")
+        result.output_path.unlink(missing_ok=True)
+        partition = {"key": key, "source": plan.partition_keys[result.index], "rows": result.rows}
+        if result.explanation_path is not None:
+            partition["explanations"] = f"{plan.explanation_prefix}{result.explanation_path.name}"
+            store.put_file(
+                partition["explanations"],
+                result.explanation_path,
+                "application/vnd.apache.parquet",
+            )
+            result.explanation_path.unlink(missing_ok=True)
+        partitions.append(partition)
+    seconds = time.perf_counter() - started
+    partitions.sort(key=lambda item: item["key"])
+
+    rows = sum(item["rows"] for item in partitions)
+    throughput = rows / seconds if seconds > 0 else 0.0
+    summary = {
+        "dataset_version_id": str(plan.dataset_version_id),
+        "output_prefix": plan.output_prefix,
+        "rows": rows,
+        "partitions": len(partitions),
+        "seconds": seconds,
+        "rows_per_s": throughput,
+        "scored_at": datetime.utcnow().isoformat(),
+    }
+    if plan.explanation_prefix is not None:
+        summary["explanation_prefix"] = plan.explanation_prefix
+    store.put_bytes(
+        f"{plan.output_prefix}{MANIFEST_NAME}",
+        json.dumps({**summary, "partitions": partitions}, indent=2).encode("utf-8"),
+        "application/json",
+    )
+    store.put_bytes(
+        scoring_summary_key(plan.run_id, plan.dataset_version_id),
+        json.dumps(summary, indent=2).encode("utf-8"),
+        "application/json",
+    )
+    logger.info("Scored %s rows for run %s at %.0f rows/s", rows, plan.run_id, throughput)
+    return summary
+
+
+def scoring_summary_key(run_id: UUID, dataset_version_id: UUID) -> str:
+    # One object per scored version, so concurrent scorings of a run never share a file.
+    return f"{run_prefix(str(run_id))}scoring/{dataset_version_id}/summary.json"
+
+
+def enqueue_scoring(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_id: UUID,
+    dataset_version_id: UUID | None = None,
+    id_columns: tuple[str, ...] = (),
+) -> tuple[UUID, ScoringPlan]:
+    """Validate a scoring request and queue it as a ``scoring_jobs`` row for the workers."""
+    plan = plan_scoring(settings, store, run_id, dataset_version_id, id_columns)
+    with transaction(settings) as conn:
+        job_id = create_scoring_job(
+            conn, run_id, plan.dataset_version_id, list(plan.id_columns), plan.output_prefix
+        )
+    return job_id, plan
+
+
+def execute_scoring_job(
+    settings: RunnerSettings, store: S3CompatibleStore, job: dict, lease: Lease | None = None
+) -> dict:
+    """Score a claimed job and record the outcome on its row; failures are re-raised.
+
+    The outcome is written only while the job's claim (``job["attempt"]``) still
+    holds the row; a lost ``lease`` aborts without writing it.
+    """
+    attempt = job.get("attempt")
+    try:
+        plan = plan_scoring(
+            settings, store, job["run_id"], job["dataset_version_id"], tuple(job["id_columns"])
+        )
+        summary = execute_scoring(settings, store, plan)
+        if lease is not None:
+            lease.check()
+    except LeaseLost:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        with transaction(settings) as conn:
+            update_scoring_job(
+                conn,
+                job["id"],
+                RunStatus.FAILED,
+                finished_at=datetime.utcnow(),
+                failure_reason=str(exc),
+                attempt=attempt,
+            )
+        raise
+    with transaction(settings) as conn:
+        update_scoring_job(
+            conn,
+            job["id"],
+            RunStatus.SUCCEEDED,
+            finished_at=datetime.utcnow(),
+            summary=summary,
+            attempt=attempt,
+        )
+    return summary
+
+
+def score_run(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_id: UUID,
+    dataset_version_id: UUID | None = None,
+    id_columns: tuple[str, ...] = (),
+) -> dict:
+    plan = plan_scoring(settings, store, run_id, dataset_version_id, id_columns)
+    return execute_scoring(settings, store, plan)
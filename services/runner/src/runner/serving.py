@@ -0,0 +1,314 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field, fields
+from uuid import UUID
+
+import numpy as np
+
+from core.domain.v0 import Model
+from core.domain.v0.enums import ModelRegistryState
+from core.storage import S3CompatibleStore, run_prefix
+from ml.compiled import CompiledEnsemble
+from ml.gbm import GBMModel
+from runner.config import RunnerSettings
+from runner.db import fetch_model
+from runner.engine import transaction
+from runner.store import get_cache, get_store
+
+_BATCHER_IDLE_S = 60.0
+
+
+class ModelNotFound(LookupError):
+    pass
+
+
+@dataclass
+class ServedModel:
+    model: Model
+    gbm: GBMModel
+    compiled: CompiledEnsemble
+    batcher: "MicroBatcher" = field(repr=False)
+
+    @property
+    def nbytes(self) -> int:
+        trees = sum(
+            getattr(tree, item.name).nbytes for tree in self.gbm.trees for item in fields(tree)
+        )
+        edges = sum(edges.nbytes for edges in self.gbm.mapper.edges if edges is not None)
+        return self.compiled.nbytes + trees + edges
+
+    def encode(self, records: Sequence[Mapping]) -> np.ndarray:
+        return self.gbm.mapper.encode_records(records)
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into one vectorized call.
+
+    The first queued request opens a window of ``window_s``; requests arriving
+    within it (up to ``max_batch`` rows) are scored together and each caller gets
+    its own slice back. Requests are encoded before they are queued, so one bad
+    payload never fails a batch it shares with others. The collecting task exits
+    after ``idle_s`` without requests and is restarted by the next one, so batchers
+    of evicted models do not linger.
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledEnsemble,
+        window_s: float,
+        max_batch: int,
+        idle_s: float = _BATCHER_IDLE_S,
+    ) -> None:
+        self._compiled = compiled
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._idle_s = idle_s
+        self._queue: asyncio.Queue[tuple[np.ndarray, asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, encoded: np.ndarray) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((encoded, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self._idle_s)
+            except TimeoutError:
+                # A request may have been queued while the get was being cancelled.
+                if self._queue.empty():
+                    return
+                continue
+            batch = [first]
+            size = batch[0][0].shape[0]
+            deadline = loop.time() + self._window_s
+            while size < self._max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except TimeoutError:
+                        break
+                batch.append(item)
+                size += item[0].shape[0]
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[np.ndarray, asyncio.Future]]) -> None:
+        encoded = np.concatenate([encoded for encoded, _ in batch])
+        try:
+            # Off the event loop, so other requests keep being accepted during a batch.
+            scores = await asyncio.to_thread(self._compiled.predict, encoded)
+        except Exception as exc:  # noqa: BLE001
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.rows += scores.size
+        offset = 0
+        for encoded, future in batch:
+            count = encoded.shape[0]
+            if not future.done():
+                future.set_result(scores[offset : offset + count])
+            offset += count
+
+
+def load_model_artifact(
+    settings: RunnerSettings, store: S3CompatibleStore, model: Model
+) -> GBMModel:
+    key = f"{run_prefix(str(model.produced_from_run_id))}model/model.json"
+    if not store.exists(key):
+        raise ModelNotFound(f"Model artifact not found: {key}")
+    # Run artifacts are immutable, so the run id is a sufficient cache fingerprint.
+    path = get_cache(settings).fetch(key, str(model.produced_from_run_id))
+    return GBMModel.load(path)
+
+
+@dataclass
+class ModelCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    loads: int = 0
+    load_failures: int = 0
+    load_seconds: float = 0.0
+    evictions: int = 0
+    invalidations: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"}
+
+
+@dataclass
+class _Entry:
+    served: ServedModel
+    checked_at: float
+
+
+class ModelCache:
+    """Size-bounded LRU of loaded models, keyed by ``Model.id``.
+
+    A cold model is loaded once however many requests ask for it concurrently;
+    the others wait on the same future. Every ``state_ttl_s`` the registry row is
+    re-read, and the entry is dropped when the model was deprecated or now points
+    at a different run. Least recently used models are evicted once the compiled
+    and raw tree arrays exceed ``max_bytes``; the newest entry is always kept.
+    """
+
+    def __init__(
+        self,
+        settings: RunnerSettings,
+        store: S3CompatibleStore,
+        max_bytes: int,
+        state_ttl_s: float,
+    ) -> None:
+        self._settings = settings
+        self._store = store
+        self._max_bytes = max_bytes
+        self._state_ttl_s = state_ttl_s
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        self._loading: dict[UUID, Future] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = ModelCacheStats()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._size
+
+    def model_ids(self) -> list[UUID]:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, model_id: UUID) -> ServedModel:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                self._entries.move_to_end(model_id)
+                revalidate = now - entry.checked_at >= self._state_ttl_s
+                if revalidate:
+                    # Claim the check so concurrent requests keep serving meanwhile.
+                    entry.checked_at = now
+        if entry is None:
+            return self._load_once(model_id)
+        if revalidate:
+            model = self._fetch_model(model_id)
+            if model.produced_from_run_id != entry.served.model.produced_from_run_id:
+                self.invalidate(model_id)
+                return self._load_once(model_id)
+        self.stats.add(hits=1)
+        return entry.served
+
+    def invalidate(self, model_id: UUID) -> bool:
+        with self._lock:
+            entry = self._entries.pop(model_id, None)
+            if entry is None:
+                return False
+            self._size -= entry.served.nbytes
+        self.stats.add(invalidations=1)
+        return True
+
+    def _fetch_model(self, model_id: UUID) -> Model:
+        with transaction(self._settings) as conn:
+            payload = fetch_model(conn, model_id)
+        if payload is None:
+            self.invalidate(model_id)
+            raise ModelNotFound("Model not found")
+        model = Model.model_validate(payload)
+        if model.registry_state == ModelRegistryState.DEPRECATED:
+            self.invalidate(model_id)
+            raise ModelNotFound("Model is deprecated")
+        return model
+
+    def _load_once(self, model_id: UUID) -> ServedModel:
+        with self._lock:
+            future = self._loading.get(model_id)
+            owner = future is None
+            if owner:
+                future = self._loading[model_id] = Future()
+        if not owner:
+            self.stats.add(coalesced=1)
+            return future.result()
+
+        self.stats.add(misses=1)
+        started = time.perf_counter()
+        try:
+            served = self._load(model_id)
+        except BaseException as exc:
+            self.stats.add(load_failures=1)
+            future.set_exception(exc)
+            raise
+        else:
+            self.stats.add(loads=1, load_seconds=time.perf_counter() - started)
+            self._insert(model_id, served)
+            future.set_result(served)
+            return served
+        finally:
+            with self._lock:
+                self._loading.pop(model_id, None)
+
+    def _load(self, model_id: UUID) -> ServedModel:
+        model = self._fetch_model(model_id)
+        gbm = load_model_artifact(self._settings, self._store, model)
+        compiled = CompiledEnsemble.from_model(gbm)
+        batcher = MicroBatcher(
+            compiled,
+            window_s=self._settings.SCORING_BATCH_WINDOW_MS / 1000.0,
+            max_batch=self._settings.SCORING_MAX_BATCH,
+        )
+        return ServedModel(model=model, gbm=gbm, compiled=compiled, batcher=batcher)
+
+    def _insert(self, model_id: UUID, served: ServedModel) -> None:
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(model_id, None)
+            if previous is not None:
+                self._size -= previous.served.nbytes
+            self._entries[model_id] = _Entry(served, time.monotonic())
+            self._size += served.nbytes
+            while self._size > self._max_bytes and len(self._entries) > 1:
+                _, oldest = self._entries.popitem(last=False)
+                self._size -= oldest.served.nbytes
+                evicted += 1
+        if evicted:
+            self.stats.add(evictions=evicted)
+
+
+_model_cache: ModelCache | None = None
+
+
+def get_model_cache(settings: RunnerSettings) -> ModelCache:
+    """Process-wide model cache, so compiled models and batchers are shared by requests."""
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = ModelCache(
+            settings,
+            get_store(settings),
+            settings.MODEL_CACHE_MAX_BYTES,
+            settings.MODEL_CACHE_STATE_TTL_S,
+        )
+    return _model_cache
@@ -1,6 +1,8 @@
-from core.storage import S3CompatibleStore, S3Settings
+from core.storage import LocalObjectCache, S3CompatibleStore, S3Settings
 from runner.config import RunnerSettings
 
+_cache: LocalObjectCache | None = None
+
 
 def get_store(settings: RunnerSettings) -> S3CompatibleStore:
     return S3CompatibleStore(
@@ -10,6 +12,18 @@ def get_store(settings: RunnerSettings) -> S3CompatibleStore:
             secret_key=settings.S3_SECRET_KEY,
             bucket=settings.S3_BUCKET,
             region=settings.S3_REGION,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            read_ahead_bytes=settings.S3_READ_AHEAD_BYTES,
         )
     )
 
+
+
+def get_cache(settings: RunnerSettings) -> LocalObjectCache:
+    """Process-wide local cache for immutable dataset and feature-set objects."""
+    global _cache
+    if _cache is None:
+        _cache = LocalObjectCache(get_store(settings), settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+    return _cache
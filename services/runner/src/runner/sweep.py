@@ -0,0 +1,157 @@
+import json
+import logging
+import shutil
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+from core.domain.v0 import RunSpec
+from core.storage import S3CompatibleStore, UploadItem, sweep_prefix
+from ml import SweepSpec, expand_trials, get_trainer, run_sweep
+from runner.config import RunnerSettings
+from runner.tracking import TrackingSink, start_tracking, tracking_client
+from runner.training import prepare_training_data
+
+logger = logging.getLogger(__name__)
+
+
+def child_run_specs(run_spec: RunSpec, trials: list[dict]) -> list[RunSpec]:
+    """One unsaved ``RunSpec`` per trial, differing from ``run_spec`` only in ``model_params``."""
+    return [run_spec.model_copy(update={"id": None, "model_params": params}) for params in trials]
+
+
+def sweep_run_spec(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_spec: RunSpec,
+    spec: SweepSpec,
+    sweep_id: UUID | None = None,
+) -> dict:
+    """Search ``model_params`` around ``run_spec`` with successive halving.
+
+    The binned matrix and split are prepared once, exactly as for a single run, and
+    shared by every trial. Each trial is logged as a nested MLflow run under one
+    parent run. ``sweep.json`` and the best trial's model are written to
+    ``sweeps/{sweep_id}/``. The returned summary includes the best trial's
+    ``RunSpec``, ready to be executed as a regular run.
+    """
+    sweep_id = sweep_id or uuid4()
+    # workdir (the binned matrix and its shared copies) is always removed. The rest of
+    # root is kept only while a tracking spool still refers to its artifacts.
+    root = Path(settings.RUN_WORKDIR) / f"sweep-{sweep_id}"
+    workdir = root / "work"
+    base_params = dict(run_spec.model_params)
+    trials = expand_trials(spec, base_params)
+    children = child_run_specs(run_spec, trials)
+    max_bins = get_trainer(run_spec.model_family, base_params).params.max_bins
+
+    def log(message: str) -> None:
+        logger.info("Sweep %s: %s", sweep_id, message)
+
+    try:
+        prepared = prepare_training_data(settings, store, run_spec, max_bins, workdir, log)
+        if prepared is None:
+            raise ValueError("Dataset version has no materialized partitions")
+        if prepared.splits is None or not prepared.splits.valid.size:
+            raise ValueError("Sweeps require a split_policy with validation rows")
+        # Tracking calls only buffer; each run's sink ships (or spools) them from a thread.
+        client = tracking_client(settings)
+        parent = start_tracking(settings, f"sweep-{sweep_id}", root, client=client)
+        trial_sinks: dict[int, TrackingSink] = {}
+        status = "FAILED"
+        try:
+            parent.log_params(
+                {
+                    "sweep_id": str(sweep_id),
+                    "dataset_version_id": str(run_spec.dataset_version_id),
+                    "feature_set_version_id": str(run_spec.feature_set_version_id),
+                    "model_family": run_spec.model_family,
+                    "split_policy": json.dumps(run_spec.split_policy),
+                    "trials": len(trials),
+                    "eta": spec.eta,
+                }
+            )
+
+            def on_result(trial: int, resource: int, metrics: dict[str, float]) -> None:
+                if trial not in trial_sinks:
+                    trial_sinks[trial] = start_tracking(
+                        settings,
+                        f"trial-{trial:05d}",
+                        root / "tracking" / f"trial-{trial:05d}",
+                        tags={MLFLOW_PARENT_RUN_ID: parent.run_id} if parent.run_id else None,
+                        client=client,
+                    )
+                    trial_sinks[trial].log_params(children[trial].model_params)
+                trial_sinks[trial].log_metrics(metrics, step=resource)
+                logger.info(
+                    "Sweep %s: trial %s at %s=%s: valid_loss=%.5f",
+                    sweep_id,
+                    trial,
+                    spec.resource,
+                    resource,
+                    metrics["valid_loss"],
+                )
+
+            result = run_sweep(
+                prepared.data,
+                prepared.splits.train,
+                prepared.splits.valid,
+                run_spec.model_family,
+                trials,
+                spec,
+                root / "sweep",
+                max_workers=settings.SWEEP_MAX_WORKERS,
+                n_threads=settings.TRAIN_THREADS,
+                on_result=on_result,
+            )
+
+            best = result.best
+            best_spec = children[result.best_trial].model_copy(
+                update={"model_params": {**best["model_params"], spec.resource: best["resource"]}}
+            )
+            summary = {
+                "sweep_id": str(sweep_id),
+                "mlflow_run_id": parent.run_id,
+                "trials": len(trials),
+                "jobs": result.jobs,
+                "seconds": result.seconds,
+                "best_trial": result.best_trial,
+                "best_valid_loss": best["valid_loss"],
+                "best_run_spec": best_spec.model_dump(mode="json"),
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            parent.log_metrics(
+                {
+                    "best_valid_loss": best["valid_loss"],
+                    "jobs": float(result.jobs),
+                    "sweep_seconds": result.seconds,
+                }
+            )
+            parent.log_params({"best_model_params": json.dumps(best_spec.model_params)})
+
+            prefix = sweep_prefix(str(sweep_id))
+            summary_path = root / "sweep" / "summary.json"
+            summary_path.write_text(json.dumps(summary, indent=2))
+            best_model = root / "sweep" / f"trial-{result.best_trial:05d}" / "model.json"
+            trials_path = root / "sweep" / "sweep.json"
+            store.put_many(
+                [
+                    UploadItem(f"{prefix}summary.json", summary_path, "application/json"),
+                    UploadItem(f"{prefix}sweep.json", trials_path, "application/json"),
+                    UploadItem(f"{prefix}best/model.json", best_model, "application/json"),
+                ]
+            )
+            parent.log_artifact(trials_path)
+            parent.log_artifact(best_model, artifact_path="best")
+            status = "FINISHED"
+            return summary
+        finally:
+            sinks = [*trial_sinks.values(), parent]
+            for sink in sinks:
+                sink.close(status, settings.TRACKING_CLOSE_TIMEOUT_S)
+            if not any(sink.degraded for sink in sinks):
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from mlflow.entities import Metric, Param
+from mlflow.tracking import MlflowClient
+
+from runner.config import RunnerSettings
+
+logger = logging.getLogger(__name__)
+
+# log_batch accepts at most 100 params and 1000 entities per request.
+MAX_BATCH_PARAMS = 100
+MAX_BATCH_METRICS = 900
+SPOOL_FILE = "spool.jsonl"
+
+T = TypeVar("T")
+
+
+def _batch_ops(params: dict[str, str], metrics: list[list]) -> list[dict]:
+    items = list(params.items())
+    param_chunks = [items[i : i + MAX_BATCH_PARAMS] for i in range(0, len(items), MAX_BATCH_PARAMS)]
+    metric_chunks = [
+        metrics[i : i + MAX_BATCH_METRICS] for i in range(0, len(metrics), MAX_BATCH_METRICS)
+    ]
+    return [
+        {
+            "kind": "batch",
+            "params": dict(param_chunks[i]) if i < len(param_chunks) else {},
+            "metrics": metric_chunks[i] if i < len(metric_chunks) else [],
+        }
+        for i in range(max(len(param_chunks), len(metric_chunks)))
+    ]
+
+
+def _apply(client: MlflowClient, run_id: str, op: dict) -> None:
+    if op["kind"] == "batch":
+        # Spooled metrics are [key, value, timestamp_ms, step] lists.
+        metrics = [Metric(*metric) for metric in op["metrics"]]
+        params = [Param(key, value) for key, value in op["params"].items()]
+        client.log_batch(run_id, metrics=metrics, params=params)
+    elif op["kind"] == "artifact":
+        client.log_artifact(run_id, op["path"], op["artifact_path"])
+    elif op["kind"] == "end":
+        client.set_terminated(run_id, op["status"])
+    else:
+        raise ValueError(f"Unknown tracking op: {op['kind']}")
+
+
+def _with_retries(call: Callable[[], T], max_retries: int, backoff_s: float) -> T:
+    for attempt in range(max_retries + 1):
+        try:
+            return call()
+        except Exception:  # noqa: BLE001
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_s * 2**attempt)
+    raise AssertionError("unreachable")
+
+
+class TrackingSink:
+    """Buffers MLflow params, metrics and artifacts of one run and ships them from a thread.
+
+    The ``log_*`` methods only append to in-memory buffers. A background thread
+    flushes every ``flush_interval_s``: params and metrics go out as ``log_batch``
+    calls, then artifacts are uploaded, each retried with exponential backoff.
+    Once retries are exhausted, or the run could not be created at all, the sink
+    degrades: the unsent and all later operations are appended to
+    ``spool_dir/spool.jsonl`` for :func:`replay_spool`.
+    """
+
+    def __init__(
+        self,
+        client: MlflowClient,
+        run_id: str | None,
+        spool_dir: Path,
+        run_name: str | None = None,
+        experiment_id: str | None = None,
+        tags: dict[str, str] | None = None,
+        flush_interval_s: float = 2.0,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+    ) -> None:
+        self.client = client
+        self.run_id = run_id
+        self.spool_path = Path(spool_dir) / SPOOL_FILE
+        self.run_name = run_name
+        self.experiment_id = experiment_id
+        self.tags = tags
+        self.flush_interval_s = flush_interval_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.degraded = run_id is None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._params: dict[str, str] = {}
+        self._metrics: list[list] = []
+        self._artifacts: list[dict] = []
+        self._end_status: str | None = None
+        self._thread = threading.Thread(target=self._run, name="mlflow-tracking", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def start(
+        cls,
+        client: MlflowClient,
+        experiment_id: str,
+        run_name: str,
+        spool_dir: Path,
+        tags: dict[str, str] | None = None,
+        **options,
+    ) -> "TrackingSink":
+        """Create the MLflow run and a sink for it; without a tracking server the sink spools."""
+        max_retries, backoff_s = options.get("max_retries", 3), options.get("backoff_s", 1.0)
+        try:
+            run = _with_retries(
+                lambda: client.create_run(experiment_id, run_name=run_name, tags=tags),
+                max_retries,
+                backoff_s,
+            )
+            run_id = run.info.run_id
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not create MLflow run %s; spooling", run_name, exc_info=True)
+            run_id = None
+        return cls(
+            client,
+            run_id,
+            spool_dir,
+            run_name=run_name,
+            experiment_id=experiment_id,
+            tags=tags,
+            **options,
+        )
+
+    def log_params(self, params: dict[str, str]) -> None:
+        with self._lock:
+            self._params.update({key: str(value) for key, value in params.items()})
+
+    def log_metrics(self, metrics: dict[str, float], step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        with self._lock:
+            self._metrics.extend(
+                [key, float(value), timestamp, step] for key, value in metrics.items()
+            )
+
+    def log_metric(self, key: str, value: float, step: int = 0) -> None:
+        self.log_metrics({key: value}, step)
+
+    def log_artifact(self, path: str | Path, artifact_path: str | None = None) -> None:
+        op = {"kind": "artifact", "path": str(path), "artifact_path": artifact_path or None}
+        with self._lock:
+            self._artifacts.append(op)
+
+    def close(self, status: str = "FINISHED", timeout_s: float | None = None) -> None:
+        """Flush what is buffered, end the run with ``status`` and stop the thread.
+
+        Waits at most ``timeout_s``; a flush still running after that finishes (or
+        spools) in the background.
+        """
+        with self._lock:
+            self._end_status = status
+        self._wake.set()
+        self._thread.join(timeout_s)
+        if self._thread.is_alive():
+            logger.warning("MLflow run %s still flushing after %ss", self.run_id, timeout_s)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            with self._lock:
+                ops = _batch_ops(self._params, self._metrics) + self._artifacts
+                self._params, self._metrics, self._artifacts = {}, [], []
+                if self._end_status is not None:
+                    ops.append({"kind": "end", "status": self._end_status})
+            if ops:
+                self._ship(ops)
+            if ops and ops[-1]["kind"] == "end":
+                return
+
+    def _ship(self, ops: list[dict]) -> None:
+        for index, op in enumerate(ops):
+            if self.degraded:
+                self._spool(ops[index:])
+                return
+            try:
+                _with_retries(
+                    lambda: _apply(self.client, self.run_id, op), self.max_retries, self.backoff_s
+                )
+            except Exception:  # noqa: BLE001
+                logger.warning(
+                    "MLflow tracking failed for run %s; spooling to %s",
+                    self.run_id,
+                    self.spool_path,
+                    exc_info=True,
+                )
+                self.degraded = True
+                self._spool(ops[index:])
+                return
+
+    def _spool(self, ops: list[dict]) -> None:
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        header = []
+        if not self.spool_path.exists():
+            header.append(
+                {
+                    "kind": "run",
+                    "run_id": self.run_id,
+                    "run_name": self.run_name,
+                    "experiment_id": self.experiment_id,
+                }
+            )
+            if self.tags:
+                header[0]["tags"] = self.tags
+        with self.spool_path.open("a") as handle:
+            for op in header + ops:
+                handle.write(json.dumps(op) + "\n")
+
+
+def replay_spool(client: MlflowClient, spool_dir: Path) -> str:
+    """Ship a spooled run to ``client``; returns its MLflow run id.
+
+    Replayed operations are removed from the spool as they succeed, so an
+    interrupted replay resumes where it stopped (and reuses the created run).
+    """
+    spool_path = Path(spool_dir) / SPOOL_FILE
+    header, *ops = [json.loads(line) for line in spool_path.read_text().splitlines() if line]
+    run_id = header["run_id"]
+    if run_id is None:
+        run = client.create_run(
+            header["experiment_id"], run_name=header["run_name"], tags=header.get("tags")
+        )
+        run_id = run.info.run_id
+        header["run_id"] = run_id
+    for index, op in enumerate(ops):
+        try:
+            _apply(client, run_id, op)
+        except Exception:
+            remaining = [header, *ops[index:]]
+            spool_path.write_text("".join(json.dumps(item) + "\n" for item in remaining))
+            raise
+    spool_path.unlink()
+    return run_id
+
+
+def tracking_client(settings: RunnerSettings) -> MlflowClient:
+    if settings.MLFLOW_S3_ENDPOINT_URL:
+        os.environ.setdefault("MLFLOW_S3_ENDPOINT_URL", settings.MLFLOW_S3_ENDPOINT_URL)
+    return MlflowClient(settings.MLFLOW_TRACKING_URI)
+
+
+def start_tracking(
+    settings: RunnerSettings,
+    run_name: str,
+    workdir: Path,
+    tags: dict[str, str] | None = None,
+    client: MlflowClient | None = None,
+) -> TrackingSink:
+    """A :class:`TrackingSink` for a new run on the configured tracking server."""
+    return TrackingSink.start(
+        client or tracking_client(settings),
+        settings.MLFLOW_EXPERIMENT_ID,
+        run_name,
+        workdir / "tracking",
+        tags=tags,
+        flush_interval_s=settings.TRACKING_FLUSH_INTERVAL_S,
+        max_retries=settings.TRACKING_MAX_RETRIES,
+        backoff_s=settings.TRACKING_BACKOFF_S,
+    )
@@ -0,0 +1,364 @@
+import json
+import shutil
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core.domain.v0 import RunSpec
+from core.domain.v0.enums import FeatureDType
+from core.storage import S3CompatibleStore, UploadItem, dataset_prefix, feature_set_prefix
+from ml import (
+    BinnedDataset,
+    EvaluationPolicy,
+    FeatureSpec,
+    GBMModel,
+    SplitPolicy,
+    Splits,
+    binning_key,
+    build_binned_dataset,
+    cross_validate,
+    evaluate_policy,
+    get_trainer,
+    load_binned,
+    load_splits,
+    make_splits,
+    parse_monotone,
+    read_columns,
+    save_binned,
+    save_splits,
+    split_key,
+)
+from ml.dataset import BINNED_FILES
+from runner.config import RunnerSettings
+from runner.db import (
+    fetch_dataset,
+    fetch_dataset_version_by_id,
+    fetch_feature_set_version,
+    fetch_features_by_name,
+)
+from runner.engine import transaction
+from runner.ingest import dataset_partition_keys
+from runner.store import get_cache
+
+_CATEGORICAL_DTYPES = {FeatureDType.CAT, FeatureDType.TEXT}
+
+
+@dataclass
+class TrainingResult:
+    model_path: Path
+    artifacts: dict[str, Path] = field(default_factory=dict)
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+def feature_specs(names: list[str], registered: dict[str, dict]) -> list[FeatureSpec]:
+    """Feature specs for a feature set; unregistered features infer their kind from the data."""
+    specs = []
+    for name in names:
+        row = registered.get(name)
+        if row is None:
+            specs.append(FeatureSpec(name))
+            continue
+        kind = "cat" if row["dtype"] in _CATEGORICAL_DTYPES else "num"
+        specs.append(FeatureSpec(name, kind, parse_monotone(row["monotonic_expectation"])))
+    return specs
+
+
+def binned_matrix_prefix(feature_set_version: dict, data_fingerprint: str, key: str) -> str:
+    prefix = feature_set_prefix(
+        str(feature_set_version["feature_set_id"]), feature_set_version["version"]
+    )
+    fingerprint = data_fingerprint.replace(":", "-")
+    return f"{prefix}binned/{fingerprint}/{feature_set_version['id']}/{key}/"
+
+
+def load_or_build_binned(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    version: dict,
+    feature_set_version: dict,
+    partition_keys: list[str],
+    specs: list[FeatureSpec],
+    target: str,
+    max_bins: int,
+    workdir: Path,
+) -> tuple[BinnedDataset, bool]:
+    """Memory-map the cached binned matrix for this data/feature-set pair, building it on a miss.
+
+    The matrix lives under ``feature_set_prefix(...)/binned/{fingerprint}/{fsv_id}/{key}/``
+    where ``key`` hashes the binning configuration; ``bins.json`` is uploaded last so
+    its presence marks a complete entry. Returns the dataset and whether it was cached.
+    """
+    cache = get_cache(settings)
+    fingerprint = version["data_fingerprint"]
+    prefix = binned_matrix_prefix(
+        feature_set_version, fingerprint, binning_key(specs, target, max_bins)
+    )
+    if store.exists(f"{prefix}bins.json"):
+        paths = {name: cache.fetch(f"{prefix}{name}", fingerprint) for name in BINNED_FILES}
+        return load_binned(paths), True
+
+    paths = [cache.fetch(key, fingerprint) for key in partition_keys]
+    data = build_binned_dataset(paths, specs, target, max_bins=max_bins)
+    files = save_binned(
+        data,
+        workdir / "binned",
+        metadata={
+            "data_fingerprint": fingerprint,
+            "feature_set_version_id": str(feature_set_version["id"]),
+            "target": target,
+        },
+    )
+    store.put_many(
+        [
+            UploadItem(f"{prefix}codes.npy", files["codes.npy"], "application/octet-stream"),
+            UploadItem(f"{prefix}target.npy", files["target.npy"], "application/octet-stream"),
+        ]
+    )
+    store.put_file(f"{prefix}bins.json", files["bins.json"], "application/json")
+    local = {name: cache.add(f"{prefix}{name}", fingerprint, files[name]) for name in BINNED_FILES}
+    shutil.rmtree(workdir / "binned", ignore_errors=True)
+    return load_binned(local), False
+
+
+def splits_object_key(version: dict, key: str) -> str:
+    prefix = dataset_prefix(str(version["dataset_id"]), version["version"])
+    return f"{prefix}splits/{key}/splits.npz"
+
+
+def load_or_build_splits(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    version: dict,
+    dataset: dict,
+    partition_keys: list[str],
+    policy: SplitPolicy,
+    target: str,
+    data: BinnedDataset,
+    workdir: Path,
+) -> tuple[Splits, Path, bool]:
+    """Load the split indices for this dataset version and policy, computing them on a miss.
+
+    Splits are stored once per ``(data_fingerprint, split_key)`` under
+    ``dataset_prefix(...)/splits/{key}/splits.npz``, so repeat runs and sweeps over
+    the same data reuse them. Returns the splits, their local path and whether they
+    were cached.
+    """
+    cache = get_cache(settings)
+    fingerprint = version["data_fingerprint"]
+    date_range = (dataset.get("date_start"), dataset.get("date_end"))
+    key = splits_object_key(version, split_key(policy, target, date_range))
+    if store.exists(key):
+        path = cache.fetch(key, fingerprint)
+        splits, cached = load_splits(path), True
+    else:
+        columns = {}
+        if policy.columns:
+            paths = [cache.fetch(item, fingerprint) for item in partition_keys]
+            table = read_columns(paths, policy.columns, target)
+            columns = {name: table.column(name) for name in policy.columns}
+        splits = make_splits(policy, data.target, columns, date_range)
+        local = save_splits(
+            splits,
+            workdir / "splits" / "splits.npz",
+            metadata={"data_fingerprint": fingerprint, "target": target},
+        )
+        store.put_file(key, local, "application/octet-stream")
+        path, cached = cache.add(key, fingerprint, local), False
+        local.unlink(missing_ok=True)
+    indices = (splits.train, splits.valid, splits.test)
+    if any(rows.size and rows[-1] >= data.n_rows for rows in indices):
+        raise ValueError("Split indices do not match the binned matrix")
+    return splits, path, cached
+
+
+@dataclass
+class TrainingData:
+    data: BinnedDataset
+    splits: Splits | None
+    artifacts: dict[str, Path] = field(default_factory=dict)
+    metrics: dict[str, float] = field(default_factory=dict)
+
+
+def prepare_training_data(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_spec: RunSpec,
+    max_bins: int,
+    workdir: Path,
+    log: Callable[[str], None],
+) -> TrainingData | None:
+    """Load (or build and cache) the binned matrix and split indices for ``run_spec``.
+
+    Returns None (and logs why) when the dataset version has no Parquet partitions.
+    """
+    with transaction(settings) as conn:
+        version = fetch_dataset_version_by_id(conn, run_spec.dataset_version_id)
+        dataset = fetch_dataset(conn, version["dataset_id"])
+        feature_set_version = fetch_feature_set_version(conn, run_spec.feature_set_version_id)
+        names = feature_set_version["features"] or []
+        registered = fetch_features_by_name(conn, names) if names else {}
+
+    keys = dataset_partition_keys(store, version["dataset_id"], version["version"])
+    if not keys:
+        log("Dataset version has no materialized partitions")
+        return None
+    if not names:
+        raise ValueError("Feature set version has no features")
+    target = dataset["target_definition"]
+    if not target:
+        raise ValueError("Dataset target_definition is required for training")
+
+    started = time.perf_counter()
+    data, cached = load_or_build_binned(
+        settings,
+        store,
+        version,
+        feature_set_version,
+        keys,
+        feature_specs(names, registered),
+        target,
+        max_bins,
+        workdir,
+    )
+    binned = time.perf_counter()
+    source = "Loaded cached" if cached else "Built"
+    log(
+        f"{source} binned matrix ({data.n_rows} rows x {data.n_features} features) "
+        f"in {binned - started:.3f}s"
+    )
+    prepared = TrainingData(
+        data=data,
+        splits=None,
+        metrics={"binning_seconds": binned - started, "binned_cache_hit": float(cached)},
+    )
+    if run_spec.split_policy:
+        policy = SplitPolicy.from_dict(run_spec.split_policy)
+        splits, prepared.artifacts["splits/splits.npz"], splits_cached = load_or_build_splits(
+            settings, store, version, dataset, keys, policy, target, data, workdir
+        )
+        counts = splits.counts()
+        log(
+            f"{'Loaded cached' if splits_cached else 'Computed'} {policy.method} split "
+            f"(train={counts['train']}, valid={counts['valid']}, test={counts['test']})"
+        )
+        prepared.splits = splits
+        prepared.metrics.update(
+            {
+                "valid_rows": float(counts["valid"]),
+                "test_rows": float(counts["test"]),
+                "splits_cache_hit": float(splits_cached),
+            }
+        )
+    return prepared
+
+
+def evaluate_model(
+    model: GBMModel,
+    data: BinnedDataset,
+    splits: Splits,
+    policy: EvaluationPolicy,
+    metrics: dict[str, float],
+) -> dict[str, dict]:
+    """Evaluate the validation and test holdouts, with PSI against the training scores.
+
+    Adds the headline figures (and bootstrap bounds) to ``metrics`` as
+    ``{split}_{metric}`` and returns the full report per split.
+    """
+    scores = model.predict_binned(data.codes)
+    reference = scores[splits.train]
+    report = {}
+    for name, rows in (("valid", splits.valid), ("test", splits.test)):
+        if not rows.size:
+            continue
+        result = evaluate_policy(policy, data.target[rows], scores[rows], reference)
+        report[name] = result
+        for key in ("auc", "gini", "ks", "brier", "psi", "calibration_error"):
+            metrics[f"{name}_{key}"] = result[key]
+        for key, interval in result.get("intervals", {}).items():
+            metrics[f"{name}_{key}_low"] = interval["low"]
+            metrics[f"{name}_{key}_high"] = interval["high"]
+    return report
+
+
+def train_model(
+    settings: RunnerSettings,
+    store: S3CompatibleStore,
+    run_spec: RunSpec,
+    workdir: Path,
+    log: Callable[[str], None],
+) -> TrainingResult:
+    """Train ``run_spec.model_family`` on the materialized dataset version.
+
+    Raises ``ValueError`` when the dataset version has no Parquet partitions, so the
+    run fails instead of succeeding without a model.
+    """
+    params = dict(run_spec.model_params)
+    if settings.TRAIN_THREADS is not None:
+        params.setdefault("n_threads", settings.TRAIN_THREADS)
+    trainer = get_trainer(run_spec.model_family, params)
+    evaluation = (
+        EvaluationPolicy.from_dict(run_spec.evaluation_policy)
+        if run_spec.evaluation_policy
+        else None
+    )
+
+    prepared = prepare_training_data(
+        settings, store, run_spec, trainer.params.max_bins, workdir, log
+    )
+    if prepared is None:
+        raise ValueError("Dataset version has no materialized partitions")
+    data, splits = prepared.data, prepared.splits
+    artifacts, metrics = prepared.artifacts, prepared.metrics
+    binned = time.perf_counter()
+
+    if splits is not None and splits.n_folds >= 2:
+        cv = cross_validate(
+            data,
+            splits,
+            run_spec.model_family,
+            dict(run_spec.model_params),
+            workdir / "cv",
+            max_workers=settings.CV_MAX_WORKERS,
+            n_threads=settings.TRAIN_THREADS,
+        )
+        log(f"Cross-validated {splits.n_folds} folds in {cv.seconds:.3f}s")
+        metrics.update(cv.summary())
+        artifacts["cv/metrics.json"] = workdir / "cv" / "metrics.json"
+        for result in cv.folds:
+            artifacts[f"cv/{result.model_path.parent.name}/model.json"] = result.model_path
+        # Fold 0 is the validation holdout, so its model doubles as the run's model.
+        model = GBMModel.load(cv.folds[0].model_path)
+    else:
+        model = trainer.fit(
+            data,
+            train_rows=splits.train if splits is not None else None,
+            valid_rows=splits.valid if splits is not None and splits.valid.size else None,
+        )
+    finished = time.perf_counter()
+    log(
+        f"Trained {run_spec.model_family} with {len(model.trees)} trees "
+        f"in {finished - binned:.3f}s"
+    )
+    model_path = model.save(workdir / "model" / "model.json")
+    metrics.update(
+        {
+            "train_rows": float(splits.train.size if splits is not None else data.n_rows),
+            # The kept round: early stopping drops the rounds after best_iteration.
+            "train_loss": model.history["train_loss"][len(model.trees) - 1],
+            "training_seconds": finished - binned,
+        }
+    )
+    if model.history.get("valid_loss"):
+        metrics["valid_loss"] = model.history["valid_loss"][len(model.trees) - 1]
+    if evaluation is not None and splits is not None:
+        if trainer.params.objective != "binary":
+            log("Skipping evaluation_policy: evaluation metrics require a binary objective")
+        else:
+            report = evaluate_model(model, data, splits, evaluation, metrics)
+            path = workdir / "evaluation" / "metrics.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2))
+            artifacts["evaluation/metrics.json"] = path
+            log(f"Evaluated {', '.join(report)} in {time.perf_counter() - finished:.3f}s")
+    return TrainingResult(model_path=model_path, artifacts=artifacts, metrics=metrics)
@@ -0,0 +1,193 @@
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from types import FrameType
+from uuid import UUID
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+from core.domain.v0 import RunSpec
+from core.domain.v0.enums import RunStatus
+from runner.config import RunnerSettings, get_settings
+from runner.db import (
+    claim_next_run,
+    claim_next_scoring_job,
+    fetch_run_spec,
+    reap_expired_leases,
+    runs,
+    scoring_jobs,
+    touch_lease,
+    update_run_status,
+)
+from runner.engine import transaction
+from runner.lease import Lease
+from runner.runtime import execute_run
+from runner.scoring import execute_scoring_job
+from runner.store import get_store
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def heartbeat(
+    settings: RunnerSettings, table: Table, row_id: UUID, attempt: int
+) -> Iterator[Lease]:
+    """Keep the lease on a claimed row alive from a background thread while the body runs.
+
+    Once the row is no longer held by this claim (the reaper requeued or failed it
+    while heartbeats were failing) the yielded lease is marked lost and the
+    heartbeat stops; the body aborts at its next :meth:`Lease.check`.
+    """
+    lease = Lease(row_id, attempt)
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(settings.WORKER_HEARTBEAT_INTERVAL_S):
+            try:
+                with transaction(settings) as conn:
+                    held = touch_lease(conn, table, row_id, attempt)
+            except Exception:  # noqa: BLE001
+                logger.warning("Heartbeat for %s %s failed", table.name, row_id, exc_info=True)
+                continue
+            if not held:
+                logger.error("Lost the lease on %s %s; aborting", table.name, row_id)
+                lease.lost.set()
+                return
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{row_id}", daemon=True)
+    thread.start()
+    try:
+        yield lease
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _reap(settings: RunnerSettings, conn: Connection, table: Table) -> None:
+    requeued, failed = reap_expired_leases(
+        conn, table, settings.WORKER_LEASE_S, settings.WORKER_MAX_ATTEMPTS
+    )
+    if requeued or failed:
+        logger.warning(
+            "Recovered %s rows with expired leases: %s requeued, %s failed",
+            table.name,
+            requeued,
+            failed,
+        )
+
+
+def claim_and_execute(settings: RunnerSettings) -> bool:
+    """Claim one queued run and execute it. Returns False when the queue is empty.
+
+    Runs whose worker died (no heartbeat for ``WORKER_LEASE_S``) are requeued, or
+    failed after ``WORKER_MAX_ATTEMPTS`` claims, before the next run is claimed.
+    """
+    with transaction(settings) as conn:
+        _reap(settings, conn, runs)
+        claimed = claim_next_run(conn)
+        if claimed is None:
+            return False
+        payload = fetch_run_spec(conn, claimed["run_spec_id"])
+        if payload is None:
+            update_run_status(
+                conn,
+                claimed["id"],
+                RunStatus.FAILED,
+                finished_at=datetime.utcnow(),
+                failure_reason="Run spec not found",
+            )
+            return True
+
+    run_spec = RunSpec.model_validate(payload)
+    logger.info("Claimed run %s", claimed["id"])
+    try:
+        with heartbeat(settings, runs, claimed["id"], claimed["attempt"]) as lease:
+            execute_run(
+                settings,
+                get_store(settings),
+                claimed["id"],
+                run_spec,
+                claimed["started_at"],
+                lease=lease,
+            )
+    except Exception:  # noqa: BLE001
+        # execute_run has already recorded the failure on the run row, unless the
+        # lease was lost and the row belongs to another claim.
+        logger.exception("Run %s failed", claimed["id"])
+    return True
+
+
+def claim_and_score(settings: RunnerSettings) -> bool:
+    """Claim one queued scoring job and execute it. Returns False when none is queued."""
+    with transaction(settings) as conn:
+        _reap(settings, conn, scoring_jobs)
+        job = claim_next_scoring_job(conn)
+    if job is None:
+        return False
+    logger.info("Claimed scoring job %s for run %s", job["id"], job["run_id"])
+    try:
+        with heartbeat(settings, scoring_jobs, job["id"], job["attempt"]) as lease:
+            execute_scoring_job(settings, get_store(settings), job, lease=lease)
+    except Exception:  # noqa: BLE001
+        # execute_scoring_job has already recorded the failure on the job row, unless
+        # the lease was lost.
+        logger.exception("Scoring job %s failed", job["id"])
+    return True
+
+
+def run_worker(poll_interval_s: float | None = None) -> None:
+    """Poll the ``runs`` and ``scoring_jobs`` tables for queued work until SIGTERM/SIGINT."""
+    settings = get_settings()
+    interval = poll_interval_s if poll_interval_s is not None else settings.WORKER_POLL_INTERVAL_S
+    stopping = False
+
+    def _stop(signum: int, frame: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while not stopping:
+        try:
+            # Take one of each per pass so a backlog of runs cannot starve scoring.
+            claimed = claim_and_execute(settings)
+            claimed = claim_and_score(settings) or claimed
+        except Exception:  # noqa: BLE001
+            logger.exception("Worker poll failed")
+            claimed = False
+        if not claimed:
+            time.sleep(interval)
+
+
+def run_worker_pool(concurrency: int | None = None) -> None:
+    """Start ``concurrency`` worker processes and wait for them to exit."""
+    settings = get_settings()
+    size = concurrency or settings.WORKER_CONCURRENCY
+    if size == 1:
+        run_worker()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, name=f"runner-worker-{index}")
+        for index in range(size)
+    ]
+    for process in processes:
+        process.start()
+
+    def _forward(signum: int, frame: FrameType | None) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for process in processes:
+        process.join()
@@ -0,0 +1,50 @@
+import io
+from pathlib import Path
+
+import pytest
+
+
+class MemoryStore:
+    """In-memory stand-in for ``S3CompatibleStore`` used by pipeline tests."""
+
+    bucket = "test-bucket"
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        self.objects[key] = bytes(data)
+
+    def put_file(self, key: str, path: str | Path, content_type: str | None = None) -> None:
+        self.objects[key] = Path(path).read_bytes()
+
+    def put_many(self, items) -> None:
+        for item in items:
+            source = item.source
+            self.objects[item.key] = source if isinstance(source, bytes) else source.read_bytes()
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.objects[key]
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        return self.objects[key][start:end]
+
+    def size(self, key: str) -> int:
+        return len(self.objects[key])
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> io.BytesIO:
+        return io.BytesIO(self.objects[key])
+
+    def iter_keys(self, prefix: str, delimiter: str | None = None, stats=None):
+        return iter(sorted(key for key in self.objects if key.startswith(prefix)))
+
+    def list(self, prefix: str) -> list[str]:
+        return list(self.iter_keys(prefix))
+
+    def exists(self, key: str) -> bool:
+        return key in self.objects
+
+
+@pytest.fixture
+def memory_store() -> MemoryStore:
+    return MemoryStore()
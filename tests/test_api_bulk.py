@@ -0,0 +1,123 @@
+import json
+from uuid import uuid4
+
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from api.db import models
+from api.db.session import get_session
+from api.main import app
+
+
+class _Result:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def scalars(self) -> list:
+        return [row[0] for row in self.rows]
+
+    def tuples(self) -> "_Result":
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+
+class _Session:
+    """Records bulk INSERTs; ``registered`` names already exist in the features table."""
+
+    def __init__(self, registered: dict | None = None) -> None:
+        self.registered = registered or {}
+        self.inserts: list[list[dict]] = []
+        self.commits = 0
+
+    async def get(self, model, key):
+        return models.Dataset(id=key) if model is models.Dataset else None
+
+    async def execute(self, statement, params=None) -> _Result:
+        if params is None:
+            return _Result(list(self.registered.items()))
+        self.inserts.append(params)
+        names = [row.get("name") for row in params]
+        return _Result([(name,) for name in names if name not in self.registered])
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+def _client(session: _Session) -> TestClient:
+    async def override():
+        yield session
+
+    app.dependency_overrides[get_session] = override
+    return TestClient(app)
+
+
+def test_bulk_features_report_per_row_results() -> None:
+    existing_id = uuid4()
+    session = _Session({"bureau_score": existing_id})
+    rows = [
+        {"name": "bureau_score", "dtype": "num", "origin": "bureau"},
+        {"name": "avg_balance", "dtype": "num", "origin": "bank_stmt", "pii_flag": False},
+        {"name": "bad_dtype", "dtype": "complex", "origin": "bureau"},
+        {"name": "avg_balance", "dtype": "num", "origin": "bank_stmt"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n"
+    try:
+        response = _client(session).post(
+            "/features:bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.status_code == 200, response.text
+    payload = response.json()
+    assert (payload["created"], payload["existing"], payload["invalid"]) == (1, 1, 2)
+    results = payload["results"]
+    assert [result["status"] for result in results] == ["exists", "created", "invalid", "invalid"]
+    assert results[0]["id"] == str(existing_id)
+    assert results[2]["error"].startswith("dtype:")
+    assert results[3]["error"] == "name: duplicates row 1"
+    (inserted,) = session.inserts
+    assert [row["name"] for row in inserted] == ["bureau_score", "avg_balance"]
+    assert session.commits == 1
+
+
+def test_bulk_dataset_versions_accept_arrow() -> None:
+    session = _Session()
+    table = pa.table(
+        {
+            "version": ["v1", "v2", None],
+            "data_fingerprint": ["a" * 64, "b" * 64, "c" * 64],
+            "created_by": [None, "analyst", None],
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    dataset_id = uuid4()
+    try:
+        client = _client(session)
+        response = client.post(
+            f"/datasets/{dataset_id}/versions:bulk",
+            content=sink.getvalue().to_pybytes(),
+            headers={"Content-Type": "application/vnd.apache.arrow.stream", "X-User": "loader"},
+        )
+        unsupported = client.post(
+            f"/datasets/{dataset_id}/versions:bulk",
+            content=b"[]",
+            headers={"Content-Type": "application/json"},
+        )
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.status_code == 200, response.text
+    assert [result["status"] for result in response.json()["results"]] == [
+        "created",
+        "created",
+        "invalid",
+    ]
+    (inserted,) = session.inserts
+    assert [row["created_by"] for row in inserted] == ["loader", "analyst"]
+    assert {row["dataset_id"] for row in inserted} == {dataset_id}
+    assert unsupported.status_code == 415
@@ -0,0 +1,116 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from api.db import models
+from api.db.session import get_session
+from api.main import app
+from api.pagination import (
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    page_statement,
+)
+
+
+def test_cursor_round_trip_and_keyset_statement() -> None:
+    created_at, item_id = datetime(2024, 5, 1, 12, 30, 15, 123456), uuid4()
+    cursor = encode_cursor(created_at, item_id)
+    assert decode_cursor(cursor) == (created_at, item_id)
+
+    page = PageParams(limit=50, cursor=cursor, fields=None, created_after=None, created_before=None)
+    statement = page_statement(models.Run, page, [models.Run.status == "queued"], ["id", "status"])
+    compiled = statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "(runs.created_at, runs.id) < (" in sql
+    assert "ORDER BY runs.created_at DESC, runs.id DESC" in sql
+    assert "runs.run_spec_id" not in sql
+    assert 51 in compiled.params.values()
+
+
+def test_list_endpoints_reject_bad_page_parameters() -> None:
+    client = TestClient(app)
+
+    assert client.get("/runs/", params={"cursor": "not-a-cursor"}).status_code == 422
+    assert client.get("/runs/", params={"limit": 5000}).status_code == 422
+    response = client.get("/datasets/", params={"fields": "id,password"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown fields: password"
+
+
+class _Page:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def mappings(self) -> "_Page":
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+
+class _KeysetSession:
+    """Answers page statements from ``rows`` with the statement's own cursor and limit."""
+
+    def __init__(self, rows: list[models.Run]) -> None:
+        self.rows = sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+
+    def _page(self, statement) -> list[models.Run]:
+        params = statement.compile(dialect=postgresql.dialect()).params.values()
+        (limit,) = [value for value in params if isinstance(value, int)]
+        bound = tuple(value for value in params if isinstance(value, (datetime, UUID)))
+        rows = [row for row in self.rows if not bound or (row.created_at, row.id) < bound]
+        return rows[:limit]
+
+    async def scalars(self, statement) -> _Page:
+        return _Page(self._page(statement))
+
+    async def execute(self, statement) -> _Page:
+        names = [column.key for column in statement.selected_columns]
+        rows = self._page(statement)
+        return _Page([{name: getattr(row, name) for name in names} for row in rows])
+
+
+def _walk(client: TestClient, params: dict) -> tuple[list[list], list[str | None]]:
+    pages, cursors, cursor = [], [], None
+    while True:
+        response = client.get("/runs/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        cursors.append(cursor)
+        if cursor is None:
+            return pages, cursors
+
+
+def test_cursor_pages_walk_rows_with_tied_timestamps_once() -> None:
+    tied, later = datetime(2024, 5, 1, 12), datetime(2024, 5, 2, 12)
+    runs = [
+        models.Run(id=uuid4(), run_spec_id=uuid4(), status="queued", created_at=created_at)
+        for created_at in [tied] * 5 + [later] * 2
+    ]
+    expected = [str(row.id) for row in _KeysetSession(runs).rows]
+
+    async def session():
+        yield _KeysetSession(runs)
+
+    app.dependency_overrides[get_session] = session
+    try:
+        client = TestClient(app)
+        pages, cursors = _walk(client, {"limit": 2})
+        projected, _ = _walk(client, {"limit": 3, "fields": "id,status"})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    # Pages split inside the run of equal created_at without skipping or repeating rows.
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [item["id"] for page in pages for item in page] == expected
+    assert cursors[-1] is None and all(cursors[:-1])
+    assert [len(page) for page in projected] == [3, 3, 1]
+    assert [item["id"] for page in projected for item in page] == expected
+    # Only the requested fields come back, although the keyset columns are read.
+    items = [item for page in projected for item in page]
+    assert all(item == {"id": item["id"], "status": "queued"} for item in items)
@@ -1,6 +1,14 @@
+from datetime import datetime
+from uuid import uuid4
+
+import httpx
 from fastapi.testclient import TestClient
 
+from api.cache import version_cache
+from api.db import models
+from api.db.session import get_session
 from api.main import app
+from api.runner_client import get_runner_client
 
 
 def test_health_and_version() -> None:
@@ -29,3 +37,140 @@ def test_schema_endpoints() -> None:
     response = client.get("/schemas/v0/run_spec")
     assert response.status_code == 200
     assert response.json().get("title") == "RunSpec"
+    etag = response.headers["ETag"]
+    assert "max-age" in response.headers["Cache-Control"]
+
+    response = client.get("/schemas/v0/run_spec", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert client.get("/schemas/v0/missing").status_code == 404
+
+
+class _Row:
+    def __init__(self, row: tuple | None) -> None:
+        self.row = row
+
+    def one_or_none(self) -> tuple | None:
+        return self.row
+
+
+def test_dataset_versions_revalidate_against_statistics_digest() -> None:
+    version = models.DatasetVersion(
+        id=uuid4(),
+        dataset_id=uuid4(),
+        version="v1",
+        created_at=datetime(2024, 5, 1),
+        data_fingerprint="abc",
+    )
+    digest = {"value": "d1"}
+    reads: list = []
+
+    class Session:
+        async def execute(self, statement):
+            return _Row((version.dataset_id, digest["value"]))
+
+        async def get(self, model, key):
+            reads.append(key)
+            return version if model is models.DatasetVersion and key == version.id else None
+
+    async def session():
+        yield Session()
+
+    app.dependency_overrides[get_session] = session
+    version_cache.clear()
+    try:
+        client = TestClient(app)
+        path = f"/datasets/{version.dataset_id}/versions/{version.id}"
+        first = client.get(path)
+        assert first.status_code == 200
+        assert first.json()["data_fingerprint"] == "abc"
+        assert first.headers["Cache-Control"] == "no-cache"
+
+        again = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
+        assert client.get(path).content == first.content
+        assert len(reads) == 1
+
+        # Re-profiling changes the digest: the body is reloaded and gets a new ETag.
+        version.statistics_summary = {"row_count": 10}
+        digest["value"] = "d2"
+        changed = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert changed.status_code == 200
+        assert changed.json()["statistics_summary"] == {"row_count": 10}
+        assert changed.headers["ETag"] != first.headers["ETag"]
+        assert len(reads) == 2
+        assert client.get(f"/datasets/{uuid4()}/versions/{version.id}").status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        version_cache.clear()
+
+
+def test_feature_set_versions_are_cached_after_first_read() -> None:
+    version = models.FeatureSetVersion(
+        id=uuid4(),
+        feature_set_id=uuid4(),
+        version="v1",
+        created_at=datetime(2024, 5, 1),
+        features=["income"],
+    )
+    reads: list = []
+
+    class Session:
+        async def get(self, model, key):
+            reads.append(key)
+            return version if model is models.FeatureSetVersion and key == version.id else None
+
+    async def session():
+        yield Session()
+
+    app.dependency_overrides[get_session] = session
+    version_cache.clear()
+    try:
+        client = TestClient(app)
+        path = f"/feature-sets/{version.feature_set_id}/versions/{version.id}"
+        first = client.get(path)
+        assert first.status_code == 200
+        assert "max-age" in first.headers["Cache-Control"]
+        again = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
+        assert client.get(f"/feature-sets/{uuid4()}/versions/{version.id}").status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        version_cache.clear()
+
+    assert len(reads) == 2
+
+
+def test_score_run_uses_shared_runner_client() -> None:
+    run_id, version_id = uuid4(), uuid4()
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if len(seen) > 1:
+            return httpx.Response(404, json={"detail": "Run has no model"})
+        body = {
+            "job_id": str(uuid4()),
+            "status": "queued",
+            "run_id": str(run_id),
+            "dataset_version_id": str(version_id),
+            "output_prefix": f"reports/{run_id}/scores/",
+            "partitions": 3,
+        }
+        return httpx.Response(202, json=body)
+
+    runner = httpx.AsyncClient(base_url="http://runner", transport=httpx.MockTransport(handler))
+    app.dependency_overrides[get_runner_client] = lambda: runner
+    try:
+        with TestClient(app) as client:
+            response = client.post(f"/runs/{run_id}/score", json={"id_columns": ["id"]})
+            assert response.status_code == 202
+            assert response.json()["partitions"] == 3
+            missing = client.post(f"/runs/{run_id}/score", json={})
+            assert missing.status_code == 404
+            assert missing.json() == {"detail": "Run has no model"}
+    finally:
+        app.dependency_overrides.pop(get_runner_client, None)
+
+    assert [str(request.url) for request in seen] == [f"http://runner/runs/{run_id}/score"] * 2
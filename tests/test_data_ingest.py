@@ -0,0 +1,93 @@
+import io
+import json
+
+import pyarrow.parquet as pq
+
+from data.ingest import ingest_dataset
+
+
+def test_ingest_csv_streams_into_partitions(memory_store) -> None:
+    lines = ["id,amount,grade"] + [
+        f"{i},{'' if i % 10 == 0 else i * 1.5},{'ABC'[i % 3]}" for i in range(2_500)
+    ]
+    memory_store.put_bytes("raw/loans.csv", ("\n".join(lines) + "\n").encode())
+
+    result = ingest_dataset(
+        memory_store,
+        "s3://test-bucket/raw/loans.csv",
+        "ds-1",
+        "v1",
+        block_size=4096,
+        rows_per_partition=1_000,
+    )
+
+    assert result.row_count == 2_500
+    assert result.partitions == [f"datasets/ds-1/v1/part-{i:05d}.parquet" for i in range(3)]
+    assert result.data_fingerprint.startswith("sha256:")
+    amount = result.statistics_summary["columns"]["amount"]
+    assert amount["null_count"] == 250
+    assert amount["max"] == 2_499 * 1.5
+
+    rows = sum(
+        pq.read_table(io.BytesIO(memory_store.objects[key])).num_rows for key in result.partitions
+    )
+    assert rows == 2_500
+    manifest = json.loads(memory_store.objects["datasets/ds-1/v1/_manifest.json"])
+    assert manifest["schema_hash"] == result.schema_hash
+
+
+def test_ingest_jsonl_prefix_is_deterministic(memory_store) -> None:
+    payload = "".join(json.dumps({"id": i, "flag": i % 2 == 0}) + "\n" for i in range(300))
+    memory_store.put_bytes("raw/json/a.jsonl", payload.encode())
+    memory_store.put_bytes("raw/json/b.jsonl", payload.encode())
+
+    uri = "s3://test-bucket/raw/json/"
+    first = ingest_dataset(memory_store, uri, "ds-2", "v1", block_size=512)
+    second = ingest_dataset(memory_store, uri, "ds-2", "v2", block_size=512)
+
+    assert first.row_count == 600
+    assert first.data_fingerprint == second.data_fingerprint
+    assert first.schema_hash == second.schema_hash
+
+
+def test_ingest_unifies_types_inferred_per_block(memory_store) -> None:
+    # The first blocks have no value for "note": alone they would type it as null.
+    lines = ["id,note"] + [f"{i}," for i in range(1_000)] + [f"{i},n{i}" for i in range(1_000)]
+    memory_store.put_bytes("raw/notes.csv", ("\n".join(lines) + "\n").encode())
+    records = [{"id": i} for i in range(500)] + [{"id": i, "score": i / 2} for i in range(500)]
+    payload = "".join(json.dumps(record) + "\n" for record in records)
+    memory_store.put_bytes("raw/scores.jsonl", payload.encode())
+
+    notes = ingest_dataset(
+        memory_store, "s3://test-bucket/raw/notes.csv", "ds-3", "v1", block_size=1024
+    )
+    scores = ingest_dataset(
+        memory_store, "s3://test-bucket/raw/scores.jsonl", "ds-4", "v1", block_size=1024
+    )
+
+    assert notes.row_count == 2_000
+    table = pq.read_table(io.BytesIO(memory_store.objects[notes.partitions[0]]))
+    assert str(table.schema.field("note").type) == "string"
+    assert table.column("note").to_pylist()[::1_999] == [None, "n999"]
+    nulls = table.column("note").null_count
+    assert nulls and notes.statistics_summary["columns"]["note"]["null_count"] == nulls
+
+    # A JSONL field first seen in a later block is kept, null-filled before it.
+    table = pq.read_table(io.BytesIO(memory_store.objects[scores.partitions[0]]))
+    assert str(table.schema.field("score").type) == "double"
+    assert table.column("score").to_pylist()[499:501] == [None, 0.0]
+
+
+def test_ingest_csv_keeps_quoted_fields_with_newlines(memory_store) -> None:
+    lines = ['id,"note\nline"'] + [f'{i},"row {i}\nsays ""hi""\n"' for i in range(500)]
+    memory_store.put_bytes("raw/quoted.csv", ("\n".join(lines) + "\n").encode())
+
+    result = ingest_dataset(
+        memory_store, "s3://test-bucket/raw/quoted.csv", "ds-5", "v1", block_size=256
+    )
+
+    assert result.row_count == 500
+    table = pq.read_table(io.BytesIO(memory_store.objects[result.partitions[0]]))
+    assert table.column_names == ["id", "note\nline"]
+    assert table.column("id").to_pylist() == list(range(500))
+    assert table.column("note\nline").to_pylist()[7] == 'row 7\nsays "hi"\n'
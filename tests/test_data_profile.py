@@ -0,0 +1,78 @@
+import json
+from decimal import Decimal
+
+import numpy as np
+import pyarrow as pa
+
+from data.profile import HyperLogLog, TableProfile, hash_array
+
+
+def _profile(table: pa.Table, chunk: int) -> TableProfile:
+    merged: TableProfile | None = None
+    for batch in table.to_batches(max_chunksize=chunk):
+        partial = TableProfile(table.schema)
+        partial.update(batch)
+        if merged is None:
+            merged = partial
+        else:
+            merged.merge(partial)
+    return merged
+
+
+def test_merged_profile_matches_exact_statistics() -> None:
+    rng = np.random.default_rng(7)
+    values = rng.normal(10.0, 3.0, 200_000)
+    mask = rng.random(values.size) < 0.05
+    table = pa.table({"x": pa.array(values, mask=mask), "g": rng.integers(0, 1_000, values.size)})
+
+    summary = _profile(table, chunk=30_000).summary()
+    column = summary["columns"]["x"]
+    present = values[~mask]
+
+    assert summary["row_count"] == values.size
+    assert column["null_count"] == int(mask.sum())
+    assert np.isclose(column["mean"], present.mean())
+    assert np.isclose(column["variance"], present.var(ddof=1))
+    assert abs(column["quantiles"]["p50"] - np.median(present)) < 0.1
+    assert abs(summary["columns"]["g"]["approx_distinct"] - 1_000) < 30
+
+
+def test_hyperloglog_estimates_large_cardinality() -> None:
+    sketch = HyperLogLog()
+    sketch.update(hash_array(pa.array(np.arange(500_000))))
+    assert abs(sketch.estimate() - 500_000) / 500_000 < 0.03
+
+
+def test_string_hashes_are_vectorized_and_stable() -> None:
+    words = pa.array(["", "a", "ab", "ba", "ab", None, "ünï"])
+    hashes = hash_array(words)
+    again = hash_array(pa.array(["ünï", "ba", "ab", "a", ""], type=pa.large_string()))
+
+    assert hashes.size == 5
+    assert set(hashes.tolist()) == set(again.tolist())
+    # Offsets are honoured for sliced arrays.
+    assert hash_array(words.slice(2, 2)).tolist() == hashes[2:4].tolist()
+
+    sketch = HyperLogLog()
+    sketch.update(hash_array(pa.array([f"user-{i}" for i in range(200_000)])))
+    assert abs(sketch.estimate() - 200_000) / 200_000 < 0.03
+
+
+def test_summary_is_json_for_decimal_and_non_finite_columns() -> None:
+    table = pa.table(
+        {
+            "price": pa.array([Decimal("1.25"), Decimal("10.50"), None], pa.decimal128(6, 2)),
+            "ratio": pa.array([float("nan"), float("nan"), float("inf")]),
+        }
+    )
+    profile = TableProfile(table.schema)
+    profile.update(table.slice(0, 2).to_batches()[0])
+
+    summary = json.loads(json.dumps(profile.summary(), allow_nan=False))
+    assert (summary["columns"]["price"]["min"], summary["columns"]["price"]["max"]) == (1.25, 10.5)
+    assert summary["columns"]["ratio"]["min"] is None
+    assert summary["columns"]["ratio"]["max"] is None
+
+    profile.update(table.slice(2).to_batches()[0])
+    summary = json.loads(json.dumps(profile.summary(), allow_nan=False))
+    assert summary["columns"]["ratio"]["max"] is None
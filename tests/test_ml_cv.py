@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml import (
+    FeatureSpec,
+    SplitPolicy,
+    build_binned_dataset,
+    cross_validate,
+    load_binned,
+    make_splits,
+    save_binned,
+)
+
+
+def test_cross_validation_workers_share_the_mapped_matrix(tmp_path: Path) -> None:
+    rng = np.random.default_rng(5)
+    x = rng.normal(size=3000)
+    table = pa.table({"x": x, "default": (x + rng.normal(size=3000) > 0).astype(np.int64)})
+    pq.write_table(table, tmp_path / "part-00000.parquet")
+    built = build_binned_dataset([tmp_path / "part-00000.parquet"], [FeatureSpec("x")], "default")
+    data = load_binned(save_binned(built, tmp_path / "binned"))
+    splits = make_splits(SplitPolicy("stratified", n_folds=3), data.target)
+
+    result = cross_validate(
+        data, splits, "gbm", {"n_estimators": 10}, tmp_path / "cv", max_workers=2, n_threads=2
+    )
+
+    assert [fold.fold for fold in result.folds] == [0, 1, 2]
+    assert sum(fold.metrics["valid_rows"] for fold in result.folds) == 3000
+    assert result.summary()["cv_valid_loss_mean"] < np.log(2)
+    assert sorted(path.name for path in (tmp_path / "cv").iterdir()) == [
+        "fold-00000",
+        "fold-00001",
+        "fold-00002",
+        "metrics.json",
+    ]
+    metrics = json.loads((tmp_path / "cv" / "metrics.json").read_text())
+    assert metrics["folds"][1]["model"] == "fold-00001/model.json"
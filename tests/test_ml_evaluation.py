@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ml import EvaluationPolicy, bootstrap_intervals, evaluate, evaluate_policy, psi
+
+
+def test_metrics_match_brute_force_definitions() -> None:
+    rng = np.random.default_rng(0)
+    y = (rng.random(3000) < 0.2).astype(np.float64)
+    # Rounded scores exercise tied groups in the ROC curve.
+    score = np.round(np.clip(0.2 + 0.3 * (y - 0.2) + rng.normal(0, 0.2, y.size), 0, 1), 2)
+
+    metrics = evaluate(y, score, reference=score, n_bins=10)
+
+    pos, neg = score[y == 1], score[y == 0]
+    pairs = (pos[:, None] > neg[None, :]).sum() + 0.5 * (pos[:, None] == neg[None, :]).sum()
+    assert metrics["auc"] == pytest.approx(pairs / (pos.size * neg.size))
+    assert metrics["gini"] == pytest.approx(2 * metrics["auc"] - 1)
+    thresholds = np.unique(score)
+    ks = max(abs((pos >= t).mean() - (neg >= t).mean()) for t in thresholds)
+    assert metrics["ks"] == pytest.approx(ks)
+    assert metrics["brier"] == pytest.approx(np.mean((score - y) ** 2))
+    assert metrics["psi"] == pytest.approx(0.0)
+    lift = metrics["lift"]
+    assert sum(row["rows"] for row in lift) == y.size
+    assert lift[-1]["gain"] == pytest.approx(1.0)
+    assert lift[0]["lift"] > 1.0 > lift[-1]["lift"]
+    assert psi(score, np.clip(score + 0.2, 0, 1)) > 0.1
+
+
+def test_bootstrap_intervals_cover_point_estimates() -> None:
+    rng = np.random.default_rng(1)
+    y = (rng.random(20_000) < 0.1).astype(np.float64)
+    score = 1 / (1 + np.exp(-(rng.normal(0, 1, y.size) + 1.5 * y - 2)))
+    policy = EvaluationPolicy.from_dict({"bootstrap": 200, "n_threads": 2, "seed": 3})
+
+    metrics = evaluate_policy(policy, y, score)
+    for name in ("auc", "ks", "brier"):
+        interval = metrics["intervals"][name]
+        assert interval["low"] < metrics[name] < interval["high"]
+        assert interval["std"] > 0
+    again = bootstrap_intervals(y, score, n_resamples=200, seed=3, n_threads=1)
+    assert again == metrics["intervals"]
+    with pytest.raises(ValueError):
+        EvaluationPolicy.from_dict({"bins": 5})
@@ -0,0 +1,143 @@
+import itertools
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml import (
+    ExplanationPolicy,
+    FeatureSpec,
+    TreeExplainer,
+    build_binned_dataset,
+    get_trainer,
+    reason_codes,
+)
+from ml.gbm import Tree
+from ml.scoring import iter_score_partitions
+
+
+def _conditional_value(tree: Tree, x: np.ndarray, known: set[int], node: int = 0) -> float:
+    if tree.feature[node] < 0:
+        return float(tree.value[node])
+    feature = int(tree.feature[node])
+    if feature in known:
+        value = x[feature]
+        right = not tree.default_left[node] if np.isnan(value) else value > tree.threshold[node]
+        return _conditional_value(tree, x, known, tree.right[node] if right else tree.left[node])
+    left, right = tree.left[node], tree.right[node]
+    return (
+        tree.cover[left] * _conditional_value(tree, x, known, left)
+        + tree.cover[right] * _conditional_value(tree, x, known, right)
+    ) / tree.cover[node]
+
+
+def _brute_force_shap(trees: list[Tree], x: np.ndarray) -> np.ndarray:
+    n = x.size
+    phi = np.zeros(n)
+    for i in range(n):
+        others = [j for j in range(n) if j != i]
+        for size in range(n):
+            weight = math.factorial(size) * math.factorial(n - size - 1) / math.factorial(n)
+            for subset in itertools.combinations(others, size):
+                known = set(subset)
+                phi[i] += weight * sum(
+                    _conditional_value(tree, x, known | {i}) - _conditional_value(tree, x, known)
+                    for tree in trees
+                )
+    return phi
+
+
+def _training_table(rows: int, seed: int) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(rows, 4))
+    x[rng.random(x.shape) < 0.05] = np.nan
+    filled = np.nan_to_num(x)
+    target = filled[:, 0] + filled[:, 1] * filled[:, 2] + rng.normal(size=rows) > 0
+    columns = {f"x{index}": x[:, index] for index in range(4)}
+    return pa.table({"id": np.arange(rows), **columns, "default": target.astype(np.int64)})
+
+
+def test_tree_shap_matches_exact_shapley_values(tmp_path: Path) -> None:
+    path = tmp_path / "train.parquet"
+    table = _training_table(3000, 0)
+    pq.write_table(table, path)
+    data = build_binned_dataset([path], [FeatureSpec(f"x{i}") for i in range(4)], "default")
+    model = get_trainer("gbm", {"n_estimators": 8, "max_depth": 4, "n_threads": 1}).fit(data)
+    encoded = model.mapper.encode(table)[:40]
+
+    explainer = TreeExplainer.from_model(model)
+    phi = explainer.shap_values(encoded, n_threads=2)
+
+    np.testing.assert_allclose(
+        phi.sum(axis=1) + explainer.expected_value, model.raw_score(encoded), atol=1e-10
+    )
+    for row in range(10):
+        exact = _brute_force_shap(model.trees, encoded[row])
+        np.testing.assert_allclose(phi[row], exact, atol=1e-10)
+
+    top, values = reason_codes(np.array([[0.5, -1.0, 2.0], [-0.1, -0.2, 0.0]]), 2)
+    np.testing.assert_array_equal(top, [[2, 0], [-1, -1]])
+    assert np.isnan(values[1]).all()
+
+
+def test_batch_scoring_writes_reason_codes(tmp_path: Path) -> None:
+    path = tmp_path / "in.parquet"
+    table = _training_table(2000, 1)
+    pq.write_table(table, path)
+    data = build_binned_dataset([path], [FeatureSpec(f"x{i}") for i in range(4)], "default")
+    model = get_trainer("gbm", {"n_estimators": 10, "n_threads": 1}).fit(data)
+    model_path = model.save(tmp_path / "model.json")
+
+    (result,) = iter_score_partitions(
+        model_path,
+        [path],
+        tmp_path / "out",
+        id_columns=("id",),
+        batch_rows=512,
+        explain=ExplanationPolicy(top_n=2, contributions=True),
+        reason_texts={"x0": "Utilization too high"},
+    )
+
+    explained = pq.read_table(result.explanation_path)
+    assert explained.column_names[:4] == ["id", "partition_row", "reason_1", "contribution_1"]
+    metadata = explained.schema.metadata
+    assert json.loads(metadata[b"reason_codes"])["x0"] == "Utilization too high"
+    shap = np.column_stack([explained.column(f"shap_x{i}").to_numpy() for i in range(4)])
+    raw = model.raw_score(model.mapper.encode(table))
+    expected_value = json.loads(metadata[b"expected_value"])
+    np.testing.assert_allclose(shap.sum(axis=1) + expected_value, raw, atol=1e-4)
+    best = np.argmax(shap, axis=1)
+    reasons = explained.column("reason_1").to_pylist()
+    positive = shap.max(axis=1) > 0
+    assert [reasons[i] for i in np.flatnonzero(positive)] == [
+        f"x{best[i]}" for i in np.flatnonzero(positive)
+    ]
+
+
+def test_explainer_sizes_its_table_before_building_it(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "train.parquet"
+    table = _training_table(3000, 2)
+    pq.write_table(table, path)
+    data = build_binned_dataset([path], [FeatureSpec(f"x{i}") for i in range(4)], "default")
+    model = get_trainer("gbm", {"n_estimators": 6, "max_depth": 4, "n_threads": 1}).fit(data)
+    encoded = model.mapper.encode(table)[:50]
+    expected = TreeExplainer.from_model(model).shap_values(encoded, n_threads=1)
+
+    # Tiny chunks build the table a few leaves at a time, with the same result.
+    monkeypatch.setattr("ml.explain._CHUNK_ELEMENTS", 64)
+    chunked = TreeExplainer.from_model(model)
+    np.testing.assert_allclose(chunked.shap_values(encoded, n_threads=1), expected)
+
+    def fail(zero, value):
+        raise AssertionError("table built despite exceeding the limit")
+
+    monkeypatch.setattr("ml.explain._shap_tables", fail)
+    try:
+        TreeExplainer.from_model(model, max_table_bytes=1024)
+    except ValueError as exc:
+        assert "smaller max_depth" in str(exc)
+    else:
+        raise AssertionError("expected ValueError")
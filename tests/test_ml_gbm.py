@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml import (
+    CompiledEnsemble,
+    FeatureSpec,
+    GBMModel,
+    binning_key,
+    build_binned_dataset,
+    get_trainer,
+    load_binned,
+    save_binned,
+)
+
+
+def _write_partitions(tmp_path: Path, n_rows: int = 6000) -> list[Path]:
+    rng = np.random.default_rng(7)
+    income = rng.normal(size=n_rows)
+    noise = rng.normal(size=n_rows)
+    region = rng.choice(["north", "south", "east"], size=n_rows)
+    logit = 2.0 * income + np.where(region == "south", 1.0, 0.0) + 0.3 * np.sin(3 * noise)
+    target = (rng.random(n_rows) < 1.0 / (1.0 + np.exp(-logit))).astype(np.int64)
+    income[rng.random(n_rows) < 0.05] = np.nan
+    table = pa.table({"income": income, "noise": noise, "region": region, "default": target})
+    paths = []
+    for index, start in enumerate(range(0, n_rows, n_rows // 2)):
+        path = tmp_path / f"part-{index:05d}.parquet"
+        pq.write_table(table.slice(start, n_rows // 2), path)
+        paths.append(path)
+    return paths
+
+
+def test_gbm_trains_on_binned_partitions_with_monotone_constraint(tmp_path: Path) -> None:
+    specs = [FeatureSpec("income", "num", monotone=1), FeatureSpec("noise"), FeatureSpec("region")]
+    data = build_binned_dataset(_write_partitions(tmp_path), specs, "default", max_bins=63)
+
+    assert data.codes.dtype == np.uint8
+    assert data.mapper.kinds == ["num", "num", "cat"]
+    assert int(data.codes[:, 0].max()) < 64
+
+    trainer = get_trainer("gbm", {"n_estimators": 30, "max_depth": 4, "n_threads": 2})
+    model = trainer.fit(data, train_rows=np.arange(4000), valid_rows=np.arange(4000, 6000))
+
+    losses = model.history["train_loss"]
+    assert losses[-1] < losses[0]
+    assert model.history["valid_loss"][-1] < model.history["valid_loss"][0]
+
+    grid = pa.table(
+        {"income": np.linspace(-3, 3, 50), "noise": np.zeros(50), "region": ["north"] * 50}
+    )
+    scores = model.predict(grid)
+    assert np.all(np.diff(scores) >= -1e-12)
+
+    path = model.save(tmp_path / "model.json")
+    restored = GBMModel.load(path)
+    np.testing.assert_allclose(restored.predict(grid), scores)
+
+    first_rows = pq.ParquetFile(tmp_path / "part-00000.parquet").read().slice(0, 100)
+    np.testing.assert_allclose(model.predict_binned(data.codes[:100]), model.predict(first_rows))
+
+
+def test_binned_matrix_round_trips_memory_mapped(tmp_path: Path) -> None:
+    specs = [FeatureSpec("income"), FeatureSpec("noise"), FeatureSpec("region")]
+    data = build_binned_dataset(_write_partitions(tmp_path), specs, "default")
+
+    paths = save_binned(data, tmp_path / "binned", metadata={"target": "default"})
+    loaded = load_binned(paths)
+
+    assert isinstance(loaded.codes, np.memmap)
+    assert loaded.codes.flags.f_contiguous
+    np.testing.assert_array_equal(loaded.codes, data.codes)
+    np.testing.assert_array_equal(loaded.target, data.target)
+    assert loaded.mapper.to_dict() == data.mapper.to_dict()
+    assert binning_key(specs, "default") != binning_key(specs, "default", max_bins=63)
+
+    params = {"n_estimators": 5, "n_threads": 1}
+    from_disk = get_trainer("gbm", params).fit(loaded)
+    in_memory = get_trainer("gbm", params).fit(data)
+    np.testing.assert_allclose(
+        from_disk.predict_binned(data.codes), in_memory.predict_binned(data.codes)
+    )
+
+
+def test_compiled_ensemble_matches_tree_by_tree_scoring(tmp_path: Path) -> None:
+    paths = _write_partitions(tmp_path, n_rows=2000)
+    specs = [FeatureSpec("income"), FeatureSpec("noise"), FeatureSpec("region")]
+    data = build_binned_dataset(paths, specs, "default", max_bins=31)
+    model = get_trainer("gbm", {"n_estimators": 15, "max_depth": 4, "n_threads": 1}).fit(data)
+
+    compiled = CompiledEnsemble.from_model(model)
+    table = pq.ParquetFile(paths[0]).read()
+    np.testing.assert_allclose(compiled.predict(model.mapper.encode(table)), model.predict(table))
+
+    records = [{"income": None, "noise": 0.5, "region": "south"}, {"region": "unseen"}]
+    np.testing.assert_allclose(
+        compiled.predict(model.mapper.encode_records(records)),
+        model.predict(pa.Table.from_pylist(records, schema=table.schema.remove(3))),
+    )
+
+
+def test_online_encoding_matches_training_for_date_features(tmp_path: Path) -> None:
+    rng = np.random.default_rng(11)
+    n_rows = 2000
+    days = rng.integers(18000, 20000, size=n_rows)
+    target = (rng.random(n_rows) < np.where(days > 19000, 0.8, 0.2)).astype(np.int64)
+    table = pa.table(
+        {
+            "opened": pa.array(days, type=pa.int32()).cast(pa.date32()),
+            "seen_at": pa.array(days.astype(np.int64) * 86_400_000_000).cast(pa.timestamp("us")),
+            "default": target,
+        }
+    )
+    path = tmp_path / "part-00000.parquet"
+    pq.write_table(table, path)
+    specs = [FeatureSpec("opened", "num"), FeatureSpec("seen_at", "num")]
+    data = build_binned_dataset([path], specs, "default", max_bins=31)
+    trained = get_trainer("gbm", {"n_estimators": 10, "max_depth": 3, "n_threads": 1}).fit(data)
+    trained.save(tmp_path / "model.json")
+    model = GBMModel.load(tmp_path / "model.json")
+
+    rows = table.slice(0, 5).to_pylist()
+    records = [
+        {"opened": row["opened"].isoformat(), "seen_at": row["seen_at"].isoformat()}
+        for row in rows
+    ]
+    np.testing.assert_array_equal(
+        model.mapper.encode_records(records), model.mapper.encode(table.slice(0, 5))
+    )
+    compiled = CompiledEnsemble.from_model(model)
+    np.testing.assert_allclose(
+        compiled.predict(model.mapper.encode_records(records)), model.predict(table.slice(0, 5))
+    )
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml import FeatureSpec, build_binned_dataset, get_trainer
+from ml.scoring import ROW_COLUMN, SCORE_COLUMN, iter_score_partitions
+
+
+def test_batch_scoring_writes_one_output_per_partition(tmp_path: Path) -> None:
+    rng = np.random.default_rng(3)
+    inputs = []
+    for index in range(3):
+        balance = rng.normal(size=1000)
+        table = pa.table(
+            {
+                "account_id": [f"acc-{index}-{row}" for row in range(1000)],
+                "balance": balance,
+                "default": (balance + rng.normal(size=1000) > 0).astype(np.int64),
+            }
+        )
+        path = tmp_path / f"in-{index}.parquet"
+        pq.write_table(table, path)
+        inputs.append(path)
+
+    data = build_binned_dataset(inputs, [FeatureSpec("balance")], "default")
+    model = get_trainer("gbm", {"n_estimators": 10, "n_threads": 1}).fit(data)
+    model_path = model.save(tmp_path / "model.json")
+
+    results = sorted(
+        iter_score_partitions(
+            model_path,
+            inputs,
+            tmp_path / "out",
+            id_columns=("account_id",),
+            batch_rows=256,
+            max_workers=2,
+        ),
+        key=lambda result: result.index,
+    )
+
+    assert [result.output_path.name for result in results] == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+        "part-00002.parquet",
+    ]
+    assert sum(result.rows for result in results) == 3000
+    scored = pq.ParquetFile(results[1].output_path).read()
+    assert scored.column_names == ["account_id", ROW_COLUMN, SCORE_COLUMN]
+    assert scored.column("account_id")[0].as_py() == "acc-1-0"
+    assert scored.column(ROW_COLUMN).to_pylist() == list(range(1000))
+    expected = model.predict(pq.ParquetFile(inputs[1]).read())
+    np.testing.assert_allclose(scored.column(SCORE_COLUMN).to_numpy(), expected)
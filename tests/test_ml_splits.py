@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from ml import SplitPolicy, load_splits, make_splits, save_splits
+
+
+def test_stratified_and_grouped_splits_are_disjoint_index_arrays(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    target = (rng.random(2000) < 0.1).astype(np.float64)
+
+    splits = make_splits(
+        SplitPolicy("stratified", valid_fraction=0.2, test_fraction=0.1, seed=1), target
+    )
+    assert splits.counts() == {"train": 1400, "valid": 400, "test": 200}
+    assert np.intersect1d(splits.train, splits.valid).size == 0
+    assert abs(target[splits.valid].mean() - target.mean()) < 0.01
+
+    customers = pa.array([f"c{row % 97}" for row in range(2000)])
+    policy = SplitPolicy("group_kfold", test_fraction=0.2, n_folds=4, group_column="customer")
+    grouped = make_splits(policy, target, {"customer": customers})
+    names = np.asarray(customers.to_pylist())
+    assert grouped.n_folds == 4
+    for fold in range(4):
+        train, valid = grouped.fold(fold)
+        assert not set(names[train]) & set(names[valid])
+        assert not set(names[grouped.test]) & set(names[train])
+    np.testing.assert_array_equal(grouped.valid, grouped.fold(0)[1])
+
+    restored = load_splits(save_splits(grouped, tmp_path / "splits.npz"))
+    np.testing.assert_array_equal(restored.train, grouped.train)
+    np.testing.assert_array_equal(restored.fold_ids, grouped.fold_ids)
+
+
+def test_out_of_time_split_uses_cutoffs_or_dataset_date_range() -> None:
+    days = [date(2024, 1, 1) + timedelta(days=row % 100) for row in range(1000)]
+    columns = {"as_of": pa.array(days)}
+    target = np.zeros(1000)
+
+    explicit = SplitPolicy(
+        "out_of_time", date_column="as_of", valid_start="2024-03-01", test_start="2024-03-21"
+    )
+    splits = make_splits(explicit, target, columns)
+    assert max(days[row] for row in splits.train) < date(2024, 3, 1)
+    assert min(days[row] for row in splits.test) == date(2024, 3, 21)
+
+    by_range = SplitPolicy("out_of_time", 0.2, 0.1, date_column="as_of")
+    splits = make_splits(by_range, target, columns, (date(2024, 1, 1), date(2024, 4, 9)))
+    assert splits.counts() == {"train": 700, "valid": 200, "test": 100}
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml import (
+    FeatureSpec,
+    SplitPolicy,
+    SweepSpec,
+    build_binned_dataset,
+    expand_trials,
+    make_splits,
+    run_sweep,
+)
+from ml.sweep import AshaScheduler
+
+
+def test_asha_promotes_top_trials_without_waiting_for_full_rungs() -> None:
+    scheduler = AshaScheduler(n_trials=4, n_rungs=2, eta=2)
+    assert [scheduler.next_job(), scheduler.next_job()] == [(0, 0), (1, 0)]
+    scheduler.report(1, 0, 0.3)
+    # One result is not enough to rank in the top half yet, so a new trial starts.
+    assert scheduler.next_job() == (2, 0)
+    scheduler.report(0, 0, 0.5)
+    assert scheduler.next_job() == (1, 1)
+    assert scheduler.next_job() == (3, 0)
+    assert scheduler.next_job() is None
+
+
+def test_sweep_prunes_trials_and_picks_the_best_full_budget_trial(tmp_path: Path) -> None:
+    rng = np.random.default_rng(11)
+    x = rng.normal(size=(4000, 2))
+    target = (x[:, 0] * x[:, 1] + 0.3 * rng.normal(size=4000) > 0).astype(np.int64)
+    pq.write_table(
+        pa.table({"a": x[:, 0], "b": x[:, 1], "default": target}), tmp_path / "part.parquet"
+    )
+    data = build_binned_dataset(
+        [tmp_path / "part.parquet"], [FeatureSpec("a"), FeatureSpec("b")], "default"
+    )
+    splits = make_splits(SplitPolicy("stratified"), data.target)
+    spec = SweepSpec(
+        grid={"max_depth": [1, 2, 3], "learning_rate": [0.1, 0.2, 0.3]},
+        min_resource=5,
+        max_resource=45,
+        eta=3,
+    )
+    trials = expand_trials(spec, {"min_samples_leaf": 10})
+
+    result = run_sweep(
+        data, splits.train, splits.valid, "gbm", trials, spec, tmp_path / "sweep", max_workers=2
+    )
+
+    assert result.rungs == [5, 15, 45]
+    assert result.jobs < len(trials) * len(result.rungs)
+    # Depth-1 stumps cannot model the interaction, so they are pruned at the first rung.
+    stumps = [trial for trial in result.trials if trial["model_params"]["max_depth"] == 1]
+    assert all(sorted(trial["losses"]) == [5] for trial in stumps)
+    assert result.best["resource"] == 45
+    assert result.best["model_params"]["max_depth"] > 1
+    saved = json.loads((tmp_path / "sweep" / "sweep.json").read_text())
+    assert saved["best_trial"] == result.best_trial
+
+
+def test_sweep_spec_rejects_binning_params() -> None:
+    for space in ({"grid": {"max_bins": [63, 255]}}, {"random": {"max_bins": [63, 255]}}):
+        try:
+            SweepSpec(**space, n_trials=2)
+        except ValueError as exc:
+            assert "max_bins" in str(exc)
+        else:
+            raise AssertionError(f"expected ValueError for {space}")
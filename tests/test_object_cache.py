@@ -0,0 +1,138 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.storage.cache import LocalObjectCache
+
+
+class _MemoryStore:
+    def __init__(self, objects: dict[str, bytes]) -> None:
+        self.objects = objects
+        self.reads: list[str] = []
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> io.BytesIO:
+        self.reads.append(key)
+        return io.BytesIO(self.objects[key])
+
+
+def test_cache_hits_after_first_fetch(tmp_path: Path) -> None:
+    store = _MemoryStore({"datasets/a/v1/part-0.parquet": b"abc" * 100})
+    cache = LocalObjectCache(store, tmp_path, max_bytes=10_000)
+
+    first = cache.fetch("datasets/a/v1/part-0.parquet", "fp-1")
+    second = cache.fetch("datasets/a/v1/part-0.parquet", "fp-1")
+
+    assert first == second
+    assert first.read_bytes() == b"abc" * 100
+    assert store.reads == ["datasets/a/v1/part-0.parquet"]
+    stats = cache.stats.snapshot()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    cache.fetch("datasets/a/v1/part-0.parquet", "fp-2")
+    assert len(store.reads) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    store = _MemoryStore({f"k{i}": bytes(400) for i in range(4)})
+    cache = LocalObjectCache(store, tmp_path, max_bytes=1000)
+
+    paths = [cache.fetch(f"k{i}", "fp") for i in range(2)]
+    cache.fetch("k0", "fp")
+    paths.append(cache.fetch("k2", "fp"))
+
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+    assert cache.stats.snapshot()["evictions"] == 1
+    assert cache.size_bytes() <= 1000
+
+
+class _SlowStore(_MemoryStore):
+    """Blocks reads of ``slow`` until ``release`` is set."""
+
+    def __init__(self, objects: dict[str, bytes], slow: str) -> None:
+        super().__init__(objects)
+        self.slow = slow
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> io.BytesIO:
+        if key == self.slow:
+            self.started.set()
+            assert self.release.wait(10)
+        return super().open_read(key, read_ahead)
+
+
+def test_slow_download_does_not_block_its_stripe(tmp_path: Path) -> None:
+    store = _SlowStore({}, slow="big")
+    cache = LocalObjectCache(store, tmp_path, max_bytes=10_000)
+    stripe = cache.path_for("big", "fp").name[:2]
+    # Other keys in the same lock stripe as the slow one.
+    small, other = [
+        f"k{i}" for i in range(10_000) if cache.path_for(f"k{i}", "fp").name[:2] == stripe
+    ][:2]
+    store.objects.update({"big": b"b" * 1000, small: b"s", other: b"o"})
+    cache.fetch(small, "fp")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        downloads = [pool.submit(cache.fetch, "big", "fp") for _ in range(2)]
+        assert store.started.wait(10)
+        # A hit and a miss on the stripe both finish while "big" is downloading.
+        assert cache.fetch(small, "fp").read_bytes() == b"s"
+        assert cache.fetch(other, "fp").read_bytes() == b"o"
+        assert not any(download.done() for download in downloads)
+        store.release.set()
+        paths = {download.result(timeout=10) for download in downloads}
+
+    (path,) = paths
+    assert path.read_bytes() == b"b" * 1000
+    # The second waiter found the entry once it got the lock.
+    assert store.reads.count("big") == 1
+    assert not list((tmp_path / "locks").glob(f"{path.stem}.lock"))
+
+
+class _FlakyStore(_MemoryStore):
+    """Fails the first read of ``big`` once ``fail`` is set; holds later ones until ``release``."""
+
+    def __init__(self, objects: dict[str, bytes]) -> None:
+        super().__init__(objects)
+        self.reading = [threading.Event(), threading.Event()]
+        self.fail = threading.Event()
+        self.release = threading.Event()
+
+    def open_read(self, key: str, read_ahead: int | None = None) -> io.BytesIO:
+        attempt = self.reads.count(key)
+        self.reads.append(key)
+        if attempt < len(self.reading):
+            self.reading[attempt].set()
+        if attempt == 0:
+            assert self.fail.wait(10)
+            raise OSError("connection reset")
+        assert self.release.wait(10)
+        return io.BytesIO(self.objects[key])
+
+
+def test_failed_download_keeps_later_fetches_single_flight(tmp_path: Path) -> None:
+    store = _FlakyStore({"big": b"b" * 1000})
+    cache = LocalObjectCache(store, tmp_path, max_bytes=10_000)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        failed = pool.submit(cache.fetch, "big", "fp")
+        assert store.reading[0].wait(10)
+        # Opens the first holder's lock file, which is unlinked when that download fails.
+        waiter = pool.submit(cache.fetch, "big", "fp")
+        time.sleep(0.2)
+        store.fail.set()
+        assert store.reading[1].wait(10)
+        # A fresh caller must queue behind whichever fetch is now downloading.
+        late = pool.submit(cache.fetch, "big", "fp")
+        time.sleep(0.2)
+        assert store.reads.count("big") == 2
+        store.release.set()
+
+        assert isinstance(failed.exception(timeout=10), OSError)
+        assert waiter.result(timeout=10) == late.result(timeout=10)
+    assert store.reads.count("big") == 2
@@ -0,0 +1,56 @@
+import asyncio
+from pathlib import Path
+
+from api.run_logs import tail_run_log
+from core.storage import run_log_chunk_key, run_log_end_key
+from runner.logs import RunLogSink
+
+
+def _collect(store, position, finished=True) -> list[tuple[str | None, str | None, str]]:
+    async def is_finished() -> bool:
+        return finished
+
+    async def run() -> list[str]:
+        events = tail_run_log(store, "run-1", position, is_finished, poll_interval_s=0, grace_s=0)
+        return [event async for event in events]
+
+    parsed = []
+    for event in asyncio.run(run()):
+        fields = dict(line.partition(": ")[::2] for line in event.strip("\n").splitlines())
+        parsed.append((fields.get("event"), fields.get("id"), fields["data"]))
+    return parsed
+
+
+def test_run_log_sink_uploads_chunks_and_tail_resumes(memory_store, tmp_path: Path) -> None:
+    lines = [f"step {i:02d}" for i in range(10)]
+    sink = RunLogSink(memory_store, "run-1", tmp_path / "runner.log", chunk_bytes=32)
+    for line in lines:
+        sink.write(line)
+    sink.close()
+
+    assert (tmp_path / "runner.log").read_text().splitlines() == lines
+    # Four 8-byte lines fit a 32-byte chunk.
+    assert [memory_store.exists(run_log_chunk_key("run-1", seq)) for seq in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert memory_store.exists(run_log_end_key("run-1"))
+
+    events = _collect(memory_store, (0, 0))
+    assert [data for kind, _, data in events if kind is None] == lines
+    assert events[-1][0] == "end"
+
+    resume = events[3][1]
+    seq, offset = (int(part) for part in resume.split(":"))
+    resumed = _collect(memory_store, (seq, offset))
+    assert [data for kind, _, data in resumed if kind is None] == lines[4:]
+
+
+def test_tail_ends_after_grace_when_runner_left_no_marker(memory_store) -> None:
+    memory_store.put_bytes(run_log_chunk_key("run-1", 0), b"first\nsecond\npartial")
+
+    events = _collect(memory_store, None)
+
+    assert events == [(None, "0:6", "first"), (None, "0:13", "second"), ("end", None, "")]
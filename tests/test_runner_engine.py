@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from sqlalchemy import text
+
+from runner.config import RunnerSettings
+from runner.engine import dispose_engines, get_engine, pool_metrics, transaction
+
+
+def test_transactions_share_one_pooled_engine_per_url(tmp_path: Path) -> None:
+    settings = RunnerSettings(DATABASE_URL=f"sqlite:///{tmp_path / 'runner.db'}", DB_POOL_SIZE=2)
+    other = RunnerSettings(DATABASE_URL=f"sqlite:///{tmp_path / 'other.db'}")
+    try:
+        for value in range(3):
+            with transaction(settings) as conn:
+                assert conn.execute(text("SELECT :value"), {"value": value}).scalar() == value
+                assert conn.engine is get_engine(settings)
+
+        metrics = pool_metrics(settings)
+        # Three checkouts reused the one pooled connection.
+        assert (metrics["connects"], metrics["checkouts"], metrics["checkins"]) == (1, 3, 3)
+        assert metrics["timed_checkouts"] == 3
+        assert metrics["checked_out"] == 0
+        assert metrics["pool_size"] == 2
+        assert get_engine(RunnerSettings(DATABASE_URL=settings.DATABASE_URL)) is get_engine(
+            settings
+        )
+        assert get_engine(other) is not get_engine(settings)
+        assert pool_metrics(other)["checkouts"] == 0
+    finally:
+        dispose_engines()
@@ -0,0 +1,352 @@
+"""Run queue: enqueue, claim, worker loop and lease recovery.
+
+The claim and reaper tests against a real database need a disposable Postgres, as
+``test_query_plans.py`` does: set ``TEST_DATABASE_URL``. The rest run anywhere.
+"""
+
+import os
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, select, text, update
+from sqlalchemy.dialects import postgresql
+
+import runner.worker
+from api.db import models
+from api.db.session import get_session
+from api.main import app
+from core.domain.v0.enums import RunStatus
+from runner.config import RunnerSettings
+from runner.db import claim_next_run, reap_expired_leases, runs, touch_lease, update_run_status
+from runner.lease import LeaseLost
+from runner.worker import claim_and_execute, heartbeat, run_worker
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+API_DIR = Path(__file__).resolve().parents[1] / "services" / "api"
+needs_database = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+class _Result:
+    def __init__(self, row: dict | None = None, rowcount: int = 0) -> None:
+        self.row = row
+        self.rowcount = rowcount
+
+    def mappings(self) -> "_Result":
+        return self
+
+    def first(self) -> dict | None:
+        return self.row
+
+
+class _Connection:
+    """Compiles every statement for Postgres; SELECTs return ``row``, updates ``rowcount``."""
+
+    def __init__(self, row: dict | None, rowcount: int = 1) -> None:
+        self.row = row
+        self.rowcount = rowcount
+        self.statements: list[str] = []
+
+    def execute(self, statement) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        if self.statements[-1].startswith("SELECT"):
+            return _Result(self.row)
+        return _Result(rowcount=self.rowcount)
+
+
+def test_claim_skips_locked_rows_and_starts_a_lease() -> None:
+    run_id = uuid.uuid4()
+    conn = _Connection({"id": run_id, "run_spec_id": uuid.uuid4(), "attempts": 1})
+
+    claimed = claim_next_run(conn)
+
+    select_sql, update_sql = conn.statements
+    assert "FOR UPDATE SKIP LOCKED" in select_sql
+    assert "heartbeat_at=" in update_sql
+    assert "attempts=(runs.attempts + " in update_sql
+    assert claimed["id"] == run_id
+    assert claimed["attempt"] == 2
+    assert claim_next_run(_Connection(None)) is None
+
+
+def test_status_writes_are_fenced_on_the_claim() -> None:
+    run_id = uuid.uuid4()
+    conn = _Connection(None)
+    update_run_status(conn, run_id, RunStatus.SUCCEEDED, attempt=2)
+    (sql,) = conn.statements
+    assert "runs.status = %(status_1)s" in sql
+    assert "runs.attempts = %(attempts_1)s" in sql
+
+    # The row was requeued (and perhaps claimed again): nothing matched.
+    with pytest.raises(LeaseLost):
+        update_run_status(_Connection(None, rowcount=0), run_id, RunStatus.SUCCEEDED, attempt=2)
+    assert touch_lease(_Connection(None, rowcount=0), runs, run_id, 2) is False
+    # Inline runs hold no claim and are not fenced.
+    update_run_status(_Connection(None, rowcount=0), run_id, RunStatus.SUCCEEDED)
+
+
+def test_execute_returns_202_and_queues_the_run() -> None:
+    added = []
+
+    class Session:
+        async def get(self, model, key):
+            return models.RunSpec(id=key) if model is models.RunSpec else None
+
+        def add(self, row) -> None:
+            row.id = uuid.uuid4()
+            added.append(row)
+
+        async def commit(self) -> None:
+            pass
+
+        async def refresh(self, row) -> None:
+            pass
+
+    async def session():
+        yield Session()
+
+    app.dependency_overrides[get_session] = session
+    try:
+        response = TestClient(app).post("/runs/execute", json={"run_spec_id": str(uuid.uuid4())})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    (run,) = added
+    assert response.json()["run_id"] == str(run.id)
+
+
+def _patch_transaction(monkeypatch) -> None:
+    @contextmanager
+    def transaction(settings) -> Iterator[None]:
+        yield None
+
+    monkeypatch.setattr(runner.worker, "transaction", transaction)
+
+
+def test_missing_run_spec_fails_the_run_with_finished_at(monkeypatch) -> None:
+    run_id = uuid.uuid4()
+    updates = []
+    _patch_transaction(monkeypatch)
+    monkeypatch.setattr(runner.worker, "reap_expired_leases", lambda *args: (0, 0))
+    monkeypatch.setattr(
+        runner.worker,
+        "claim_next_run",
+        lambda conn: {"id": run_id, "run_spec_id": uuid.uuid4(), "started_at": datetime.utcnow()},
+    )
+    monkeypatch.setattr(runner.worker, "fetch_run_spec", lambda conn, run_spec_id: None)
+    monkeypatch.setattr(
+        runner.worker,
+        "update_run_status",
+        lambda conn, claimed_id, status, **values: updates.append((claimed_id, status, values)),
+    )
+    monkeypatch.setattr(runner.worker, "execute_run", pytest.fail)
+
+    assert claim_and_execute(RunnerSettings()) is True
+
+    ((claimed_id, status, values),) = updates
+    assert (claimed_id, status) == (run_id, RunStatus.FAILED)
+    assert values["failure_reason"] == "Run spec not found"
+    assert isinstance(values["finished_at"], datetime)
+
+
+def test_heartbeat_extends_the_lease_while_work_runs(monkeypatch) -> None:
+    touched = threading.Event()
+    _patch_transaction(monkeypatch)
+    monkeypatch.setattr(
+        runner.worker, "touch_lease", lambda conn, table, row_id, attempt: touched.set() or True
+    )
+
+    settings = RunnerSettings(WORKER_HEARTBEAT_INTERVAL_S=0.01)
+    with heartbeat(settings, runs, uuid.uuid4(), 1) as lease:
+        assert touched.wait(5)
+    assert not lease.lost.is_set()
+
+
+def test_heartbeat_marks_a_reclaimed_lease_lost(monkeypatch) -> None:
+    _patch_transaction(monkeypatch)
+    monkeypatch.setattr(runner.worker, "touch_lease", lambda conn, table, row_id, attempt: False)
+
+    settings = RunnerSettings(WORKER_HEARTBEAT_INTERVAL_S=0.01)
+    with heartbeat(settings, runs, uuid.uuid4(), 1) as lease:
+        assert lease.lost.wait(5)
+        with pytest.raises(LeaseLost):
+            lease.check()
+
+
+def test_worker_polls_until_stopped(monkeypatch) -> None:
+    handlers = {}
+    calls = []
+    sleeps = []
+    monkeypatch.setattr(runner.worker.signal, "signal", handlers.__setitem__)
+    monkeypatch.setattr(runner.worker.time, "sleep", sleeps.append)
+
+    def claim(settings) -> bool:
+        calls.append("run")
+        if len(calls) == 2:
+            raise RuntimeError("database unavailable")
+        if len(calls) == 4:
+            handlers[runner.worker.signal.SIGTERM](runner.worker.signal.SIGTERM, None)
+        return len(calls) == 1
+
+    monkeypatch.setattr(runner.worker, "claim_and_execute", claim)
+    monkeypatch.setattr(runner.worker, "claim_and_score", lambda settings: False)
+
+    run_worker(poll_interval_s=0.5)
+
+    # A claimed run polls again at once; an error or an empty queue sleeps first.
+    assert len(calls) == 4
+    assert sleeps == [0.5, 0.5, 0.5]
+
+
+SEED = [
+    """
+    INSERT INTO datasets (id, name, storage_uri, status, created_at, updated_at)
+    VALUES (:ds, 'ds', 's3://ds', 'ready', now(), now())
+    """,
+    """
+    INSERT INTO dataset_versions (id, dataset_id, version, created_at, data_fingerprint)
+    VALUES (:dv, :ds, 'v1', now(), 'fp')
+    """,
+    "INSERT INTO feature_sets (id, name, created_at) VALUES (:fs, 'fs', now())",
+    """
+    INSERT INTO feature_set_versions (id, feature_set_id, version, created_at)
+    VALUES (:fsv, :fs, 'v1', now())
+    """,
+    """
+    INSERT INTO run_specs (
+        id, dataset_version_id, feature_set_version_id, split_policy, model_family,
+        model_params, evaluation_policy, artifact_policy, created_at
+    )
+    VALUES (:rs, :dv, :fsv, '{}', 'gbm', '{}', '{}', '{}', now())
+    """,
+]
+# Child tables first.
+CLEANUP = [
+    "runs",
+    "run_specs",
+    "feature_set_versions",
+    "feature_sets",
+    "dataset_versions",
+    "datasets",
+]
+
+
+@pytest.fixture(scope="module")
+def engine() -> Iterator[Engine]:
+    schema = f"run_queue_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(DATABASE_URL)
+    with admin.connect() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(f"SET search_path TO {schema}"))
+        conn.commit()
+        cfg = Config(str(API_DIR / "alembic.ini"))
+        cfg.set_main_option("script_location", str(API_DIR / "alembic"))
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, "head")
+        conn.commit()
+    engine = create_engine(DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+            conn.commit()
+        admin.dispose()
+
+
+@pytest.fixture
+def queued(engine: Engine) -> Iterator[list[uuid.UUID]]:
+    """Two queued runs of one run spec, removed again after the test."""
+    keys = {name: uuid.uuid4() for name in ("ds", "dv", "fs", "fsv", "rs")}
+    ids = [uuid.uuid4() for _ in range(2)]
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for statement in SEED:
+            conn.execute(text(statement), keys)
+        for offset, run_id in enumerate(ids):
+            conn.execute(
+                runs.insert().values(
+                    id=run_id,
+                    run_spec_id=keys["rs"],
+                    status=RunStatus.QUEUED,
+                    created_at=now + timedelta(seconds=offset),
+                )
+            )
+    yield ids
+    with engine.begin() as conn:
+        for table in CLEANUP:
+            conn.execute(text(f"DELETE FROM {table}"))
+
+
+@needs_database
+def test_concurrent_workers_claim_different_runs(engine: Engine, queued) -> None:
+    with engine.connect() as first, engine.connect() as second:
+        with first.begin(), second.begin():
+            # The first claim is still uncommitted: its row stays locked.
+            a = claim_next_run(first)
+            b = claim_next_run(second)
+            assert claim_next_run(second) is None
+
+    assert {a["id"], b["id"]} == set(queued)
+    with engine.connect() as conn:
+        statuses = conn.execute(select(runs.c.status, runs.c.attempts)).all()
+    assert statuses == [(RunStatus.RUNNING, 1), (RunStatus.RUNNING, 1)]
+
+
+@needs_database
+def test_expired_leases_are_requeued_then_failed(engine: Engine, queued) -> None:
+    stale = datetime.utcnow() - timedelta(minutes=10)
+
+    def claim_and_abandon() -> uuid.UUID:
+        with engine.begin() as conn:
+            reap_expired_leases(conn, runs, lease_s=60, max_attempts=2)
+            claimed = claim_next_run(conn)
+            conn.execute(update(runs).where(runs.c.id == claimed["id"]).values(heartbeat_at=stale))
+        return claimed["id"]
+
+    first = claim_and_abandon()
+    assert first == queued[0]
+    # The dead worker's run is requeued ahead of the younger run and claimed again.
+    assert claim_and_abandon() == first
+
+    with engine.begin() as conn:
+        assert reap_expired_leases(conn, runs, lease_s=60, max_attempts=2) == (0, 1)
+        row = conn.execute(select(runs).where(runs.c.id == first)).mappings().one()
+        assert reap_expired_leases(conn, runs, lease_s=60, max_attempts=2) == (0, 0)
+    assert row["status"] == RunStatus.FAILED
+    assert row["attempts"] == 2
+    assert row["finished_at"] is not None
+    assert row["failure_reason"] == "Worker lease expired after 2 attempts"
+
+
+@needs_database
+def test_a_reclaimed_run_rejects_its_first_workers_writes(engine: Engine, queued) -> None:
+    stale = datetime.utcnow() - timedelta(minutes=10)
+    with engine.begin() as conn:
+        first = claim_next_run(conn)
+        conn.execute(update(runs).where(runs.c.id == first["id"]).values(heartbeat_at=stale))
+    with engine.begin() as conn:
+        assert reap_expired_leases(conn, runs, lease_s=60, max_attempts=3) == (1, 0)
+        second = claim_next_run(conn)
+    assert second["id"] == first["id"]
+    assert second["attempt"] == first["attempt"] + 1
+
+    with engine.begin() as conn:
+        assert touch_lease(conn, runs, first["id"], first["attempt"]) is False
+        with pytest.raises(LeaseLost):
+            update_run_status(conn, first["id"], RunStatus.SUCCEEDED, attempt=first["attempt"])
+    with engine.begin() as conn:
+        assert touch_lease(conn, runs, second["id"], second["attempt"]) is True
+        update_run_status(conn, second["id"], RunStatus.SUCCEEDED, attempt=second["attempt"])
+        status = conn.execute(select(runs.c.status).where(runs.c.id == first["id"])).scalar()
+    assert status == RunStatus.SUCCEEDED
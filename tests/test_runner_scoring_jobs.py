@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+import runner.api
+import runner.scoring
+from core.domain.v0.enums import RunStatus
+from runner.api import create_app
+from runner.lease import Lease, LeaseLost
+from runner.scoring import ScoringPlan, execute_scoring_job
+
+
+def _plan(run_id, version_id) -> ScoringPlan:
+    return ScoringPlan(
+        run_id=run_id,
+        dataset_version_id=version_id,
+        data_fingerprint="fp",
+        model_key=f"runs/{run_id}/model/model.json",
+        partition_keys=["part-0.parquet", "part-1.parquet"],
+        output_prefix=f"reports/{run_id}/scores/{version_id}/",
+    )
+
+
+def test_score_endpoint_queues_a_job_without_scoring(monkeypatch) -> None:
+    run_id, version_id, job_id = uuid4(), uuid4(), uuid4()
+    queued = []
+
+    def enqueue(settings, store, run, dataset_version_id, id_columns):
+        queued.append((run, dataset_version_id, id_columns))
+        return job_id, _plan(run, version_id)
+
+    monkeypatch.setattr(runner.api, "get_store", lambda settings: None)
+    monkeypatch.setattr(runner.api, "enqueue_scoring", enqueue)
+    monkeypatch.setattr(runner.scoring, "execute_scoring", pytest.fail)
+
+    response = TestClient(create_app()).post(
+        f"/runs/{run_id}/score", json={"id_columns": ["account_id"]}
+    )
+
+    assert response.status_code == 202
+    body = response.json()
+    assert (body["job_id"], body["status"], body["partitions"]) == (str(job_id), "queued", 2)
+    assert queued == [(run_id, None, ("account_id",))]
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_scoring_job_records_its_outcome(monkeypatch, fails: bool) -> None:
+    job = {
+        "id": uuid4(),
+        "run_id": uuid4(),
+        "dataset_version_id": uuid4(),
+        "id_columns": ["account_id"],
+        "attempt": 2,
+    }
+    updates = []
+
+    @contextmanager
+    def transaction(settings):
+        yield None
+
+    def execute_scoring(settings, store, plan):
+        if fails:
+            raise RuntimeError("partition missing")
+        return {"rows": 10}
+
+    monkeypatch.setattr(runner.scoring, "transaction", transaction)
+    monkeypatch.setattr(
+        runner.scoring,
+        "plan_scoring",
+        lambda settings, store, run_id, version_id, id_columns: _plan(run_id, version_id),
+    )
+    monkeypatch.setattr(runner.scoring, "execute_scoring", execute_scoring)
+    monkeypatch.setattr(
+        runner.scoring,
+        "update_scoring_job",
+        lambda conn, job_id, status, **values: updates.append((job_id, status, values)),
+    )
+
+    if fails:
+        with pytest.raises(RuntimeError):
+            execute_scoring_job(None, None, job)
+    else:
+        assert execute_scoring_job(None, None, job) == {"rows": 10}
+
+    ((job_id, status, values),) = updates
+    assert job_id == job["id"]
+    assert values["finished_at"] is not None
+    assert values["attempt"] == 2
+    if fails:
+        assert status == RunStatus.FAILED
+        assert values["failure_reason"] == "partition missing"
+    else:
+        assert status == RunStatus.SUCCEEDED
+        assert values["summary"] == {"rows": 10}
+
+
+def test_scoring_job_with_a_lost_lease_writes_nothing(monkeypatch) -> None:
+    job = {
+        "id": uuid4(),
+        "run_id": uuid4(),
+        "dataset_version_id": uuid4(),
+        "id_columns": [],
+        "attempt": 1,
+    }
+    lease = Lease(job["id"], 1)
+    lease.lost.set()
+    monkeypatch.setattr(
+        runner.scoring,
+        "plan_scoring",
+        lambda settings, store, run_id, version_id, id_columns: _plan(run_id, version_id),
+    )
+    monkeypatch.setattr(runner.scoring, "execute_scoring", lambda settings, store, plan: {})
+    monkeypatch.setattr(runner.scoring, "transaction", pytest.fail)
+
+    with pytest.raises(LeaseLost):
+        execute_scoring_job(None, None, job, lease=lease)
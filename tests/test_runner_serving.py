@@ -0,0 +1,102 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from core.domain.v0 import Model
+from core.domain.v0.enums import ModelRegistryState
+from ml import BinMapper, CompiledEnsemble, FeatureSpec, GBMModel, GBMParams
+from runner.config import RunnerSettings
+from runner.serving import MicroBatcher, ModelCache, ModelNotFound, ServedModel
+
+
+def _ensemble() -> CompiledEnsemble:
+    # One stump: feature 0 <= 0.0 scores -1, otherwise +1, missing goes right.
+    return CompiledEnsemble(
+        feature=np.array([0, 0, 0], dtype=np.intp),
+        threshold=np.array([0.0, 0.0, 0.0]),
+        missing_right=np.array([True, False, False]),
+        children=np.array([1, 2, 1, 1, 2, 2], dtype=np.intp),
+        value=np.array([0.0, -1.0, 1.0]),
+        roots=np.array([0], dtype=np.intp),
+        depth=1,
+        base_score=0.0,
+        binary=False,
+    )
+
+
+def test_micro_batcher_coalesces_concurrent_requests() -> None:
+    batcher = MicroBatcher(_ensemble(), window_s=0.05, max_batch=64)
+
+    async def score_all() -> list[np.ndarray]:
+        requests = [np.array([[-1.0]]), np.array([[2.0], [np.nan]]), np.array([[0.0]])]
+        return await asyncio.gather(*(batcher.submit(encoded) for encoded in requests))
+
+    results = asyncio.run(score_all())
+
+    assert [result.tolist() for result in results] == [[-1.0], [1.0, 1.0], [-1.0]]
+    assert batcher.batches == 1
+    assert batcher.rows == 4
+
+
+class FakeModelCache(ModelCache):
+    """Model cache whose registry rows and artifacts live in memory."""
+
+    def __init__(self, max_bytes: int, state_ttl_s: float, load_delay_s: float = 0.0) -> None:
+        super().__init__(RunnerSettings(), store=None, max_bytes=max_bytes, state_ttl_s=state_ttl_s)
+        self.states: dict[UUID, ModelRegistryState] = {}
+        self.loaded: list[UUID] = []
+        self._load_delay_s = load_delay_s
+
+    def _fetch_model(self, model_id: UUID) -> Model:
+        state = self.states[model_id]
+        if state == ModelRegistryState.DEPRECATED:
+            self.invalidate(model_id)
+            raise ModelNotFound("Model is deprecated")
+        return Model(id=model_id, name="pd", produced_from_run_id=model_id, registry_state=state)
+
+    def _load(self, model_id: UUID) -> ServedModel:
+        model = self._fetch_model(model_id)
+        time.sleep(self._load_delay_s)
+        self.loaded.append(model_id)
+        mapper = BinMapper([FeatureSpec("x", "num")])
+        mapper.edges = [np.zeros(1000)]
+        gbm = GBMModel(GBMParams(), mapper, base_score=0.0)
+        compiled = CompiledEnsemble.from_model(gbm)
+        return ServedModel(model, gbm, compiled, MicroBatcher(compiled, 0.001, 8))
+
+
+def test_model_cache_loads_cold_model_once_under_concurrency() -> None:
+    cache = FakeModelCache(max_bytes=1 << 20, state_ttl_s=60.0, load_delay_s=0.05)
+    model_id = uuid4()
+    cache.states[model_id] = ModelRegistryState.REGISTERED
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        served = list(pool.map(lambda _: cache.get(model_id), range(8)))
+
+    assert cache.loaded == [model_id]
+    assert all(item is served[0] for item in served)
+    stats = cache.stats.snapshot()
+    assert stats["misses"] == 1 and stats["loads"] == 1
+    assert stats["coalesced"] + stats["hits"] == 7
+
+
+def test_model_cache_evicts_by_size_and_drops_deprecated_models() -> None:
+    cache = FakeModelCache(max_bytes=20_000, state_ttl_s=0.0)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    for model_id in (first, second, third):
+        cache.states[model_id] = ModelRegistryState.REGISTERED
+        cache.get(model_id)
+
+    # Each entry holds ~8 KB of bin edges, so only the two most recent fit.
+    assert cache.model_ids() == [second, third]
+    assert cache.stats.snapshot()["evictions"] == 1
+
+    cache.states[third] = ModelRegistryState.DEPRECATED
+    with pytest.raises(ModelNotFound):
+        cache.get(third)
+    assert cache.model_ids() == [second]
+    assert cache.stats.snapshot()["invalidations"] == 1
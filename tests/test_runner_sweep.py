@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+import runner.sweep
+from core.domain.v0 import RunSpec
+from ml import FeatureSpec, SplitPolicy, SweepSpec, build_binned_dataset, make_splits
+from runner.config import RunnerSettings
+from runner.sweep import sweep_run_spec
+from runner.training import TrainingData
+
+
+def _run_spec() -> RunSpec:
+    return RunSpec(
+        dataset_version_id="00000000-0000-0000-0000-000000000001",
+        feature_set_version_id="00000000-0000-0000-0000-000000000002",
+        split_policy={"kind": "stratified"},
+        model_family="gbm",
+        model_params={"min_samples_leaf": 10},
+        evaluation_policy={},
+        artifact_policy={},
+    )
+
+
+def _settings(tmp_path: Path) -> RunnerSettings:
+    return RunnerSettings(
+        RUN_WORKDIR=str(tmp_path / "runs"),
+        SWEEP_MAX_WORKERS=2,
+        TRACKING_FLUSH_INTERVAL_S=0.01,
+        TRACKING_MAX_RETRIES=0,
+    )
+
+
+def test_sweep_tracks_trials_as_nested_runs_and_cleans_up(
+    tmp_path: Path, memory_store, monkeypatch
+) -> None:
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=(2000, 2))
+    target = (x[:, 0] + 0.3 * rng.normal(size=2000) > 0).astype(np.int64)
+    table = pa.table({"a": x[:, 0], "b": x[:, 1], "default": target})
+    pq.write_table(table, tmp_path / "p.parquet")
+    data = build_binned_dataset(
+        [tmp_path / "p.parquet"], [FeatureSpec("a"), FeatureSpec("b")], "default"
+    )
+    prepared = TrainingData(data, make_splits(SplitPolicy("stratified"), data.target))
+    client = MlflowClient(f"file://{tmp_path / 'mlruns'}")
+    monkeypatch.setattr(runner.sweep, "prepare_training_data", lambda *args: prepared)
+    monkeypatch.setattr(runner.sweep, "tracking_client", lambda settings: client)
+    spec = SweepSpec(grid={"max_depth": [1, 2]}, min_resource=3, max_resource=9, eta=3)
+
+    summary = sweep_run_spec(_settings(tmp_path), memory_store, _run_spec(), spec)
+
+    parent = client.get_run(summary["mlflow_run_id"])
+    assert parent.info.status == "FINISHED"
+    assert parent.data.params["trials"] == "2"
+    assert "best_valid_loss" in parent.data.metrics
+    trials = client.search_runs(
+        ["0"], filter_string=f"tags.{MLFLOW_PARENT_RUN_ID} = '{parent.info.run_id}'"
+    )
+    assert sorted(run.data.params["max_depth"] for run in trials) == ["1", "2"]
+    assert all(run.info.status == "FINISHED" for run in trials)
+    assert all("valid_loss" in run.data.metrics for run in trials)
+    assert f"sweeps/{summary['sweep_id']}/best/model.json" in memory_store.objects
+    assert not (tmp_path / "runs" / f"sweep-{summary['sweep_id']}").exists()
+
+
+def test_failed_sweep_removes_its_workdir(tmp_path: Path, memory_store, monkeypatch) -> None:
+    def prepare(settings, store, run_spec, max_bins, workdir, log):
+        (workdir / "binned").mkdir(parents=True)
+        (workdir / "binned" / "codes.npy").write_bytes(b"shared copy")
+        raise RuntimeError("dataset unavailable")
+
+    monkeypatch.setattr(runner.sweep, "prepare_training_data", prepare)
+    spec = SweepSpec(grid={"max_depth": [1, 2]})
+
+    try:
+        sweep_run_spec(_settings(tmp_path), memory_store, _run_spec(), spec)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("expected the sweep to fail")
+
+    assert not list((tmp_path / "runs").rglob("*.npy"))
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+from mlflow.tracking import MlflowClient
+
+from runner.tracking import SPOOL_FILE, TrackingSink, replay_spool
+
+
+class _Unavailable:
+    """A tracking server that refuses every call."""
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            raise ConnectionError("tracking server unavailable")
+
+        return call
+
+
+def _log_run(sink: TrackingSink, artifact: Path) -> None:
+    sink.log_params({f"param_{i}": i for i in range(150)})
+    sink.log_metrics({"auc": 0.75, "ks": 0.4})
+    sink.log_metric("auc", 0.8, step=1)
+    sink.log_artifact(artifact, artifact_path="reports")
+
+
+def test_tracking_sink_batches_to_file_store(tmp_path: Path) -> None:
+    client = MlflowClient(f"file://{tmp_path / 'mlruns'}")
+    artifact = tmp_path / "meta.json"
+    artifact.write_text("{}")
+
+    sink = TrackingSink.start(
+        client, "0", "run-1", tmp_path / "spool", flush_interval_s=0.01, max_retries=0
+    )
+    _log_run(sink, artifact)
+    sink.close("FINISHED", timeout_s=30)
+
+    run = client.get_run(sink.run_id)
+    assert run.info.status == "FINISHED"
+    assert len(run.data.params) == 150
+    assert run.data.metrics == {"auc": 0.8, "ks": 0.4}
+    assert [item.path for item in client.list_artifacts(sink.run_id, "reports")] == [
+        "reports/meta.json"
+    ]
+    assert not (tmp_path / "spool" / SPOOL_FILE).exists()
+
+
+def test_tracking_sink_spools_when_server_is_down_and_replays(tmp_path: Path) -> None:
+    artifact = tmp_path / "meta.json"
+    artifact.write_text("{}")
+    spool_dir = tmp_path / "spool"
+
+    sink = TrackingSink.start(
+        _Unavailable(), "0", "run-2", spool_dir, flush_interval_s=0.01, max_retries=1, backoff_s=0
+    )
+    assert sink.run_id is None
+    _log_run(sink, artifact)
+    sink.close("FAILED", timeout_s=30)
+
+    lines = [json.loads(line) for line in (spool_dir / SPOOL_FILE).read_text().splitlines()]
+    assert lines[0] == {"kind": "run", "run_id": None, "run_name": "run-2", "experiment_id": "0"}
+    assert [line["kind"] for line in lines[1:]] == ["batch", "batch", "artifact", "end"]
+
+    client = MlflowClient(f"file://{tmp_path / 'mlruns'}")
+    run_id = replay_spool(client, spool_dir)
+    run = client.get_run(run_id)
+    assert run.info.run_name == "run-2"
+    assert run.info.status == "FAILED"
+    assert len(run.data.params) == 150
+    assert run.data.metrics["auc"] == 0.8
+    assert not (spool_dir / SPOOL_FILE).exists()
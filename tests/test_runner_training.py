@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import runner.training
+from core.domain.v0 import RunSpec
+from ml import FeatureSpec, GBMModel, SplitPolicy, build_binned_dataset, make_splits
+from runner.config import RunnerSettings
+from runner.training import TrainingData, train_model
+
+
+def _run_spec(model_params: dict) -> RunSpec:
+    return RunSpec(
+        dataset_version_id="00000000-0000-0000-0000-000000000001",
+        feature_set_version_id="00000000-0000-0000-0000-000000000002",
+        split_policy={"kind": "stratified"},
+        model_family="gbm",
+        model_params=model_params,
+        evaluation_policy={},
+        artifact_policy={},
+    )
+
+
+def test_training_without_partitions_fails(tmp_path: Path, memory_store, monkeypatch) -> None:
+    monkeypatch.setattr(runner.training, "prepare_training_data", lambda *args: None)
+
+    with pytest.raises(ValueError, match="no materialized partitions"):
+        train_model(RunnerSettings(), memory_store, _run_spec({}), tmp_path, print)
+
+
+def test_training_reports_the_loss_of_the_kept_round(
+    tmp_path: Path, memory_store, monkeypatch
+) -> None:
+    rng = np.random.default_rng(5)
+    x = rng.normal(size=(1500, 3))
+    # Mostly noise, so aggressive boosting overfits and stops early.
+    target = (x[:, 0] + 2.0 * rng.normal(size=1500) > 0).astype(np.int64)
+    table = pa.table({"a": x[:, 0], "b": x[:, 1], "c": x[:, 2], "default": target})
+    pq.write_table(table, tmp_path / "part.parquet")
+    data = build_binned_dataset(
+        [tmp_path / "part.parquet"], [FeatureSpec(name) for name in "abc"], "default"
+    )
+    prepared = TrainingData(data, make_splits(SplitPolicy("stratified"), data.target))
+    monkeypatch.setattr(runner.training, "prepare_training_data", lambda *args: prepared)
+    params = {
+        "n_estimators": 200,
+        "learning_rate": 1.0,
+        "min_samples_leaf": 2,
+        "early_stopping_rounds": 3,
+        "n_threads": 1,
+    }
+
+    result = train_model(RunnerSettings(), memory_store, _run_spec(params), tmp_path, print)
+
+    model = GBMModel.load(result.model_path)
+    history = json.loads(result.model_path.read_text())["history"]
+    kept = history["best_iteration"]
+    assert len(model.trees) == kept < len(history["train_loss"])
+    assert result.metrics["train_loss"] == history["train_loss"][kept - 1]
+    assert result.metrics["valid_loss"] == history["valid_loss"][kept - 1]
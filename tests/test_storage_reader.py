@@ -0,0 +1,39 @@
+import io
+
+from core.storage.reader import open_ranged
+
+
+def _fetcher(payload: bytes, calls: list[tuple[int, int]]):
+    def fetch(start: int, end: int) -> bytes:
+        calls.append((start, end))
+        return payload[start:end]
+
+    return fetch
+
+
+def test_ranged_reader_reads_ahead_and_seeks() -> None:
+    payload = bytes(range(256)) * 64
+    calls: list[tuple[int, int]] = []
+    reader = open_ranged(_fetcher(payload, calls), len(payload), read_ahead=1024)
+
+    assert reader.read(10) == payload[:10]
+    assert reader.read(10) == payload[10:20]
+    assert calls == [(0, 1024)]
+
+    reader.seek(-8, io.SEEK_END)
+    assert reader.read() == payload[-8:]
+    assert reader.read() == b""
+
+    reader.seek(4000)
+    assert reader.tell() == 4000
+    assert reader.read(4) == payload[4000:4004]
+
+
+def test_ranged_reader_large_read_uses_few_requests() -> None:
+    payload = bytes(range(100)) * 100
+    calls: list[tuple[int, int]] = []
+    reader = open_ranged(_fetcher(payload, calls), len(payload), read_ahead=512)
+
+    assert reader.read(5000) == payload[:5000]
+    assert len(calls) <= 2
+    assert calls[-1][1] <= 5000 + 512
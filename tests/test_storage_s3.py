@@ -0,0 +1,143 @@
+import threading
+from pathlib import Path
+
+from botocore.stub import Stubber
+
+from core.storage import S3CompatibleStore, S3Settings
+from core.storage.base import ListingStats, TransferStats, UploadItem
+
+_MiB = 1024 * 1024
+
+
+def _store(**overrides) -> S3CompatibleStore:
+    settings = S3Settings(
+        endpoint_url="http://s3.test",
+        access_key="key",
+        secret_key="secret",
+        bucket="talaty",
+        **overrides,
+    )
+    return S3CompatibleStore(settings)
+
+
+def _page(keys: list[str], prefixes: tuple[str, ...] = (), token: str | None = None) -> dict:
+    page = {
+        "Contents": [{"Key": key, "Size": 1} for key in keys],
+        "CommonPrefixes": [{"Prefix": prefix} for prefix in prefixes],
+        "KeyCount": len(keys) + len(prefixes),
+        "IsTruncated": token is not None,
+    }
+    if token is not None:
+        page["NextContinuationToken"] = token
+    return page
+
+
+def _expect(stubber: Stubber, prefix: str, page: dict, token=None, delimiter=None) -> None:
+    params = {"Bucket": "talaty", "Prefix": prefix}
+    if delimiter:
+        params["Delimiter"] = delimiter
+    if token:
+        params["ContinuationToken"] = token
+    stubber.add_response("list_objects_v2", page, params)
+
+
+def test_iter_keys_follows_continuation_tokens_past_1000_keys() -> None:
+    store = _store()
+    keys = [f"datasets/a/v1/part-{index:05d}.parquet" for index in range(2500)]
+    stats = ListingStats()
+    with Stubber(store._client) as stubber:
+        _expect(stubber, "datasets/a/", _page(keys[:1000], token="t1"))
+        _expect(stubber, "datasets/a/", _page(keys[1000:2000], token="t2"), token="t1")
+        _expect(stubber, "datasets/a/", _page(keys[2000:]), token="t2")
+
+        assert list(store.iter_keys("datasets/a/", stats=stats)) == keys
+        stubber.assert_no_pending_responses()
+
+    assert (stats.keys, stats.pages, stats.prefixes) == (2500, 3, 0)
+
+
+def test_list_prefixes_collects_common_prefixes_across_pages() -> None:
+    store = _store()
+    with Stubber(store._client) as stubber:
+        _expect(
+            stubber,
+            "runs/",
+            _page(["runs/README"], ("runs/a/", "runs/b/"), token="t1"),
+            delimiter="/",
+        )
+        _expect(stubber, "runs/", _page([], ("runs/c/",)), token="t1", delimiter="/")
+        _expect(stubber, "runs/", _page(["runs/README"], ("runs/a/",)), delimiter="/")
+
+        assert store.list_prefixes("runs/") == ["runs/a/", "runs/b/", "runs/c/"]
+        # Keys directly under the prefix, without descending into the "directories".
+        assert list(store.iter_keys("runs/", delimiter="/")) == ["runs/README"]
+        stubber.assert_no_pending_responses()
+
+
+def test_list_many_returns_every_key_per_prefix() -> None:
+    # One worker keeps the stubbed responses in request order.
+    store = _store(max_concurrency=1)
+    stats = ListingStats()
+    with Stubber(store._client) as stubber:
+        _expect(stubber, "a/", _page(["a/1", "a/2"], token="t1"))
+        _expect(stubber, "a/", _page(["a/3"]), token="t1")
+        _expect(stubber, "b/", _page([]))
+        _expect(stubber, "c/", _page(["c/1"]))
+
+        listed = store.list_many(["a/", "b/", "c/"], stats=stats)
+        stubber.assert_no_pending_responses()
+
+    assert listed == {"a/": ["a/1", "a/2", "a/3"], "b/": [], "c/": ["c/1"]}
+    assert (stats.keys, stats.pages) == (4, 4)
+
+
+def test_put_file_switches_to_multipart_at_the_threshold(tmp_path: Path) -> None:
+    # One worker uploads the parts in order; chunks below 5 MiB are raised to it.
+    store = _store(multipart_threshold=_MiB, multipart_chunksize=5 * _MiB, max_concurrency=1)
+    small, large = tmp_path / "small.json", tmp_path / "model.bin"
+    small.write_bytes(b"{}" * 100)
+    large.write_bytes(bytes(6 * _MiB))
+    with Stubber(store._client) as stubber:
+        stubber.add_response("put_object", {})
+        stubber.add_response("create_multipart_upload", {"UploadId": "u-1"})
+        stubber.add_response("upload_part", {"ETag": '"p1"'})
+        stubber.add_response("upload_part", {"ETag": '"p2"'})
+        stubber.add_response("complete_multipart_upload", {})
+
+        assert store.put_file("runs/r/meta.json", small, "application/json").bytes == 200
+        assert store.put_file("runs/r/model.bin", large).bytes == 6 * _MiB
+        stubber.assert_no_pending_responses()
+
+
+def test_put_many_uploads_concurrently_and_totals_transfer_stats(tmp_path: Path) -> None:
+    store = _store(max_concurrency=4)
+    path = tmp_path / "runspec.yaml"
+    path.write_bytes(b"a: 1\n")
+    items = [UploadItem(f"runs/r/{index}.json", bytes(index * 10)) for index in range(1, 4)]
+    items.append(UploadItem("runs/r/runspec.yaml", path, "application/x-yaml"))
+    # Every upload waits until all four are in flight, so a serial put_many would fail.
+    in_flight = threading.Barrier(len(items), timeout=10)
+    keys = []
+
+    def wait_for_others(params, **kwargs) -> None:
+        keys.append(params["Key"])
+        in_flight.wait()
+
+    store._client.meta.events.register("before-parameter-build.s3.PutObject", wait_for_others)
+    with Stubber(store._client) as stubber:
+        for _ in items:
+            stubber.add_response("put_object", {})
+        stats = store.put_many(items)
+        stubber.assert_no_pending_responses()
+
+    assert sorted(keys) == sorted(item.key for item in items)
+    assert (stats.objects, stats.bytes) == (4, 10 + 20 + 30 + 5)
+    assert stats.seconds > 0
+    assert stats + TransferStats(objects=1, bytes=5, seconds=1.0) == TransferStats(
+        objects=5, bytes=70, seconds=stats.seconds + 1.0
+    )
+
+
+def test_connection_pool_covers_concurrent_multipart_uploads() -> None:
+    assert _store(max_concurrency=8)._client.meta.config.max_pool_connections == 64
+    assert _store(max_concurrency=2)._client.meta.config.max_pool_connections == 10